@@ -27,7 +27,15 @@ This file includes static methods and imports.
 from sasoptpy.model import *
 from sasoptpy.utils import *
 from sasoptpy.components import *
+from sasoptpy.quadratic import *
+from sasoptpy.presolve import *
+from sasoptpy.decomposition import *
 from sasoptpy.data import *
+from sasoptpy.expand import *
+from sasoptpy.backends import *
+from sasoptpy.concurrency import *
+from sasoptpy.report import *
+from sasoptpy.profiling import *
 #  from sasoptpy.gui import start_gui
 
 __version__ = '0.2.0'
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Lazy includes module proxies that import heavy dependencies on first use
+
+'''
+
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    '''
+    Proxy of a module that is imported on first attribute access
+
+    Parameters
+    ----------
+    name : string
+        Full name of the module
+
+    Notes
+    -----
+
+    - After the first access, attributes of the module are copied into the
+      proxy, so later lookups cost the same as on the module itself.
+
+    '''
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def _load(self):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        return '<lazy module {!r}>'.format(self.__name__)
+
+
+def is_loaded(name):
+    '''
+    Returns True if a module is already imported
+    '''
+    return name in sys.modules
+
+
+def isinstance_of(obj, module, classname, exact=False):
+    '''
+    Checks the type of an object without importing the module of the class
+
+    Parameters
+    ----------
+    obj : object
+        Object to be checked
+    module : string
+        Name of the module, e.g. 'pandas'
+    classname : string
+        Name of the class in the module, e.g. 'DataFrame'
+    exact : boolean, optional
+        Whether subclasses are excluded
+
+    Notes
+    -----
+
+    - If the module is not imported yet, no object can be an instance of
+      its classes, so False is returned without importing it.
+
+    '''
+    mod = sys.modules.get(module)
+    if mod is None:
+        return False
+    if exact:
+        return type(obj) is getattr(mod, classname)
+    return isinstance(obj, getattr(mod, classname))
+
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
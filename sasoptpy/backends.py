@@ -0,0 +1,792 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Backends includes the session protocol used by :class:`Model` to talk to
+CAS and SAS servers, and :class:`LocalSession`, an in-memory stand-in
+
+'''
+
+from math import inf
+import re
+
+from sasoptpy._lazy import np, pd
+import sasoptpy.report
+
+
+__all__ = ['SessionBackend', 'CASBackend', 'SASBackend', 'LocalSession',
+           'LocalTable', 'register_backend', 'get_backend']
+
+logger = sasoptpy.report.logger
+
+
+class SessionBackend:
+    '''
+    Base class for solver-session backends
+
+    A backend wraps a session object and exposes the four operations the
+    solve pipeline needs: upload, solve, fetch and drop.
+
+    Parameters
+    ----------
+    session : object
+        Underlying session object, e.g. :class:`swat.cas.connection.CAS`
+
+    Notes
+    -----
+
+    - The ``kind`` attribute decides which solve pipeline is used,
+      'CAS' for :meth:`Model.solve_on_cas` and 'SAS' for
+      :meth:`Model.solve_on_mva`.
+    - New session types can be registered with :func:`register_backend`.
+
+    See also
+    --------
+    :func:`get_backend`, :func:`register_backend`, :class:`LocalSession`
+
+    '''
+
+    kind = None
+
+    # Whether run_optmodel_chunks sends programs without joining them
+    streams_optmodel = False
+
+    def __init__(self, session):
+        self.session = session
+
+    def prepare(self):
+        '''
+        Prepares the session for optimization calls (e.g. loads action sets)
+        '''
+        pass
+
+    def has_optmodel(self):
+        '''
+        Returns True if the session can run PROC OPTMODEL programs
+        '''
+        return False
+
+    def valid_options(self, ptype):
+        '''
+        Returns the set of option names accepted by the frame solver
+
+        Parameters
+        ----------
+        ptype : int
+            Problem type, 1 for LP, 2 for MILP and 3 for QP
+        '''
+        return set()
+
+    def upload_frame(self, data, casout=None):
+        '''
+        Uploads a :class:`pandas.DataFrame` to the server
+
+        Parameters
+        ----------
+        data : :class:`pandas.DataFrame`
+            Table to be uploaded
+        casout : dict or string, optional
+            Output table options, at least the table name
+
+        Returns
+        -------
+        object
+            Reference to the server-side table, having a ``name`` attribute
+        '''
+        raise NotImplementedError
+
+    def solve_frame(self, table, ptype, options, sense,
+                    primalout='primal', dualout='dual'):
+        '''
+        Solves a problem uploaded in MPS format
+
+        Parameters
+        ----------
+        table : string
+            Name of the MPS table on the server
+        ptype : int
+            Problem type, 1 for LP, 2 for MILP and 3 for QP
+        options : dict
+            Solver options
+        sense : string
+            Objective sense, 'MIN' or 'MAX'
+        primalout : string, optional
+            Name of the primal solution table
+        dualout : string, optional
+            Name of the dual solution table
+
+        Returns
+        -------
+        object
+            Session specific response object
+        '''
+        raise NotImplementedError
+
+    def run_optmodel(self, code, output_tables=None):
+        '''
+        Submits a PROC OPTMODEL program
+
+        Parameters
+        ----------
+        code : string
+            PROC OPTMODEL program
+        output_tables : dict, optional
+            Output table names requested from the server
+
+        Returns
+        -------
+        object
+            Session specific response object
+        '''
+        raise NotImplementedError
+
+    def run_optmodel_chunks(self, chunks, output_tables=None):
+        '''
+        Submits a PROC OPTMODEL program given in pieces
+
+        Parameters
+        ----------
+        chunks : iterable
+            Strings forming the program when joined,
+            e.g. :meth:`Model.iter_optmodel`
+        output_tables : dict, optional
+            Output table names requested from the server
+
+        Returns
+        -------
+        object
+            Session specific response object
+
+        Notes
+        -----
+
+        - By default, chunks are joined and passed to
+          :meth:`SessionBackend.run_optmodel`. Backends that can send the
+          program piece by piece set ``streams_optmodel`` to True and
+          override this method.
+
+        '''
+        return self.run_optmodel(''.join(chunks), output_tables=output_tables)
+
+    def fetch_table(self, name, caslib=None):
+        '''
+        Downloads a server-side table as a :class:`pandas.DataFrame`
+
+        Parameters
+        ----------
+        name : string
+            Name of the table
+        caslib : string, optional
+            Library of the table
+        '''
+        raise NotImplementedError
+
+    def drop_table(self, name):
+        '''
+        Drops a server-side table
+
+        Parameters
+        ----------
+        name : string
+            Name of the table
+        '''
+        raise NotImplementedError
+
+    def patch_table(self, name, delta, key='_id_'):
+        '''
+        Replaces values of a server-side table with the values of a delta
+
+        Parameters
+        ----------
+        name : string
+            Name of the table
+        delta : :class:`pandas.DataFrame`
+            Rows to be replaced, containing the key column and the numeric
+            columns to be updated; missing values are ignored
+        key : string, optional
+            Name of the key column, the table should be sorted by the key
+        '''
+        raise NotImplementedError
+
+    def address(self):
+        '''
+        Returns a short string that describes where the session is connected
+        '''
+        return type(self.session).__name__
+
+    def __repr__(self):
+        return repr(self.session)
+
+
+class CASBackend(SessionBackend):
+    '''
+    Backend for :class:`swat.cas.connection.CAS` sessions
+    '''
+
+    kind = 'CAS'
+
+    def prepare(self):
+        self.session.loadactionset(actionset='optimization')
+
+    def has_optmodel(self):
+        return hasattr(self.session.optimization, 'runoptmodel')
+
+    def _solver(self, ptype):
+        if ptype == 1:
+            return self.session.solveLp
+        elif ptype == 3:
+            return self.session.solveQp
+        return self.session.solveMilp
+
+    def valid_options(self, ptype):
+        import inspect
+        return set(inspect.signature(self._solver(ptype)).parameters)
+
+    def upload_frame(self, data, casout=None):
+        return self.session.upload_frame(data, casout=casout)
+
+    def solve_frame(self, table, ptype, options, sense,
+                    primalout='primal', dualout='dual'):
+        valid_opts = self.valid_options(ptype)
+        opts = {key: value for key, value in options.items()
+                if key in valid_opts}
+        sfunc = self._solver(ptype)
+        return sfunc(
+            data=table, **opts,
+            primalOut={'caslib': 'CASUSER', 'name': primalout,
+                       'replace': True},
+            dualOut={'caslib': 'CASUSER', 'name': dualout,
+                     'replace': True},
+            objSense=sense)
+
+    def run_optmodel(self, code, output_tables=None):
+        if output_tables is None:
+            return self.session.runOptmodel(code)
+        return self.session.runOptmodel(code, outputTables=output_tables)
+
+    def fetch_table(self, name, caslib=None):
+        if caslib is None:
+            return self.session.CASTable(name).to_frame()
+        return self.session.CASTable(name, caslib=caslib).to_frame()
+
+    def drop_table(self, name):
+        self.session.table.droptable(table=name)
+
+    def patch_table(self, name, delta, key='_id_'):
+        delta_table = self.upload_frame(
+            delta, casout={'name': name + '_DELTA', 'replace': True})
+        self.session.loadactionset(actionset='dataStep')
+        self.session.dataStep.runCode(code=_merge_code(
+            name, delta_table.name, key,
+            [c for c in delta.columns if c != key]))
+        self.drop_table(delta_table.name)
+
+    def address(self):
+        return '{}:{}'.format(self.session._hostname, self.session._port)
+
+
+class SASBackend(SessionBackend):
+    '''
+    Backend for :class:`saspy.SASsession` sessions
+    '''
+
+    kind = 'SAS'
+
+    def has_optmodel(self):
+        return True
+
+    def upload_frame(self, data, casout=None):
+        if isinstance(casout, dict):
+            name = casout.get('name', 'MPS')
+        else:
+            name = casout if casout else 'MPS'
+        session = self.session
+        try:
+            return session.df2sd(data, table=name, keep_outer_quotes=True)
+        except Exception:
+            logger.warning('Table {} could not be uploaded with outer '
+                           'quotes, retrying without them.'.format(name))
+            sd = session.df2sd(data, table=name)
+            session.submit("""
+            data {};
+                set {};
+                field3=tranwrd(field3, "'MARKER'", "MARKER");
+                field3=tranwrd(field3, "MARKER", "'MARKER'");
+                field5=tranwrd(field5, "'INTORG'", "INTORG");
+                field5=tranwrd(field5, "INTORG", "'INTORG'");
+                field5=tranwrd(field5, "'INTEND'", "INTEND");
+                field5=tranwrd(field5, "INTEND", "'INTEND'");
+            run;
+            """.format(name, name))
+            return sd
+
+    def solve_frame(self, table, ptype, options, sense,
+                    primalout='primal_out', dualout='dual_out'):
+        proc = {1: 'optlp', 2: 'optmilp', 3: 'optqp'}[ptype]
+        return self.session.submit("""
+        ods output SolutionSummary=SOL_SUMMARY;
+        ods output ProblemSummary=PROB_SUMMARY;
+        proc {} data = {}
+           primalout  = {}
+           dualout    = {}
+           objsense   = {}{};{}
+        run;
+        """.format(proc, table, primalout, dualout,
+                   'max' if sense == 'MAX' else 'min',
+                   *_proc_options(options)))
+
+    def run_optmodel(self, code, output_tables=None):
+        return self.session.submit(code)
+
+    def fetch_table(self, name, caslib=None):
+        return self.session.sd2df(name)
+
+    def drop_table(self, name):
+        self.session.submit('proc delete data={}; run;'.format(name))
+
+    def patch_table(self, name, delta, key='_id_'):
+        delta_name = name + '_DELTA'
+        self.session.df2sd(delta, table=delta_name)
+        self.session.submit(_merge_code(
+            name, delta_name, key, [c for c in delta.columns if c != key]))
+        self.drop_table(delta_name)
+
+    def address(self):
+        return 'saspy:{}'.format(self.session.sascfg.name)
+
+
+class LocalTable:
+    '''
+    Reference to a table stored inside a :class:`LocalSession`
+
+    Parameters
+    ----------
+    session : :class:`LocalSession`
+        Owner of the table
+    name : string
+        Name of the table
+    '''
+
+    def __init__(self, session, name):
+        self._session = session
+        self.name = name
+
+    @property
+    def columns(self):
+        return self._session.tables[self.name].columns
+
+    def to_frame(self):
+        return self._session.fetch_table(self.name)
+
+    def __repr__(self):
+        return 'sasoptpy.LocalTable(name=\'{}\')'.format(self.name)
+
+
+class LocalResponse(dict):
+    '''
+    Response object returned by :class:`LocalSession` calls
+
+    Mimics the parts of a CAS response that :class:`Model` reads: output
+    tables are accessible as keys, and as attributes for the summaries.
+    '''
+
+    def __init__(self, tables=None, status='OK', solutionStatus='OPTIMAL',
+                 objective=0, solutionTime=0):
+        super().__init__(tables if tables is not None else {})
+        self.status = status
+        self.solutionStatus = solutionStatus
+        self.objective = objective
+        self.solutionTime = solutionTime
+
+    def get_tables(self, name):
+        if name == 'status':
+            return [self.status]
+        return [self[name]]
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __missing__(self, key):
+        return pd.DataFrame()
+
+
+class LocalSession(SessionBackend):
+    '''
+    An in-memory stand-in for a CAS session
+
+    Uploaded tables are stored in memory and solve calls return canned or
+    locally computed responses, so the whole client-side pipeline can run
+    without a server.
+
+    Parameters
+    ----------
+    responder : function, optional
+        Function called as ``responder(action, **kwargs)`` for each solve
+        request; its return value is used as the response unless it is None
+    optmodel : boolean, optional
+        Whether the session reports runOptmodel as available
+
+    Examples
+    --------
+
+    >>> s = so.LocalSession()
+    >>> m = so.Model(name='m', session=s)
+    >>> x = m.add_variable(name='x', lb=1, ub=4)
+    >>> m.set_objective(2 * x, sense=so.MIN, name='obj')
+    >>> m.solve(frame=True)
+    >>> print(m.get_objective_value())
+    2.0
+    >>> print(s.round_trips, s.count_calls('upload'))
+    4 1
+
+    Notes
+    -----
+
+    - Local responses do not solve the problem. Each variable takes the
+      value closest to zero within its bounds, and objective and row
+      activities are computed from those values.
+    - PROC OPTMODEL programs are not interpreted; unless a responder is
+      given, they return empty output tables, and tables written with
+      CREATE DATA are stored empty.
+    - Programs given to :meth:`LocalSession.run_optmodel_chunks` are read
+      piece by piece without being joined, unless a responder is given.
+    - ``calls`` keeps one record per round trip with the action name and
+      the number of bytes sent and received.
+
+    '''
+
+    kind = 'CAS'
+
+    streams_optmodel = True
+
+    def __init__(self, responder=None, optmodel=True):
+        super().__init__(self)
+        self._responder = responder
+        self._optmodel = optmodel
+        self._hostname = 'localhost'
+        self._port = 0
+        self._counter = 0
+        self.tables = {}
+        self.reset_counters()
+
+    def reset_counters(self):
+        '''
+        Clears the round-trip and byte counters
+        '''
+        self.calls = []
+        self.round_trips = 0
+        self.bytes_uploaded = 0
+        self.bytes_downloaded = 0
+
+    def _record(self, action, sent=0, received=0, **info):
+        self.round_trips += 1
+        self.bytes_uploaded += sent
+        self.bytes_downloaded += received
+        call = {'action': action, 'sent': sent, 'received': received}
+        call.update(info)
+        self.calls.append(call)
+
+    def count_calls(self, action):
+        '''
+        Returns the number of round trips for the given action
+        '''
+        return sum(1 for c in self.calls if c['action'] == action)
+
+    def has_optmodel(self):
+        return self._optmodel
+
+    def valid_options(self, ptype):
+        return {'objconstant', 'maxtime', 'algorithm', 'presolver',
+                'primalin', 'decomp'}
+
+    def upload_frame(self, data, casout=None):
+        if isinstance(casout, dict):
+            name = casout.get('name')
+        else:
+            name = casout
+        if not name:
+            self._counter += 1
+            name = 'TMP_TABLE_{}'.format(self._counter)
+        self.tables[name] = data.copy()
+        self._record('upload', sent=frame_bytes(data), table=name)
+        return LocalTable(self, name)
+
+    def fetch_table(self, name, caslib=None):
+        df = self.tables[name].copy()
+        self._record('fetch', received=frame_bytes(df), table=name)
+        return df
+
+    def drop_table(self, name):
+        self.tables.pop(name, None)
+        self._record('drop', table=name)
+
+    def patch_table(self, name, delta, key='_id_'):
+        table = self.tables[name]
+        rows = table.reset_index().set_index(key)['index']
+        for col in delta.columns:
+            if col == key:
+                continue
+            values = delta[[key, col]].dropna()
+            positions = rows.loc[values[key]].values
+            table.loc[positions, col] = values[col].values
+        self._record('patch', sent=frame_bytes(delta), table=name)
+
+    def solve_frame(self, table, ptype, options, sense,
+                    primalout='primal', dualout='dual'):
+        self._record('solve', table=table)
+        if self._responder is not None:
+            response = self._responder('solve', table=table, ptype=ptype,
+                                       options=options, sense=sense)
+            if response is not None:
+                return response
+        primal, dual, objective = _evaluate_mps(
+            self.tables[table], options.get('objconstant', 0))
+        if ptype == 2:
+            primal['_SOL_'] = 1.0
+            dual['_SOL_'] = 1.0
+        self.tables[primalout] = primal
+        self.tables[dualout] = dual
+        return LocalResponse(
+            tables={'ProblemSummary': _summary_frame([
+                        ('Problem Name', table),
+                        ('Objective Sense', sense),
+                        ('Number of Variables', len(primal)),
+                        ('Number of Constraints', len(dual))]),
+                    'SolutionSummary': _summary_frame([
+                        ('Solution Status', 'Optimal'),
+                        ('Objective Value', objective)])},
+            objective=objective)
+
+    def run_optmodel(self, code, output_tables=None):
+        if isinstance(code, str):
+            code = [code]
+        return self.run_optmodel_chunks(code, output_tables=output_tables)
+
+    def run_optmodel_chunks(self, chunks, output_tables=None):
+        if self._responder is not None:
+            # Responders receive the whole program
+            code = ''.join(chunks)
+            chunks = [code]
+        sent = 0
+        created = []
+        for chunk in chunks:
+            sent += len(chunk.encode('utf-8'))
+            created.extend(re.findall(
+                r'create data (\w+) from \[([^\]]*)\]=\{[^}]*\}([^;]*);',
+                chunk))
+        self._record('runOptmodel', sent=sent)
+        if self._responder is not None:
+            response = self._responder('runOptmodel', code=code,
+                                       output_tables=output_tables)
+            if response is not None:
+                return response
+        # Tables created by the program are stored empty
+        for name, keys, cols in created:
+            if name not in self.tables:
+                columns = keys.split() + re.findall(r'(\w+)=', cols)
+                self.tables[name] = pd.DataFrame(columns=columns)
+        return LocalResponse(tables={
+            'Print1.PrintTable': pd.DataFrame(columns=[
+                '_VAR__NAME', '_VAR__LB', '_VAR__UB', '_VAR_', '_VAR__RC']),
+            'Print2.PrintTable': pd.DataFrame(columns=[
+                '_CON__NAME', '_CON__BODY', '_CON__DUAL']),
+            'Solve1.SolutionSummary': _summary_frame([
+                ('Solution Status', 'Optimal')]),
+            'Solve1.ProblemSummary': _summary_frame([])})
+
+    def close(self):
+        '''
+        Drops all tables of the session
+        '''
+        self.tables.clear()
+
+    def address(self):
+        return 'local'
+
+    def __repr__(self):
+        return 'sasoptpy.LocalSession(tables={})'.format(len(self.tables))
+
+
+# Registry of backends, keyed by the type name of the session object
+__backends = {'CAS': CASBackend, 'SASsession': SASBackend}
+
+
+def register_backend(type_name, backend):
+    '''
+    Registers a backend class for a session type
+
+    Parameters
+    ----------
+    type_name : string
+        Class name of the session objects, e.g. 'CAS'
+    backend : class
+        Subclass of :class:`SessionBackend` wrapping those sessions
+
+    Examples
+    --------
+
+    >>> class MyBackend(so.SessionBackend):
+    ...     kind = 'CAS'
+    ...     ...
+    >>> so.register_backend('MyConnection', MyBackend)
+
+    '''
+    __backends[type_name] = backend
+
+
+def get_backend(session):
+    '''
+    Returns the backend wrapping a session object
+
+    Parameters
+    ----------
+    session : object
+        A session object or a :class:`SessionBackend`
+
+    Returns
+    -------
+    :class:`SessionBackend` object
+        Backend of the session, None if the session type is not registered
+
+    '''
+    if session is None or isinstance(session, SessionBackend):
+        return session
+    backend = __backends.get(type(session).__name__)
+    if backend is None:
+        return None
+    return backend(session)
+
+
+def frame_bytes(df):
+    '''
+    Returns the in-memory size of a DataFrame in bytes
+    '''
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _merge_code(name, delta, key, columns):
+    '''
+    Returns a DATA step program that merges a delta table into a table
+    '''
+    renames = ' '.join('{0}=_new_{0}'.format(c) for c in columns)
+    s = 'data {0}; merge {0} {1}(rename=({2})); by {3};\n'.format(
+        name, delta, renames, key)
+    for c in columns:
+        s += 'if _new_{0} ne . then {0} = _new_{0};\n'.format(c)
+    s += 'drop {};\nrun;\n'.format(' '.join('_new_' + c for c in columns))
+    return s
+
+
+def _proc_options(options):
+    '''
+    Returns PROC statement options and statements for solver options
+
+    Scalar options are written as ``key=value`` on the PROC statement and
+    dictionary options as separate statements, e.g.
+    ``{'decomp': {'method': 'user'}}`` as ``decomp method=user;``.
+    '''
+    procopts = ''
+    statements = ''
+    for key, value in options.items():
+        if key == 'with':
+            logger.warning('Option {} is ignored by the MPS solvers.'.format(
+                key))
+        elif isinstance(value, dict):
+            statements += '\n           {}{};'.format(key, ''.join(
+                ' {}={}'.format(k, v) for k, v in value.items()))
+        else:
+            procopts += '\n           {}={}'.format(key, value)
+    return procopts, statements
+
+
+def _summary_frame(rows):
+    return pd.DataFrame([[label, str(value)] for label, value in rows],
+                        columns=['Label1', 'cValue1'])
+
+
+def _evaluate_mps(mps, objconstant=0):
+    '''
+    Computes a trivial primal point and row activities for an MPS table
+    '''
+    section = None
+    rows = []
+    objname = None
+    columns = {}
+    bounds = {}
+    quadratic = []
+    for r in mps.itertuples(index=False):
+        f1, f2, f3, f4, f5, f6 = r[0], r[1], r[2], r[3], r[4], r[5]
+        if f1 in ('NAME', 'ROWS', 'COLUMNS', 'RHS', 'RANGES', 'BOUNDS',
+                  'QUADOBJ', 'ENDATA'):
+            section = f1
+            continue
+        if section == 'ROWS':
+            if f1 in ('MIN', 'MAX', 'N'):
+                objname = f2
+            else:
+                rows.append(f2)
+        elif section == 'COLUMNS':
+            if f3 == "'MARKER'":
+                continue
+            col = columns.setdefault(f2, {})
+            col[f3] = float(f4)
+            if f5 not in ('', None):
+                col[f5] = float(f6)
+        elif section == 'BOUNDS':
+            lb, ub = bounds.get(f3, (0, inf))
+            if f1 == 'FX':
+                lb = ub = float(f4)
+            elif f1 == 'FR':
+                lb, ub = -inf, inf
+            elif f1 == 'LO':
+                lb = float(f4)
+            elif f1 == 'UP':
+                ub = float(f4)
+            elif f1 == 'BV':
+                lb, ub = 0, 1
+            elif f1 == 'MI':
+                lb = -inf
+            bounds[f3] = (lb, ub)
+        elif section == 'QUADOBJ':
+            quadratic.append((f2, f3, float(f4)))
+    primal = []
+    activity = dict.fromkeys(rows, 0.0)
+    objective = objconstant
+    values = {}
+    for name, col in columns.items():
+        lb, ub = bounds.get(name, (0, inf))
+        value = min(max(0.0, lb), ub)
+        values[name] = value
+        for row, coef in col.items():
+            if row == objname:
+                objective += coef * value
+            elif row in activity:
+                activity[row] += coef * value
+        primal.append([name, lb, ub, value, 0.0])
+    for v1, v2, coef in quadratic:
+        # Lower triangle of Q in x'Qx/2
+        scale = 0.5 if v1 == v2 else 1
+        objective += scale * coef * values[v1] * values[v2]
+    primal = pd.DataFrame(primal, columns=[
+        '_VAR_', '_LBOUND_', '_UBOUND_', '_VALUE_', '_R_COST_'])
+    dual = pd.DataFrame([[r, activity[r], 0.0] for r in rows],
+                        columns=['_ROW_', '_ACTIVITY_', '_VALUE_'])
+    return primal, dual, np.float64(objective)
@@ -18,15 +18,67 @@
 
 from itertools import product
 from math import copysign, inf
+import numbers
+import sys
 from types import GeneratorType
 import warnings
 
-import numpy as np
-import pandas as pd
-
+from sasoptpy._lazy import np, pd
+import sasoptpy._lazy
+import sasoptpy.profiling
+import sasoptpy.quadratic
 import sasoptpy.utils
 
 
+class _RefProbe:
+    '''
+    Measures the reference count of an operand inside an operator call
+
+    Notes
+    -----
+
+    - :meth:`Expression._is_owned` compares the reference count of the left
+      operand against the count measured here for an unnamed intermediate
+      result. The call path (operator, then method) has to be the same.
+
+    '''
+
+    def __init__(self):
+        self.count = None
+
+    def __add__(self, other):
+        other.count = self._count()
+        return other
+
+    def _count(self):
+        return sys.getrefcount(self)
+
+
+def _owned_refs():
+    if not hasattr(sys, 'getrefcount'):
+        # Reference counts are not available outside of CPython
+        return 0
+    temp = (_RefProbe() + _RefProbe()).count
+    probe = _RefProbe()
+    named = (probe + _RefProbe()).count
+    if named <= temp:
+        # Counts of named and unnamed operands are the same, disable
+        return 0
+    return temp
+
+
+# Reference count of an intermediate result held only by the interpreter
+_OWNED_REFS = _owned_refs()
+
+# Number of keys in each part of a key list yielded by
+# VariableGroup._iter_defn
+_KEY_BATCH = 1000
+
+# Number of variable renames, cached constraint definitions before the last
+# rename are not used
+_variable_renames = 0
+
+
 class Expression:
     '''
     Creates a mathematical expression to represent model components
@@ -92,18 +144,25 @@ class Expression:
             if isinstance(exp, Expression):
                 for mylc in exp._linCoef:
                     self._linCoef[mylc] = dict(exp._linCoef[mylc])
-            elif np.issubdtype(type(exp), np.number):
+                if sasoptpy.profiling._enabled:
+                    sasoptpy.profiling._count('lincoef_copies',
+                                              len(exp._linCoef))
+            elif sasoptpy.utils._is_number(exp):
                 self._linCoef = {'CONST': {'ref': None, 'val': exp}}
             else:
                 print('WARNING: An invalid type is passed to create an ' +
                       'Expression: {}'.format(type(exp)))
         self._temp = temp
+        # Whether the object is a result of add() or mult()
+        self._intermediate = False
         self._value = 0
         self._operator = None
         self._arguments = []
         self._iterkey = []
         self._abstract = False
         self._conditions = []
+        if sasoptpy.profiling._enabled:
+            sasoptpy.profiling._count('expressions')
 
     def copy(self, name=None):
         '''
@@ -133,10 +192,13 @@ class Expression:
         r = Expression(name=name)
         for mylc in self._linCoef:
             r._linCoef[mylc] = dict(self._linCoef[mylc])
+        if sasoptpy.profiling._enabled:
+            sasoptpy.profiling._count('copies')
+            sasoptpy.profiling._count('lincoef_copies', len(self._linCoef))
         r._operator = self._operator
         r._iterkey = self._iterkey
         r._abstract = self._abstract
-        r._conditionts = self._conditions
+        r._conditions = list(self._conditions)
         return r
 
     def get_value(self):
@@ -219,6 +281,7 @@ class Expression:
         if hasattr(self, '_objorder') and not self._objorder:
             self._objorder = order
         self._name = safe_name
+        self._invalidate()
         return self._name
 
     def get_name(self):
@@ -273,13 +336,14 @@ class Expression:
         x + (y) ^ (2)
 
         '''
-        s = ''
+        parts = []
         if self._operator:
-            s += self._operator
+            parts.append(self._operator)
             if self._iterkey:
                 if self._operator == 'sum':
-                    s += sasoptpy.utils._to_optmodel_loop(self._iterkey)
-            s += '('
+                    parts.append(
+                        sasoptpy.utils._to_optmodel_loop(self._iterkey))
+            parts.append('(')
 
         itemcnt = 0
         firstel = True
@@ -292,9 +356,9 @@ class Expression:
                 continue
             if not(firstel and csign == 1):
                 if csign == 1:
-                    s += '+ '
+                    parts.append('+ ')
                 else:
-                    s += '- '
+                    parts.append('- ')
             firstel = False
 
             if op:
@@ -313,11 +377,11 @@ class Expression:
 
             refs = optext.join(strlist)
             if val == 1 or val == -1:
-                s += '{} '.format(refs)
+                parts.append('{} '.format(refs))
             elif op:
-                s += '{} * ({}) '.format(round(abs(val), 12), refs)
+                parts.append('{} * ({}) '.format(round(abs(val), 12), refs))
             else:
-                s += '{} * {} '.format(round(abs(val), 12), refs)
+                parts.append('{} * {} '.format(round(abs(val), 12), refs))
 
             itemcnt += 1
 
@@ -327,13 +391,14 @@ class Expression:
             val = self._linCoef['CONST']['val']
             csign = copysign(1, val)
             if csign < 0:
-                s += '- '
+                parts.append('- ')
             elif firstel:
                 pass
             else:
-                s += '+ '
-            s += '{} '.format(abs(val))
+                parts.append('+ ')
+            parts.append('{} '.format(abs(val)))
 
+        s = ''.join(parts)
         if self._operator:
             if self._arguments:
                 s += ', ' + ', '.join(i._expr() if hasattr(i, '_expr') else str(i) for i in self._arguments)
@@ -468,6 +533,20 @@ class Expression:
         s = s.rstrip()
         return s
 
+    def _invalidate(self):
+        '''
+        Drops the cached OPTMODEL definition of the object
+
+        Notes
+        -----
+
+        - Expressions are rendered on each call, so this method only counts
+          the change. :class:`Variable` and :class:`Constraint` objects
+          override it.
+
+        '''
+        sasoptpy.utils._record_change()
+
     def _add_coef_value(self, var, key, value):
         '''
         Changes value of a variable inside the :class:`Expression` object in
@@ -486,6 +565,7 @@ class Expression:
             self._linCoef[key]['val'] += value
         else:
             self._linCoef[key] = {'ref': var, 'val': value}
+        self._invalidate()
 
     def add(self, other, sign=1):
         '''
@@ -510,18 +590,32 @@ class Expression:
         * Adding an expression is equivalent to calling this method:
           (x-y)+(3*x-2*y) and (x-y).add(3*x-2*y) are interchangeable.
         '''
+        profiling = sasoptpy.profiling._enabled
         if self._temp and type(self) is Expression:
             r = self
+            if profiling:
+                sasoptpy.profiling._count('add_temp')
         else:
-            if isinstance(other, Expression) and other._temp:
+            if isinstance(other, Expression) and other._temp and\
+                    type(other) is Expression and other._operator is None:
                 r = other
+                if sign == -1:
+                    for v in r._linCoef.values():
+                        v['val'] = -v['val']
                 other = self
-                sign = sign * -1
+                sign = 1
+                if profiling:
+                    sasoptpy.profiling._count('add_temp')
             elif self._operator is not None:
                 r = Expression()
                 r._linCoef[self.set_name()] = {'val': 1, 'ref': self}
+                r._conditions = list(self._conditions)
+                if profiling:
+                    sasoptpy.profiling._count('add_copy')
             else:
                 r = self.copy()
+                if profiling:
+                    sasoptpy.profiling._count('add_copy')
         if isinstance(other, Expression):
             if other._abstract:
                 r._abstract = True
@@ -532,12 +626,14 @@ class Expression:
                     else:
                         r._linCoef[v] = dict(other._linCoef[v])
                         r._linCoef[v]['val'] *= sign
+                        if profiling:
+                            sasoptpy.profiling._count('lincoef_copies')
             else:
                 r._linCoef[other.set_name()] = {'val': sign, 'ref': other}
-            r._conditions += self._conditions
             r._conditions += other._conditions
-        elif np.issubdtype(type(other), np.number):
+        elif sasoptpy.utils._is_number(other):
             r._linCoef['CONST']['val'] += sign * other
+        r._intermediate = True
         return r
 
     def mult(self, other):
@@ -563,6 +659,8 @@ class Expression:
         '''
         if isinstance(other, Expression):
             r = Expression()
+            if sasoptpy.profiling._enabled:
+                sasoptpy.profiling._count('mult_copy')
             if self._abstract or other._abstract:
                 r._abstract = True
             target = r._linCoef
@@ -600,23 +698,29 @@ class Expression:
                                     'val': x['val'] * y['val']}
             r._conditions += self._conditions
             r._conditions += other._conditions
+            r._intermediate = True
             return r
-        elif np.issubdtype(type(other), np.number):
+        elif sasoptpy.utils._is_number(other):
             if self._temp and type(self) is Expression:
                 if other == 0:
                     self._linCoef = {'CONST': {'ref': None, 'val': 0}}
                 else:
                     for mylc in self._linCoef:
                         self._linCoef[mylc]['val'] *= other
+                if sasoptpy.profiling._enabled:
+                    sasoptpy.profiling._count('mult_temp')
                 r = self
                 return r
             else:
+                if sasoptpy.profiling._enabled:
+                    sasoptpy.profiling._count('mult_copy')
                 if other == 0:
                     r = Expression()
                 else:
                     r = self.copy()
                     for mylc in r._linCoef:
                         r._linCoef[mylc]['val'] *= other
+                r._intermediate = True
                 return r
 
     def _tag_constraint(self, *argv):
@@ -649,26 +753,31 @@ class Expression:
         elif not isinstance(self, Variable):
             if self._temp and type(self) is Expression:
                 r = self
+                if sasoptpy.profiling._enabled:
+                    sasoptpy.profiling._count('relational_temp')
             else:
+                if sasoptpy.profiling._enabled:
+                    sasoptpy.profiling._count('relational_copy')
                 if self._operator is None:
                     r = self.copy()
                 else:
-                    r = Expression(0)
-                    r += self
+                    r = Expression(0)._add_owned(self)
             #  TODO r=self could be used whenever expression has no name
-            if np.issubdtype(type(other), np.number):
+            if sasoptpy.utils._is_number(other):
                 r._linCoef['CONST']['val'] -= other
             elif isinstance(other, Expression):
-                r -= other
+                r = r._add_owned(other, -1)
             generated_constraint = Constraint(exp=r, direction=direction_,
                                               crange=0)
             return generated_constraint
         else:
             r = Expression()
+            if sasoptpy.profiling._enabled:
+                sasoptpy.profiling._count('relational_copy')
             for v in self._linCoef:
                 r._add_coef_value(self._linCoef[v]['ref'], v,
                                   self._linCoef[v]['val'])
-            if np.issubdtype(type(other), np.number):
+            if sasoptpy.utils._is_number(other):
                 r._linCoef['CONST']['val'] -= other
             else:
                 for v in other._linCoef:
@@ -714,6 +823,34 @@ class Expression:
                 return False
         return True
 
+    def _get_quadratic(self):
+        '''
+        Returns the quadratic terms of the expression
+
+        Returns
+        -------
+        :class:`QuadraticBlock` object
+            Block of products of two variables, or None if the expression
+            has any other nonlinear or abstract component
+
+        '''
+        if self._operator is not None or self._abstract:
+            return None
+        q = sasoptpy.quadratic.QuadraticBlock()
+        for val in self._linCoef.values():
+            ref = val['ref']
+            if val.get('op', False):
+                return None
+            if type(ref) is list:
+                if len(ref) != 2 or not all(
+                        isinstance(r, Variable) and not r._abstract
+                        for r in ref):
+                    return None
+                q.add_term(ref[0], ref[1], val['val'])
+            elif ref and (ref._operator or ref._abstract):
+                return None
+        return q
+
     def __hash__(self):
         return hash('{}{}'.format(self._name, id(self)))
 
@@ -725,13 +862,119 @@ class Expression:
         for key in keys_to_clean:
             del self._linCoef[key]
 
+    def _is_array(self, other):
+        return isinstance(other, (VariableGroup, ExpressionArray))
+
+    def _is_owned(self):
+        '''
+        Returns True if the object is an intermediate result that is not
+        referenced anywhere else
+
+        Notes
+        -----
+
+        - Only the operator methods should call this method, since the
+          reference count depends on the call path, see :class:`_RefProbe`.
+        - Only results of :meth:`Expression.add` and
+          :meth:`Expression.mult` are updated in place, which makes
+          repeated additions such as ``sum(2 * x[i] for i in I)`` linear in
+          the number of terms.
+        - A partial sum bound to a name, as in ``e = e + x[i]`` or
+          ``e += x[i]``, is always copied; see
+          :meth:`Expression.add_inplace`.
+
+        '''
+        return (_OWNED_REFS > 0 and self._intermediate and
+                self._is_plain() and not self._temp and
+                sys.getrefcount(self) <= _OWNED_REFS)
+
+    def _is_plain(self):
+        return (type(self) is Expression and self._name is None and
+                self._operator is None)
+
+    def _add_owned(self, other, sign=1):
+        self._temp = True
+        r = self.add(other, sign)
+        self._temp = False
+        return r
+
     def __add__(self, other):
+        if self._is_array(other):
+            return NotImplemented
+        if self._is_owned():
+            return self._add_owned(other)
         return self.add(other)
 
     def __sub__(self, other):
+        if self._is_array(other):
+            return NotImplemented
+        if self._is_owned():
+            return self._add_owned(other, -1)
         return self.add(other, -1)
 
+    def __iadd__(self, other):
+        '''
+        Returns a new expression as in ``e = e + other``
+
+        Notes
+        -----
+
+        - Other names bound to the expression are not changed. Use
+          :meth:`Expression.add_inplace` for accumulating terms in a loop.
+
+        '''
+        if self._is_array(other):
+            return NotImplemented
+        return self.add(other)
+
+    def __isub__(self, other):
+        if self._is_array(other):
+            return NotImplemented
+        return self.add(other, -1)
+
+    def add_inplace(self, other, sign=1):
+        '''
+        Adds to an unnamed expression in place
+
+        Parameters
+        ----------
+        other : float or :class:`Expression` object
+            Expression or constant value to be added
+        sign : int, optional
+            Sign of the addition, 1 or -1
+
+        Returns
+        -------
+        :class:`Expression` object
+            The expression itself
+
+        Examples
+        --------
+
+        >>> e = so.Expression()
+        >>> for i in range(3):
+        ...     e.add_inplace(x[i])
+        >>> print(e)
+        x[0] + x[1] + x[2]
+
+        Notes
+        -----
+
+        - Loops calling this method take linear time, while ``e += x[i]``
+          copies the partial sum at each step. Other names bound to the
+          expression see the change.
+        - Named expressions, variables and constraints cannot be updated in
+          place.
+
+        '''
+        if not self._is_plain():
+            raise ValueError('Only unnamed expressions can be updated in '
+                             'place.')
+        return self._add_owned(other, sign)
+
     def __mul__(self, other):
+        if self._is_array(other):
+            return NotImplemented
         return self.mult(other)
 
     def __pow__(self, other):
@@ -760,10 +1003,15 @@ class Expression:
         return r
 
     def __radd__(self, other):
+        if self._is_owned():
+            return self._add_owned(other)
         return self.add(other)
 
     def __rsub__(self, other):
-        tmp = self.add(other, -1)
+        if self._is_owned():
+            tmp = self._add_owned(other, -1)
+        else:
+            tmp = self.add(other, -1)
         for v in tmp._linCoef:
             tmp._linCoef[v]['val'] *= -1
         return tmp
@@ -772,7 +1020,7 @@ class Expression:
         return self.mult(other)
 
     def __truediv__(self, other):
-        if np.issubdtype(type(other), np.number):
+        if sasoptpy.utils._is_number(other):
             return self.mult(1/other)
         r = Expression()
         if not isinstance(other, Expression):
@@ -798,12 +1046,18 @@ class Expression:
         return r
 
     def __le__(self, other):
+        if self._is_array(other):
+            return NotImplemented
         return self._relational(other, 'L')
 
     def __ge__(self, other):
+        if self._is_array(other):
+            return NotImplemented
         return self._relational(other, 'G')
 
     def __eq__(self, other):
+        if self._is_array(other):
+            return NotImplemented
         return self._relational(other, 'E')
 
     def __rle__(self, other):
@@ -885,10 +1139,49 @@ class Variable(Expression):
         self._temp = False
         self._abstract = abstract
         self._shadow = shadow
+        self._defn_cache = None
+        if sasoptpy.profiling._enabled:
+            sasoptpy.profiling._count('variables')
 
     def _set_info(self, parent, key):
         self._parent = parent
         self._key = key
+        self._invalidate()
+
+    def _invalidate(self):
+        self._defn_cache = None
+        # Local expansions share concrete variables, so only abstract ones
+        # count as changes
+        if self._abstract or self._shadow:
+            sasoptpy.utils._record_change()
+
+    def set_name(self, name=None):
+        '''
+        Sets the name of the variable
+
+        Parameters
+        ----------
+        name : string
+            Name of the variable
+
+        Returns
+        -------
+        string
+            Name of the variable after resolving conflicts
+
+        Notes
+        -----
+
+        - Cached definitions of constraints are rendered again after a
+          variable is renamed.
+
+        '''
+        global _variable_renames
+        old = self._name
+        name = super().set_name(name)
+        if name != old:
+            _variable_renames += 1
+        return name
 
     def set_bounds(self, lb=None, ub=None):
         '''
@@ -916,6 +1209,7 @@ class Variable(Expression):
             self._lb = lb
         if ub is not None:
             self._ub = ub
+        self._invalidate()
 
     def set_init(self, init=None):
         '''
@@ -937,6 +1231,7 @@ class Variable(Expression):
 
         '''
         self._init = init
+        self._invalidate()
 
     def __repr__(self):
         '''
@@ -983,7 +1278,9 @@ class Variable(Expression):
             return('{}[{}]'.format(self._name, key))
         return('{}'.format(self._name))
 
-    def _defn(self):
+    def _defn(self, cache=False):
+        if self._defn_cache is not None:
+            return self._defn_cache
         s = 'var {}'.format(self._name)
         BIN = sasoptpy.utils.BIN
         CONT = sasoptpy.utils.CONT
@@ -1001,6 +1298,8 @@ class Variable(Expression):
         if self._init is not None:
             s += ' init {}'.format(self._init)
         s += ';'
+        if cache and not self._abstract:
+            self._defn_cache = s
         return(s)
 
     def _tag_constraint(self, c):
@@ -1077,6 +1376,9 @@ class Constraint(Expression):
         else:
             for m in exp._linCoef:
                 self._linCoef[m] = dict(exp._linCoef[m])
+            if sasoptpy.profiling._enabled:
+                sasoptpy.profiling._count('lincoef_copies',
+                                          len(exp._linCoef))
         if direction is None:
             self._direction = exp._direction
         else:
@@ -1086,6 +1388,10 @@ class Constraint(Expression):
         self._parent = None
         self._block = None
         self._temp = False
+        self._defn_cache = None
+        self._models = []
+        if sasoptpy.profiling._enabled:
+            sasoptpy.profiling._count('constraints')
 
     def __and__(self, other):
         print('Called!')
@@ -1124,6 +1430,7 @@ class Constraint(Expression):
             self._linCoef[varname]['val'] = value
         else:
             self._linCoef[varname] = {'ref': var, 'val': value}
+        self._invalidate()
 
     def set_rhs(self, value):
         '''
@@ -1148,6 +1455,7 @@ class Constraint(Expression):
 
         '''
         self._linCoef['CONST']['val'] = -value
+        self._invalidate()
 
     def set_direction(self, direction):
         '''
@@ -1172,6 +1480,7 @@ class Constraint(Expression):
         '''
         if direction in ['E', 'L', 'G']:
             self._direction = direction
+            self._invalidate()
         else:
             print('WARNING: Cannot change constraint direction {} {}'.format(
                 self._name, direction))
@@ -1226,8 +1535,34 @@ class Constraint(Expression):
     def _set_info(self, parent, key):
         self._parent = parent
         self._key = key
+        self._invalidate()
 
-    def _defn(self):
+    def _invalidate(self):
+        self._defn_cache = None
+        sasoptpy.utils._record_change()
+        # Column indices of models are updated on next use
+        for m in self._models:
+            m._stale[id(self)] = self
+
+    def _is_cacheable(self):
+        '''
+        Checks if the definition depends only on concrete variables
+        '''
+        if self._operator or self._abstract:
+            return False
+        for idx, el in self._linCoef.items():
+            if idx == 'CONST':
+                continue
+            refs = el['ref'] if isinstance(el['ref'], list) else [el['ref']]
+            for ref in refs:
+                if not isinstance(ref, Variable) or ref._abstract:
+                    return False
+        return True
+
+    def _defn(self, cache=False):
+        if self._defn_cache is not None and\
+                self._defn_cache[0] == _variable_renames:
+            return self._defn_cache[1]
         s = ''
         if self._parent is None:
             s = 'con {} : '.format(self._name)
@@ -1251,6 +1586,9 @@ class Constraint(Expression):
             # if self._block:
             #     s += '\n'
             #     s += self._name + '.block = ' + str(self._block) + ';'
+        if cache and self._is_cacheable():
+            # Renaming a variable changes the definition as well
+            self._defn_cache = (_variable_renames, s)
         return(s)
 
     def __str__(self):
@@ -1353,6 +1691,13 @@ class VariableGroup:
       >>> print(repr(z[0, 'a']))
       sasoptpy.Variable(name='z_0_a', lb=0, ub=10, vartype='CONT')
 
+    * Arithmetic operators and ``<=`` and ``>=`` return an
+      :class:`ExpressionArray` object or a :class:`ConstraintGroup` object
+      keyed like the group.
+    * ``==`` compares groups by identity, so groups can be kept in lists
+      and dictionaries. Equality constraints are created from an array,
+      e.g. ``x + 0 == rhs`` or ``ExpressionArray(x) == rhs``.
+
     See also
     --------
     :func:`sasoptpy.Model.add_variables`
@@ -1578,27 +1923,46 @@ class VariableGroup:
         tabs : string, optional
             Tab string that is used in :meth:`Model.to_optmodel` method
 
+        '''
+        return ''.join(self._iter_defn(tabs=tabs))
+
+    def _iter_defn(self, tabs=''):
+        '''
+        Yields the OPTMODEL definition in parts
+
+        Notes
+        -----
+
+        - Key lists are yielded in batches of :data:`_KEY_BATCH` keys and
+          each member with its own bounds or initial value is yielded
+          separately, so the length of a part does not grow with the size
+          of the group.
+
         '''
         s = tabs + 'var {}'.format(self._name)
         s += ' {'
+        sep = ''
         for i in self._keyset:
             if isinstance(i, sasoptpy.data.Set):
-                s += '{}, '.format(i._name)
-            elif isinstance(i, list) or isinstance(i, range):
-                ind_list = []
-                for j in i:
-                    ind_list.append(sasoptpy.utils._to_quoted_string(j))
-                s += '{{{}}}, '.format(','.join(ind_list))
-            elif isinstance(i, dict):
-                s += '{{{}}}, '.format(','.join(
-                    sasoptpy.utils._to_quoted_string(j) for j in i.keys()))
+                s += sep + '{}'.format(i._name)
+            elif isinstance(i, (list, range, dict)):
+                s += sep + '{'
+                for n, j in enumerate(i.keys() if isinstance(i, dict) else i):
+                    if n:
+                        s += ','
+                        if n % _KEY_BATCH == 0:
+                            yield s
+                            s = ''
+                    s += sasoptpy.utils._to_quoted_string(j)
+                s += '}'
             else:
                 try:
-                    s += '{}, '.format(i)
+                    s += sep + '{}'.format(i)
                 except:
                     print('ERROR: VariableGroup {} has unproper index {} ({})'.
                           format(self._name, str(i), type(i)))
-        s = s[:-2]
+                    continue
+            sep = ', '
         s += '} '
         # Grab features
         CONT = sasoptpy.utils.CONT
@@ -1610,12 +1974,12 @@ class VariableGroup:
             if self._type == INT:
                 s += 'integer '
         if self._lb is not None and\
-           np.issubdtype(type(self._lb), np.number) and\
+           sasoptpy.utils._is_number(self._lb) and\
            self._lb != -inf and\
            not(self._lb == 0 and self._type == BIN):
             s += '>= {} '.format(self._lb)
         if self._ub is not None and\
-           np.issubdtype(type(self._ub), np.number) and\
+           sasoptpy.utils._is_number(self._ub) and\
            self._ub != inf and\
            not(self._ub == 1 and self._type == BIN):
             s += '<= {} '.format(self._ub)
@@ -1624,9 +1988,14 @@ class VariableGroup:
 
         s = s.rstrip()
         s += ';'
+        yield s
+        s = ''
         # Check bounds to see if they are parameters
         if self._abstract:
             for i in self._shadows:
+                if s:
+                    yield s
+                    s = ''
                 v = self._shadows[i]
                 lbparam = str(v) + '.lb' != str(v._lb)
                 ubparam = str(v) + '.ub' != str(v._ub)
@@ -1666,11 +2035,14 @@ class VariableGroup:
                     s += ';'
         else:
             for _, v in self._vardict.items():
+                if s:
+                    yield s
+                    s = ''
                 # Check if LB needs to be printed
                 printlb = False
                 defaultlb = -inf if self._type is CONT else 0
                 if v._lb is not None:
-                    if self._lb is None or not np.issubdtype(type(self._lb), np.number):
+                    if self._lb is None or not sasoptpy.utils._is_number(self._lb):
                         printlb = True
                     elif v._lb == defaultlb and (self._lb is not None and self._lb != defaultlb):
                         printlb = True
@@ -1683,7 +2055,7 @@ class VariableGroup:
                 printub = False
                 defaultub = 1 if self._type is BIN else inf
                 if v._ub is not None:
-                    if self._ub is None or not np.issubdtype(type(self._ub), np.number):
+                    if self._ub is None or not sasoptpy.utils._is_number(self._ub):
                         printub = True
                     elif v._ub == defaultub and (self._ub is not None and self._ub != defaultub):
                         printub = True
@@ -1696,8 +2068,8 @@ class VariableGroup:
                 if v._init is not None:
                     if v._init != self._init:
                         s += '\n' + tabs + '{} = {};'.format(v._expr(), v._init)
-
-        return(s)
+        if s:
+            yield s
 
     def sum(self, *argv):
         '''
@@ -1826,16 +2198,17 @@ class VariableGroup:
         '''
 
         r = Expression()
-        if isinstance(vector, list) or isinstance(vector, np.ndarray):
+        if isinstance(vector, list) or sasoptpy._lazy.isinstance_of(
+                vector, 'numpy', 'ndarray'):
             for i, key in enumerate(vector):
                 var = self._vardict[i, ]
                 r._linCoef[var._name] = {'ref': var, 'val': vector[i]}
-        elif isinstance(vector, pd.Series):
+        elif sasoptpy._lazy.isinstance_of(vector, 'pandas', 'Series'):
             for key in vector.index:
                 k = sasoptpy.utils.tuple_pack(key)
                 var = self._vardict[k]
                 r._linCoef[var._name] = {'ref': var, 'val': vector[key]}
-        elif isinstance(vector, pd.DataFrame):
+        elif sasoptpy._lazy.isinstance_of(vector, 'pandas', 'DataFrame'):
             vectorflat = sasoptpy.utils.flatten_frame(vector)
             for key in vectorflat.index:
                 k = sasoptpy.utils.tuple_pack(key)
@@ -1874,9 +2247,9 @@ class VariableGroup:
         self._init = init
         for v in self._vardict:
             inval = sasoptpy.utils.extract_list_value(v, init)
-            self._vardict[v].set_init = inval
+            self._vardict[v].set_init(inval)
         for v in self._shadows:
-            self._shadows[v].set_init = init
+            self._shadows[v].set_init(init)
 
     def set_bounds(self, lb=None, ub=None):
         '''
@@ -1910,6 +2283,7 @@ class VariableGroup:
             self._lb = lb
         if ub is not None:
             self._ub = ub
+        sasoptpy.utils._record_change()
         for v in self._vardict:
             varlb = sasoptpy.utils.extract_list_value(v, lb)
             if lb is not None:
@@ -1918,6 +2292,39 @@ class VariableGroup:
             if ub is not None:
                 self._vardict[v].set_bounds(ub=varub)
 
+    # NumPy should let groups handle operations with its objects
+    __array_ufunc__ = None
+
+    def __add__(self, other):
+        return ExpressionArray(self) + other
+
+    def __radd__(self, other):
+        return ExpressionArray(self).__radd__(other)
+
+    def __sub__(self, other):
+        return ExpressionArray(self) - other
+
+    def __rsub__(self, other):
+        return ExpressionArray(self).__rsub__(other)
+
+    def __mul__(self, other):
+        return ExpressionArray(self) * other
+
+    def __rmul__(self, other):
+        return ExpressionArray(self).__rmul__(other)
+
+    def __truediv__(self, other):
+        return ExpressionArray(self) / other
+
+    def __neg__(self):
+        return -ExpressionArray(self)
+
+    def __le__(self, other):
+        return ExpressionArray(self) <= other
+
+    def __ge__(self, other):
+        return ExpressionArray(self) >= other
+
     def __str__(self):
         '''
         Generates a representation string
@@ -2035,6 +2442,34 @@ class ConstraintGroup:
             '''
             return self._name
 
+    def _set_name(self, name):
+        '''
+        Names an unnamed group and its members
+        '''
+        for key in self._conlist:
+            keylist = sasoptpy.utils._to_iterator_expression(key)
+            conname = '{}[{}]'.format(name, ','.join(keylist))
+            conname = sasoptpy.utils.check_name(conname, 'con')
+            member = self._condict[key]
+            member._name = conname
+            member._objorder = sasoptpy.utils.register_name(conname, member)
+            member._invalidate()
+        name = sasoptpy.utils.check_name(name, 'con')
+        self._name = name
+        self._objorder = sasoptpy.utils.register_name(name, self)
+
+    def _remove_member(self, constraint):
+        '''
+        Removes a member from the group, returns True if it was a member
+        '''
+        key = constraint._key
+        if key not in self._condict or self._condict[key] is not constraint:
+            return False
+        del self._condict[key]
+        self._conlist.remove(key)
+        constraint._set_info(parent=None, key=None)
+        return True
+
     def _recursive_add_cons(self, argv, name, condict, conlist, ckeys=()):
         conctr = 0
         for idx, c in enumerate(argv):
@@ -2128,14 +2563,198 @@ class ConstraintGroup:
     def _get_keys(self):
         return list(self._condict)[0]
 
-    def _defn(self, tabs=''):
-        s = ''
+    def _defn(self, tabs='', cache=False):
+        return ''.join(self._iter_defn(tabs=tabs, cache=cache))
+
+    def _iter_defn(self, tabs='', cache=False):
+        '''
+        Yields the OPTMODEL definition of each member
+        '''
         for key_ in self._conlist:
-            s += tabs + 'con {}'.format(self._name)
-            s += sasoptpy.utils._to_optmodel_loop(key_)
-            s += ' : ' + self._condict[key_]._defn()
-            s += ';\n'
-        return s
+            member = self._condict[key_]
+            yield '{}con {}{} : {};\n'.format(
+                tabs, self._name, sasoptpy.utils._to_optmodel_loop(key_),
+                member._defn(cache=cache))
+
+    def _compact_defn(self, table, tabs=''):
+        '''
+        Returns the compact OPTMODEL definition and the coefficient table
+
+        Parameters
+        ----------
+        table : string
+            Name of the server table holding the coefficients
+        tabs : string, optional
+            Tab string that is used in :meth:`Model.to_optmodel` method
+
+        Returns
+        -------
+        tuple
+            OPTMODEL code and :class:`pandas.DataFrame` object to be
+            uploaded as ``table``, or None if members of the group are not
+            structurally identical
+
+        Notes
+        -----
+
+        - Members are structurally identical if they have the same direction
+          and no range, and refer to the same variable groups with the same
+          number of variables in each group. Keys, coefficients and RHS
+          values can differ.
+        - Coefficients are written into a table with one row for each
+          nonzero, which is read with READ DATA. A single indexed constraint
+          refers to the table instead of one statement for each member.
+
+        '''
+        if not self._conlist:
+            return None
+        direction = self._condict[self._conlist[0]]._direction
+        if direction not in ('E', 'L', 'G'):
+            return None
+
+        # Collect terms of members grouped by variable group
+        pattern = None
+        members = []
+        for key in self._conlist:
+            c = self._condict[key]
+            if c._direction != direction or c._range != 0 or\
+                    c._operator or c._abstract:
+                return None
+            terms = {}
+            for idx, el in c._linCoef.items():
+                if idx == 'CONST' or el['val'] == 0:
+                    continue
+                ref = el['ref']
+                if not isinstance(ref, Variable) or ref._abstract or\
+                        el.get('op'):
+                    return None
+                if ref._parent is not None:
+                    terms.setdefault(ref._parent._name, []).append(
+                        (el['val'], ref._key))
+                else:
+                    terms.setdefault(ref._name, []).append((el['val'], ()))
+            signature = tuple(sorted((g, len(t)) for g, t in terms.items()))
+            if pattern is None:
+                pattern = signature
+            elif signature != pattern:
+                return None
+            members.append((key, terms, -c._linCoef['CONST']['val']))
+        if not pattern:
+            return None
+
+        # Key types have to be the same for all members
+        kinds = {}
+
+        def key_types(key):
+            pytypes = tuple(map(type, key))
+            if pytypes not in kinds:
+                types = []
+                for k in key:
+                    if isinstance(k, str):
+                        types.append('str')
+                    elif sasoptpy.utils._is_number(k):
+                        types.append('num')
+                    else:
+                        types = None
+                        break
+                kinds[pytypes] = tuple(types) if types is not None else None
+            return kinds[pytypes]
+
+        row_types = key_types(members[0][0])
+        if not row_types:
+            return None
+        var_types = {}
+        for key, terms, _ in members:
+            if key_types(key) != row_types:
+                return None
+            for g, t in terms.items():
+                for _, vkey in t:
+                    vtype = key_types(vkey)
+                    if vtype is None or\
+                            var_types.setdefault(g, vtype) != vtype:
+                        return None
+
+        prefix = '_{}_'.format(self._name)
+        nrow = len(row_types)
+        rowcols = ['_K{}_'.format(i) for i in range(1, nrow+1)]
+        varcols = {}
+        for gi, (g, _) in enumerate(pattern, start=1):
+            varcols[g] = ['_X{}_{}_'.format(gi, p)
+                          for p in range(1, len(var_types[g])+1)]
+        columns = rowcols + ['_T_', '_COEF_', '_RHS_'] + [
+            col for g, _ in pattern for col in varcols[g]]
+
+        # One row for each nonzero, empty keys for other variable groups
+        empty = {'str': '', 'num': float('nan')}
+        blank = {g: [empty[t] for t in var_types[g]] for g, _ in pattern}
+        intcols = {col for g, _ in pattern
+                   for col, vtype in zip(varcols[g], var_types[g])
+                   if vtype == 'num'}
+        rows = []
+        for key, terms, rhs in members:
+            t = 0
+            for g, _ in pattern:
+                for coef, vkey in terms[g]:
+                    t += 1
+                    row = list(key) + [t, coef, rhs]
+                    for h, _ in pattern:
+                        row.extend(vkey if h == g else blank[h])
+                    rows.append(row)
+                    for col, k in zip(varcols[g], vkey):
+                        if col in intcols and not isinstance(
+                                k, numbers.Integral):
+                            intcols.discard(col)
+        df = pd.DataFrame(rows, columns=columns)
+        # Blank keys turn integer columns into floats, restore them
+        for col in intcols:
+            df[col] = df[col].astype(
+                'Int64' if df[col].isnull().any() else 'int64')
+
+        dummies = ['_r{}'.format(i) for i in range(1, nrow+1)]
+        rowidx = ', '.join(dummies)
+        s = tabs + 'set <{}> {}terms_;\n'.format(
+            ','.join(row_types + ('num',)), prefix)
+        s += tabs + 'set {0}rows_ = setof {{<{1}, _t> in {0}terms_}} ' \
+                    '<{1}>;\n'.format(prefix, rowidx)
+        s += tabs + 'num {0}coef_ {{{0}terms_}};\n'.format(prefix)
+        s += tabs + 'num {0}rhs_ {{{0}rows_}};\n'.format(prefix)
+        reads = ['{}coef_=_COEF_'.format(prefix)]
+        for gi, (g, _) in enumerate(pattern, start=1):
+            for p, (vtype, col) in enumerate(
+                    zip(var_types[g], varcols[g]), start=1):
+                param = '{}x{}_{}_'.format(prefix, gi, p)
+                s += tabs + '{} {} {{{}terms_}};\n'.format(
+                    vtype, param, prefix)
+                reads.append('{}={}'.format(param, col))
+        s += tabs + 'read data {} into {}terms_=[{} _T_] {};\n'.format(
+            table, prefix, ' '.join(rowcols), ' '.join(reads))
+        s += tabs + 'read data {} into [{}] {}rhs_=_RHS_;\n'.format(
+            table, ' '.join(rowcols), prefix)
+
+        # Body of the indexed constraint
+        body = []
+        t = 0
+        for gi, (g, count) in enumerate(pattern, start=1):
+            # Term index is fixed for a single variable
+            idx = '{}, {}'.format(rowidx, t+1 if count == 1 else '_t')
+            if var_types[g]:
+                ref = '{}[{}]'.format(g, ', '.join(
+                    '{}x{}_{}_[{}]'.format(prefix, gi, p, idx)
+                    for p in range(1, len(var_types[g])+1)))
+            else:
+                ref = g
+            term = '{}coef_[{}] * {}'.format(prefix, idx, ref)
+            if count == 1:
+                body.append(term)
+            else:
+                body.append('sum {{_t in {}..{}}} {}'.format(
+                    t+1, t+count, term))
+            t += count
+        sign = {'E': '=', 'L': '<=', 'G': '>='}[direction]
+        s += tabs + 'con {} {{<{}> in {}rows_}} : {} {} {}rhs_[{}];\n'.format(
+            self._name, rowidx, prefix, ' + '.join(body), sign, prefix,
+            rowidx)
+        return s, df
 
     def __str__(self):
         '''
@@ -2159,3 +2778,322 @@ class ConstraintGroup:
         s += '], '
         s += 'name=\'{}\')'.format(self._name)
         return s
+
+
+class ExpressionArray:
+    '''
+    Creates a keyed array of linear expressions
+
+    Parameters
+    ----------
+    group : :class:`VariableGroup` object, optional
+        Variable group whose members form the array
+    keys : list, optional
+        Keys of the array, if no group is given
+
+    Examples
+    --------
+
+    >>> x = m.add_variables(['a', 'b', 'c'], name='x', lb=0)
+    >>> y = m.add_variables(['a', 'b', 'c'], name='y', lb=0)
+    >>> cap = pd.Series([5, 10, 15], index=['a', 'b', 'c'])
+    >>> e = x + 2 * y
+    >>> print(e['b'])
+    x[b] + 2 * y[b]
+    >>> c = m.add_constraints(e <= cap, name='cap')
+    >>> print(c['b'])
+    x[b] + 2 * y[b] <=  10
+
+    Notes
+    -----
+
+    - Arrays are created by arithmetic on :class:`VariableGroup` objects,
+      they are rarely created directly.
+    - Arrays are added to each other by key. Keys missing in one of them
+      have no terms in that operand.
+    - Scalars, :class:`Expression` objects, dictionaries and
+      :class:`pandas.Series` objects can be added, subtracted and
+      multiplied with arrays. Values of dictionaries and Series are aligned
+      on the keys of the array, and missing values are taken as zero.
+    - When an array is compared with a dictionary or Series, every key of
+      the array needs a value; missing and NaN values raise a KeyError.
+    - Comparing an array with ``<=``, ``>=`` or ``==`` returns a
+      :class:`ConstraintGroup`, which can be passed to
+      :meth:`Model.add_constraints`. Variable groups support ``<=`` and
+      ``>=`` only, see :class:`VariableGroup`.
+    - Terms are stored as blocks of (row, variable, coefficient) lists, so
+      operations only create new lists; rows are built once when the array
+      is compared or summed. Terms of each row are indexed on the first key
+      lookup.
+    - Put the array or group on the left of NumPy and pandas objects,
+      e.g. ``x * cost`` instead of ``cost * x``.
+
+    '''
+
+    # NumPy should let arrays handle operations with its objects
+    __array_ufunc__ = None
+
+    def __init__(self, group=None, keys=None):
+        self._blocks = []
+        if group is not None:
+            if group._abstract:
+                raise ValueError('Abstract variable group {} cannot be used '
+                                 'in an array.'.format(group._name))
+            keys = list(group._vardict)
+            self._blocks.append((list(range(len(keys))),
+                                 list(group._vardict.values()),
+                                 [1] * len(keys)))
+        elif keys is not None:
+            keys = [sasoptpy.utils.tuple_pack(k) for k in keys]
+        else:
+            keys = []
+        self._keys = keys
+        self._pos = {k: i for i, k in enumerate(keys)}
+        self._const = [0] * len(keys)
+        self._index = None
+
+    def _new(self, blocks, const):
+        r = ExpressionArray()
+        r._keys = self._keys
+        r._pos = self._pos
+        r._blocks = blocks
+        r._const = const
+        return r
+
+    def _values(self, other, strict=False):
+        '''
+        Returns values of a scalar, dictionary or Series for each key
+
+        Missing values are taken as zero, or raise a KeyError if ``strict``
+        is True
+        '''
+        if sasoptpy.utils._is_number(other):
+            return [other] * len(self._keys)
+        if isinstance(other, dict):
+            lookup = other
+        elif sasoptpy._lazy.isinstance_of(other, 'pandas', 'Series'):
+            lookup = other.to_dict()
+        elif sasoptpy._lazy.isinstance_of(other, 'pandas', 'DataFrame'):
+            lookup = sasoptpy.utils.flatten_frame(other).to_dict()
+        else:
+            return None
+        unpack = sasoptpy.utils.tuple_unpack
+        if not strict:
+            return [lookup.get(unpack(k), 0) for k in self._keys]
+        values = [lookup.get(unpack(k)) for k in self._keys]
+        # NaN values are missing as well
+        missing = [unpack(k) for k, v in zip(self._keys, values)
+                   if v is None or v != v]
+        if missing:
+            raise KeyError('Right-hand side has no values for keys {}'.format(
+                missing[:5]))
+        return values
+
+    def _scale(self, factor):
+        if sasoptpy.utils._is_number(factor):
+            blocks = [(rows, var, [c * factor for c in coef])
+                      for rows, var, coef in self._blocks]
+            return self._new(blocks, [c * factor for c in self._const])
+        values = self._values(factor)
+        if values is None:
+            return NotImplemented
+        blocks = [(rows, var, [c * values[r] for r, c in zip(rows, coef)])
+                  for rows, var, coef in self._blocks]
+        return self._new(blocks, [c * f for c, f in
+                                  zip(self._const, values)])
+
+    def _add(self, other, sign=1, strict=False):
+        if isinstance(other, VariableGroup):
+            other = ExpressionArray(other)
+        if isinstance(other, ExpressionArray):
+            return self._merge(other, sign)
+        if isinstance(other, Expression):
+            return self._broadcast(other, sign)
+        values = self._values(other, strict=strict)
+        if values is None:
+            return NotImplemented
+        return self._new(list(self._blocks), [c + sign * v for c, v in
+                                              zip(self._const, values)])
+
+    def _merge(self, other, sign):
+        keys = self._keys
+        pos = self._pos
+        const = list(self._const)
+        remap = []
+        for k in other._keys:
+            i = pos.get(k)
+            if i is None:
+                if keys is self._keys:
+                    keys = list(keys)
+                    pos = dict(pos)
+                i = len(keys)
+                keys.append(k)
+                pos[k] = i
+                const.append(0)
+            remap.append(i)
+        for j, c in enumerate(other._const):
+            const[remap[j]] += sign * c
+        blocks = list(self._blocks)
+        for rows, var, coef in other._blocks:
+            blocks.append(([remap[r] for r in rows], var,
+                           coef if sign == 1 else [-c for c in coef]))
+        r = self._new(blocks, const)
+        r._keys = keys
+        r._pos = pos
+        return r
+
+    def _broadcast(self, other, sign):
+        if other._operator is not None or other._abstract:
+            raise TypeError('Only linear expressions can be added to an '
+                            'array.')
+        n = len(self._keys)
+        rows = list(range(n))
+        blocks = list(self._blocks)
+        const = self._const
+        for v in other._linCoef.values():
+            if v['ref'] is None:
+                const = [c + sign * v['val'] for c in const]
+            elif isinstance(v['ref'], Variable) and v.get('op') is None:
+                blocks.append((rows, [v['ref']] * n, [sign * v['val']] * n))
+            else:
+                raise TypeError('Only linear expressions can be added to an '
+                                'array.')
+        return self._new(blocks, list(const))
+
+    def _rows(self):
+        '''
+        Returns the coefficient dictionary of each row
+        '''
+        lin = [{} for _ in self._keys]
+        for rows, var, coef in self._blocks:
+            for r, v, c in zip(rows, var, coef):
+                d = lin[r]
+                el = d.get(v._name)
+                if el is None:
+                    d[v._name] = {'ref': v, 'val': c}
+                else:
+                    el['val'] += c
+        for d, c in zip(lin, self._const):
+            d['CONST'] = {'ref': None, 'val': c}
+        return lin
+
+    def _relational(self, other, direction):
+        crange = 0
+        if isinstance(other, list) and direction == 'E':
+            crange = abs(other[1] - other[0])
+            other = min(other[0], other[1])
+        diff = self._add(other, -1, strict=True)
+        if diff is NotImplemented:
+            return NotImplemented
+        cg = ConstraintGroup(None, name=None)
+        # Rows share a single carrier, constraints take over its dictionary
+        carrier = Expression()
+        for key, lin in zip(diff._keys, diff._rows()):
+            carrier._linCoef = lin
+            cg._condict[key] = Constraint(exp=carrier, direction=direction,
+                                          crange=crange)
+        cg._conlist = list(diff._keys)
+        cg._set_con_info()
+        return cg
+
+    def get_keys(self):
+        '''
+        Returns the keys of the array
+
+        Returns
+        -------
+        list
+            Keys of the rows as tuples
+        '''
+        return list(self._keys)
+
+    def sum(self):
+        '''
+        Returns the sum of all rows as an :class:`Expression` object
+        '''
+        r = Expression()
+        lin = r._linCoef
+        for _, var, coef in self._blocks:
+            for v, c in zip(var, coef):
+                el = lin.get(v._name)
+                if el is None:
+                    lin[v._name] = {'ref': v, 'val': c}
+                else:
+                    el['val'] += c
+        lin['CONST']['val'] = sum(self._const)
+        return r
+
+    def _row_index(self):
+        '''
+        Returns the (variable, coefficient) pairs of each row
+        '''
+        if self._index is None:
+            index = [[] for _ in self._keys]
+            for rows, var, coef in self._blocks:
+                for r, v, c in zip(rows, var, coef):
+                    index[r].append((v, c))
+            self._index = index
+        return self._index
+
+    def __getitem__(self, key):
+        i = self._pos[sasoptpy.utils.tuple_pack(key)]
+        r = Expression()
+        lin = r._linCoef
+        for v, c in self._row_index()[i]:
+            el = lin.get(v._name)
+            if el is None:
+                lin[v._name] = {'ref': v, 'val': c}
+            else:
+                el['val'] += c
+        lin['CONST']['val'] = self._const[i]
+        return r
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __add__(self, other):
+        return self._add(other)
+
+    def __radd__(self, other):
+        return self._add(other)
+
+    def __sub__(self, other):
+        return self._add(other, -1)
+
+    def __rsub__(self, other):
+        return self._scale(-1)._add(other)
+
+    def __mul__(self, other):
+        return self._scale(other)
+
+    def __rmul__(self, other):
+        return self._scale(other)
+
+    def __truediv__(self, other):
+        if sasoptpy.utils._is_number(other):
+            return self._scale(1 / other)
+        return NotImplemented
+
+    def __neg__(self):
+        return self._scale(-1)
+
+    def __le__(self, other):
+        return self._relational(other, 'L')
+
+    def __ge__(self, other):
+        return self._relational(other, 'G')
+
+    def __eq__(self, other):
+        return self._relational(other, 'E')
+
+    def __str__(self):
+        s = 'Expression Array [\n'
+        for k in self._keys:
+            s += '  [{}: {}]\n'.format(sasoptpy.utils.tuple_unpack(k),
+                                       self[k])
+        s += ']'
+        return s
+
+    def __repr__(self):
+        return 'sasoptpy.ExpressionArray(keys={}, blocks={})'.format(
+            len(self._keys), len(self._blocks))
@@ -0,0 +1,573 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Concurrency includes the worker pool behind :meth:`Model.solve_async` and
+:func:`solve_all`, and :class:`SessionPool` for fanning out solves
+
+'''
+
+import concurrent.futures
+import sys
+import threading
+import time
+import weakref
+
+import sasoptpy.report
+
+
+# Default number of workers in the shared executor
+DEFAULT_MAX_WORKERS = 4
+
+__executor = None
+__executor_workers = DEFAULT_MAX_WORKERS
+__executor_lock = threading.Lock()
+
+# Locks serializing server calls of each session, dropped with the session
+__session_locks = weakref.WeakKeyDictionary()
+
+# Locks of sessions that cannot be weakly referenced, keyed by id
+__session_locks_by_id = {}
+
+# Future of the solve running on the current thread
+__current = threading.local()
+
+
+class SolveCancelled(concurrent.futures.CancelledError):
+    '''
+    Raised inside a worker when its solve is cancelled between phases
+    '''
+    pass
+
+
+class SolveTimeout(concurrent.futures.TimeoutError):
+    '''
+    Raised inside a worker when its solve passes the deadline
+    '''
+    pass
+
+
+class SolveFuture(concurrent.futures.Future):
+    '''
+    Future of an asynchronous solve
+
+    Parameters
+    ----------
+    model : :class:`Model` object
+        Model being solved
+    timeout : float, optional
+        Time limit in seconds, measured from the submission
+
+    Notes
+    -----
+
+    - Unlike :class:`concurrent.futures.Future`, a running solve can be
+      cancelled. Cancellation is cooperative: the worker stops at the next
+      phase boundary (after conversion, upload or solve) and the future
+      raises :class:`SolveCancelled`.
+    - Use :func:`asyncio.wrap_future` to await the future in a coroutine.
+
+    '''
+
+    def __init__(self, model, timeout=None):
+        super().__init__()
+        self.model = model
+        self._cancel_event = threading.Event()
+        if timeout is not None:
+            self._deadline = time.monotonic() + timeout
+        else:
+            self._deadline = None
+
+    def cancel(self):
+        '''
+        Cancels the solve, returns False if it is already finished
+        '''
+        if super().cancel():
+            return True
+        if self.done():
+            return False
+        self._cancel_event.set()
+        return True
+
+    def cancel_requested(self):
+        '''
+        Returns True if cancellation of a running solve is requested
+        '''
+        return self._cancel_event.is_set()
+
+    def check(self):
+        '''
+        Raises an exception if the solve is cancelled or timed out
+        '''
+        if self._cancel_event.is_set():
+            raise SolveCancelled('Solve of model {} is cancelled.'.format(
+                self.model._name))
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            raise SolveTimeout('Solve of model {} is timed out.'.format(
+                self.model._name))
+
+
+def get_executor():
+    '''
+    Returns the shared executor used by :meth:`Model.solve_async`
+    '''
+    global __executor
+    with __executor_lock:
+        if __executor is None:
+            __executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=__executor_workers)
+        return __executor
+
+
+def set_max_workers(max_workers):
+    '''
+    Sets the number of workers in the shared executor
+
+    Parameters
+    ----------
+    max_workers : int
+        Maximum number of models being solved at the same time
+
+    Notes
+    -----
+
+    - Solves already submitted to the previous executor are not affected.
+
+    '''
+    global __executor, __executor_workers
+    with __executor_lock:
+        old = __executor
+        __executor = None
+        __executor_workers = max_workers
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+def session_lock(session):
+    '''
+    Returns the lock that serializes server calls on a session
+
+    Parameters
+    ----------
+    session : object
+        Session object of a model
+    '''
+    with __executor_lock:
+        try:
+            lock = __session_locks.get(session)
+            if lock is None:
+                lock = threading.RLock()
+                __session_locks[session] = lock
+            return lock
+        except TypeError:
+            pass
+        key = id(session)
+        entry = __session_locks_by_id.get(key)
+        if entry is None or entry[0] is not session:
+            entry = (session, threading.RLock())
+            __session_locks_by_id[key] = entry
+        return entry[1]
+
+
+def checkpoint():
+    '''
+    Stops the current solve if it is cancelled or timed out
+
+    Notes
+    -----
+
+    - This function is called between solve phases and does nothing
+      outside of :meth:`Model.solve_async`.
+
+    '''
+    future = getattr(__current, 'future', None)
+    if future is not None:
+        future.check()
+
+
+def submit_solve(model, executor=None, timeout=None, solver=None,
+                 **kwargs):
+    '''
+    Submits the solve of a model to an executor
+
+    Parameters
+    ----------
+    model : :class:`Model` object
+        Model to be solved
+    executor : :class:`concurrent.futures.Executor`, optional
+        Executor to run the solve, the shared executor by default
+    timeout : float, optional
+        Time limit in seconds
+    solver : function, optional
+        Function called with kwargs to solve the model, :meth:`Model.solve`
+        by default
+    kwargs :
+        Arguments passed to :meth:`Model.solve`
+
+    Returns
+    -------
+    :class:`SolveFuture` object
+        Future of the solve
+    '''
+    if executor is None:
+        executor = get_executor()
+    if solver is None:
+        solver = model.solve
+    future = SolveFuture(model, timeout=timeout)
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        __current.future = future
+        try:
+            future.check()
+            result = solver(**kwargs)
+            future.check()
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            __current.future = None
+
+    executor.submit(run)
+    return future
+
+
+def solve_all(models, max_concurrency=DEFAULT_MAX_WORKERS, timeout=None,
+              pool=None, **kwargs):
+    '''
+    Solves a list of models concurrently
+
+    Parameters
+    ----------
+    models : list
+        List of :class:`Model` objects
+    max_concurrency : int, optional
+        Maximum number of models being solved at the same time
+    timeout : float, optional
+        Time limit in seconds for all solves
+    pool : :class:`SessionPool`, optional
+        Pool of sessions the models are dispatched to
+    kwargs :
+        Arguments passed to :meth:`Model.solve` of each model
+
+    Returns
+    -------
+    list
+        Results of :meth:`Model.solve` in the order of the models
+
+    Examples
+    --------
+
+    >>> results = so.solve_all([m1, m2, m3], max_concurrency=2,
+    ...                        options={'maxtime': 60})
+
+    Notes
+    -----
+
+    - Client-side conversion of a model runs while the server solves
+      others. Calls on a shared session are serialized, so models should
+      use separate sessions to solve on the server at the same time.
+    - If a solve fails, the remaining solves are cancelled and the
+      exception is raised.
+    - If the time limit passes, the remaining solves are cancelled and
+      :class:`concurrent.futures.TimeoutError` is raised.
+    - In both cases the function returns without waiting for running
+      solves, which stop at their next phase boundary.
+
+    '''
+    if timeout is not None:
+        deadline = time.monotonic() + timeout
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_concurrency)
+    futures = []
+    try:
+        for m in models:
+            solver = _pool_solver(pool, m) if pool is not None else None
+            futures.append(submit_solve(m, executor=executor, timeout=timeout,
+                                        solver=solver, **kwargs))
+        results = []
+        for f in futures:
+            if timeout is not None:
+                remaining = max(deadline - time.monotonic(), 0)
+                results.append(f.result(timeout=remaining))
+            else:
+                results.append(f.result())
+    except BaseException:
+        # Running solves stop at their next phase boundary in background
+        for f in futures:
+            f.cancel()
+        _shutdown_now(executor)
+        raise
+    executor.shutdown(wait=True)
+    return results
+
+
+def _shutdown_now(executor):
+    '''
+    Shuts an executor down without waiting for its running tasks
+    '''
+    if sys.version_info >= (3, 9):
+        executor.shutdown(wait=False, cancel_futures=True)
+    else:
+        executor.shutdown(wait=False)
+
+
+def _close_session(session):
+    try:
+        session.close()
+    except Exception:
+        pass
+
+
+def _pool_solver(pool, model):
+    def solver(**kwargs):
+        return pool.solve(model, **kwargs)
+    return solver
+
+
+class _PoolSlot:
+    '''
+    Session of a :class:`SessionPool` and its counters
+    '''
+
+    def __init__(self, number, session):
+        self.number = number
+        self.session = session
+        self.leases = 0
+        self.solves = 0
+        self.failures = 0
+        self.reconnects = 0
+        self.busy_time = 0.0
+
+
+class SessionPool:
+    '''
+    Pool of sessions that solves are dispatched to
+
+    Parameters
+    ----------
+    factory : function
+        Function without arguments returning a new session
+    size : int, optional
+        Number of sessions in the pool
+    retries : int, optional
+        Number of times a failed solve is retried on a reconnected session
+
+    Examples
+    --------
+
+    >>> pool = so.SessionPool(lambda: swat.CAS(host, port), size=4)
+    >>> results = so.solve_all(models, max_concurrency=8, pool=pool)
+    >>> print(pool.get_metrics())
+             solves  failures  reconnects  busy_time  throughput  queue
+    session
+    0           125         0           0     10.212      12.240      0
+    1           125         1           1     10.975      11.389      0
+    ...
+    >>> pool.close()
+
+    Notes
+    -----
+
+    - Each solve leases the session with the fewest solves in flight.
+      The model session is replaced during the solve and restored after.
+    - Solves on the same session wait for each other only during server
+      calls, see :meth:`Model.solve_async`.
+    - When a solve raises an exception other than cancellation, the
+      session is replaced with a new one from the factory and the solve is
+      retried. If the factory fails, the session is left out of the pool
+      until a solve finds no other session and creates it again.
+    - Local stand-in sessions can be used for testing, e.g.
+      ``so.SessionPool(so.LocalSession, size=4)``.
+
+    '''
+
+    def __init__(self, factory, size=2, retries=1):
+        self._factory = factory
+        self._retries = retries
+        self._lock = threading.Lock()
+        self._slots = [_PoolSlot(i, factory()) for i in range(size)]
+        self._start = time.monotonic()
+
+    @property
+    def sessions(self):
+        '''
+        List of sessions in the pool
+        '''
+        return [slot.session for slot in self._slots]
+
+    def _lease(self):
+        with self._lock:
+            slots = [s for s in self._slots if s.session is not None]
+            slot = min(slots or self._slots,
+                       key=lambda s: (s.leases, s.solves))
+            slot.leases += 1
+            if slot.session is not None:
+                return slot
+        # All sessions failed to reconnect, try again for this solve
+        try:
+            session = self._factory()
+        except BaseException:
+            with self._lock:
+                slot.leases -= 1
+            raise
+        with self._lock:
+            if slot.session is None:
+                slot.session = session
+                return slot
+        _close_session(session)
+        return slot
+
+    def _release(self, slot, elapsed, failed):
+        with self._lock:
+            slot.leases -= 1
+            slot.busy_time += elapsed
+            if failed:
+                slot.failures += 1
+            else:
+                slot.solves += 1
+
+    def _reconnect(self, slot, session):
+        with self._lock:
+            # Another solve might have replaced the session already
+            if slot.session is not session:
+                return
+            slot.reconnects += 1
+            # Slot is not leased until a new session is created
+            slot.session = None
+        _close_session(session)
+        try:
+            new_session = self._factory()
+        except Exception as e:
+            sasoptpy.report.logger.warning(
+                'Session {} could not be reconnected: {}'.format(
+                    slot.number, e))
+            return
+        with self._lock:
+            slot.session = new_session
+
+    def solve(self, model, **kwargs):
+        '''
+        Solves a model on the least-loaded session of the pool
+
+        Parameters
+        ----------
+        model : :class:`Model` object
+            Model to be solved
+        kwargs :
+            Arguments passed to :meth:`Model.solve`
+
+        Returns
+        -------
+        object
+            Return value of :meth:`Model.solve`
+        '''
+        attempt = 0
+        while True:
+            slot = self._lease()
+            session = slot.session
+            original = model._session
+            model._session = session
+            start = time.monotonic()
+            try:
+                result = model.solve(**kwargs)
+            except concurrent.futures.CancelledError:
+                self._release(slot, time.monotonic() - start, False)
+                raise
+            except concurrent.futures.TimeoutError:
+                self._release(slot, time.monotonic() - start, False)
+                raise
+            except Exception as e:
+                self._release(slot, time.monotonic() - start, True)
+                sasoptpy.report.logger.warning(
+                    'Solve of model {} failed on session {}: {}'.format(
+                        model._name, slot.number, e))
+                self._reconnect(slot, session)
+                attempt += 1
+                if attempt > self._retries:
+                    raise
+                continue
+            else:
+                self._release(slot, time.monotonic() - start, False)
+                return result
+            finally:
+                model._session = original
+
+    def submit(self, model, timeout=None, **kwargs):
+        '''
+        Solves a model on the pool asynchronously
+
+        Returns
+        -------
+        :class:`SolveFuture` object
+            Future of the solve
+
+        See also
+        --------
+        :meth:`Model.solve_async`
+        '''
+        return submit_solve(model, timeout=timeout,
+                            solver=_pool_solver(self, model), **kwargs)
+
+    def get_metrics(self):
+        '''
+        Returns solve counts, busy time, throughput and queue length of each
+        session
+
+        Returns
+        -------
+        :class:`pandas.DataFrame` object
+            Metrics, indexed by session number
+
+        Notes
+        -----
+
+        - Throughput is the number of successful solves per minute since
+          the pool is created.
+        - Queue is the number of solves currently leasing the session.
+
+        '''
+        import pandas as pd
+        elapsed = max(time.monotonic() - self._start, 1e-9)
+        with self._lock:
+            rows = [[s.number, s.solves, s.failures, s.reconnects,
+                     s.busy_time, s.solves * 60.0 / elapsed, s.leases]
+                    for s in self._slots]
+        df = pd.DataFrame(rows, columns=['session', 'solves', 'failures',
+                                         'reconnects', 'busy_time',
+                                         'throughput', 'queue'])
+        return df.set_index(['session'])
+
+    def close(self):
+        '''
+        Closes all sessions of the pool
+        '''
+        for session in self.sessions:
+            if session is not None:
+                _close_session(session)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return 'sasoptpy.SessionPool(size={})'.format(len(self._slots))
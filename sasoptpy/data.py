@@ -87,8 +87,10 @@ class Parameter:
     def __setitem__(self, key, item):
         pv = self[key]
         pv._assign = item
+        sasoptpy.utils._record_change()
 
     def _set_loop(self, source, keyset, colname=None, index=None):
+        sasoptpy.utils._record_change()
         self._source = source
         self._keyset = keyset
         self._colname = colname
@@ -174,6 +176,7 @@ class Parameter:
 
     def set_init(self, val):
         self._init = val
+        sasoptpy.utils._record_change()
 
     def __str__(self):
         return self._name
@@ -299,13 +302,18 @@ class Set(sasoptpy.components.Expression):
         super().__init__()
         self._name = sasoptpy.utils.check_name(name, 'set')
         self._objorder = sasoptpy.utils.register_name(self._name, self)
+        self._members = None
+        self._range = None
+        self._source = None
         if init:
             if isinstance(init, range):
-                newinit = str(init.start) + '..' + str(init.stop)
+                self._members = list(init)
+                newinit = str(init.start) + '..' + str(init[-1])
                 if init.step != 1:
-                    newinit = ' by ' + init.step
+                    newinit += ' by ' + str(init.step)
                 init = newinit
             elif isinstance(init, list):
+                self._members = list(init)
                 init = '[' + ' '.join([str(i) for i in init]) + ']'
         self._init = init
         self._type = sasoptpy.utils.list_pack(settype)
@@ -729,6 +737,7 @@ class Statement:
         self._name = sasoptpy.utils.check_name(None, None)
         self._objorder = sasoptpy.utils.register_name(self._name, self)
         self._after = after_solve
+        self._source = None
 
     def _defn(self):
         return self.statement
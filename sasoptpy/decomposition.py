@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Decomposition includes :func:`connected_components` and the linking row
+search used by :meth:`Model.detect_blocks` for finding decomposition
+blocks of constraints
+
+'''
+
+
+def connected_components(rows, ncols):
+    '''
+    Groups rows that are connected through shared columns
+
+    Parameters
+    ----------
+    rows : list
+        List of rows, where each row is a list of column indices
+    ncols : int
+        Number of columns
+
+    Returns
+    -------
+    list
+        Block number of each row, or None for empty rows. Blocks are
+        numbered in the order of their first rows.
+
+    Examples
+    --------
+
+    >>> print(so.connected_components([[0, 1], [2], [1, 3], []], 4))
+    [0, 1, 0, None]
+
+    Notes
+    -----
+
+    - Components are found using a union-find structure with path
+      compression, in near-linear time of the number of nonzeros.
+    - A custom partitioner for :meth:`Model.detect_blocks` should accept
+      the same arguments and return block numbers in the same format.
+
+    '''
+    parent = list(range(ncols))
+
+    def find(i):
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    for row in rows:
+        if not row:
+            continue
+        root = find(row[0])
+        for j in row[1:]:
+            other = find(j)
+            if other != root:
+                parent[other] = root
+    labels = {}
+    blocks = []
+    for row in rows:
+        if row:
+            blocks.append(labels.setdefault(find(row[0]), len(labels)))
+        else:
+            blocks.append(None)
+    return blocks
+
+
+def _count_blocks(blocks):
+    return len(set(blocks) - {None})
+
+
+def _find_blocks(rows, ncols, candidates, partitioner):
+    '''
+    Finds blocks of rows, removing a set of linking rows if needed
+
+    Parameters
+    ----------
+    rows : list
+        List of rows, where each row is a list of column indices
+    ncols : int
+        Number of columns
+    candidates : list
+        List of sets of row positions that can be used as linking rows
+    partitioner : function
+        Function returning block numbers of rows
+
+    Returns
+    -------
+    tuple
+        Block numbers of rows and set of positions of linking rows
+
+    Notes
+    -----
+
+    - If the rows already form more than one block, no row is linking.
+      Otherwise, each candidate is removed in turn and the one giving the
+      most blocks is chosen, preferring smaller candidates for ties.
+
+    '''
+    blocks = partitioner(rows, ncols)
+    if _count_blocks(blocks) > 1:
+        return blocks, set()
+    best = (_count_blocks(blocks), 0)
+    best_blocks = blocks
+    best_linking = set()
+    for linking in candidates:
+        if len(linking) == len(rows):
+            continue
+        reduced = [[] if i in linking else row for i, row in enumerate(rows)]
+        trial = partitioner(reduced, ncols)
+        score = (_count_blocks(trial), -len(linking))
+        if score > best:
+            best = score
+            best_blocks = trial
+            best_linking = linking
+    blocks = [None if i in best_linking else b
+              for i, b in enumerate(best_blocks)]
+    return blocks, best_linking
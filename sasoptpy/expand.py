@@ -0,0 +1,644 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Expand includes :func:`expand_model` for evaluating abstract models, which
+use :class:`Set` and :class:`Parameter` objects, against local data
+
+'''
+
+from itertools import product
+import operator
+
+import sasoptpy._lazy
+import sasoptpy.components
+import sasoptpy.data
+import sasoptpy.utils
+
+
+class ExpansionError(ValueError):
+    '''
+    Raised when a model cannot be expanded using local data
+    '''
+    pass
+
+
+# Comparison operators of SetIterator conditions
+_COMPARISONS = {'=': operator.eq, '<=': operator.le, '<': operator.lt,
+                '>=': operator.ge, '>': operator.gt, 'NE': operator.ne}
+
+
+def _normalize(value):
+    '''
+    Converts integral floats into integers, so keys match set members
+    '''
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _flat_key(values):
+    return tuple(_normalize(v)
+                 for v in sasoptpy.utils.flatten_tuple(tuple(values)))
+
+
+def _is_abstract(exp):
+    '''
+    Checks if an expression refers to sets, parameters or iterators
+    '''
+    if exp._abstract or exp._operator is not None:
+        return True
+    for el in exp._linCoef.values():
+        refs = el['ref'] if isinstance(el['ref'], list) else [el['ref']]
+        for ref in refs:
+            if isinstance(ref, (sasoptpy.data.SetIterator,
+                                sasoptpy.data.ParameterValue)):
+                return True
+            if isinstance(ref, sasoptpy.components.Expression) and\
+                    (ref._abstract or ref._operator is not None):
+                return True
+    return False
+
+
+def _degree(exp):
+    '''
+    Returns the degree of an expression in its variables, treating sets,
+    parameters and iterators as constants, or None if it is not linear
+    '''
+    if isinstance(exp, sasoptpy.components.Variable):
+        return 1
+    if isinstance(exp, (sasoptpy.data.SetIterator,
+                        sasoptpy.data.ParameterValue)):
+        return 0
+    if isinstance(exp, sasoptpy.data.Set):
+        return None
+    if exp._operator is not None and (
+            exp._operator != 'sum' or exp._arguments):
+        return None
+    degree = 0
+    for el in exp._linCoef.values():
+        if el.get('op') is not None:
+            return None
+        refs = el['ref'] if isinstance(el['ref'], list) else [el['ref']]
+        term = 0
+        for ref in refs:
+            if ref is None:
+                continue
+            d = _degree(ref)
+            if d is None:
+                return None
+            term += d
+        if term > 1:
+            return None
+        degree = max(degree, term)
+    return degree
+
+
+def _is_linear_model(model):
+    '''
+    Checks if constraints and objective of an abstract model are linear
+    '''
+    return all(_degree(c) is not None for c in model._constraints) and\
+        _degree(model._objective) is not None
+
+
+class Expander:
+    '''
+    Evaluates abstract components of a model against local data
+
+    Parameters
+    ----------
+    model : :class:`Model` object
+        Abstract model to be evaluated
+    data : dict, optional
+        Values of sets and parameters, keyed by the objects or their names
+
+    Notes
+    -----
+
+    - Values of sets and parameters are computed once and cached, so an
+      expander should not be reused after the data changes.
+    - Iterator bindings are kept in dictionaries keyed by the id of each
+      :class:`SetIterator` object.
+
+    '''
+
+    def __init__(self, model, data=None):
+        self._model = model
+        self._data = {}
+        for k, v in (data or {}).items():
+            if isinstance(k, sasoptpy.data.ParameterValue):
+                k = k._ref
+            self._data[k if isinstance(k, str) else k._name] = v
+        self._sets = {}
+        self._params = {}
+        self._domains = {}
+        self._groups = {}
+        for g in model._vargroups:
+            for sh in g._shadows.values():
+                self._groups[id(sh)] = g
+
+    # Sets
+
+    def set_values(self, s):
+        '''
+        Returns the members of a set as a list
+        '''
+        if not isinstance(s, sasoptpy.data.Set):
+            return [_normalize(i) for i in
+                    sasoptpy.utils.extract_argument_as_list(s)]
+        try:
+            return self._sets[s._name]
+        except KeyError:
+            pass
+        if s._name in self._data:
+            values = list(self._data[s._name])
+        elif s._members is not None:
+            values = list(s._members)
+        elif s._range is not None:
+            start, stop, step = (self.value(i, {}) for i in s._range)
+            values = list(range(start, stop + 1, step))
+        elif s._source is not None:
+            values = self._read_set(s)
+        else:
+            raise ExpansionError('Set {} has no local data.'.format(s._name))
+        if len(s._type) > 1:
+            values = [_flat_key(i) for i in values]
+        else:
+            values = [_normalize(i) for i in values]
+        self._sets[s._name] = values
+        return values
+
+    def _local_frame(self, obj):
+        table = obj._source
+        if not sasoptpy._lazy.isinstance_of(table, 'pandas', 'DataFrame'):
+            raise ExpansionError('Data of {} is stored on the server.'.format(
+                obj._name))
+        return table
+
+    def _read_set(self, s):
+        df = self._local_frame(s)
+        keys = sasoptpy.utils.list_pack(s._colname)
+        if keys == ['_N_']:
+            return list(range(1, len(df) + 1))
+        if any(c not in df.columns for c in keys):
+            df = df.reset_index()
+        if len(keys) == 1:
+            rows = df[keys[0]].tolist()
+        else:
+            rows = list(zip(*(df[c].tolist() for c in keys)))
+        return list(dict.fromkeys(rows))
+
+    # Parameters
+
+    def _param_table(self, p):
+        '''
+        Returns the default value and a dictionary of values of a parameter
+        '''
+        try:
+            return self._params[p._name]
+        except KeyError:
+            pass
+        default = None
+        values = {}
+        if p._init is not None:
+            default = self.value(p._init, {})
+        for pv in list(p._shadows.values()):
+            if pv._assign is None:
+                continue
+            iters = [k for k in pv._key
+                     if isinstance(k, sasoptpy.data.SetIterator)]
+            for env in self._iterate(iters, {}):
+                values[_flat_key(self.value(k, env) for k in pv._key)] =\
+                    self.value(pv._assign, env)
+        if p._source is not None:
+            values.update(self._read_param(p))
+        if p._name in self._data:
+            given = self._data[p._name]
+            if hasattr(given, 'items'):
+                for k, v in given.items():
+                    values[_flat_key(sasoptpy.utils.tuple_pack(k))] = v
+            else:
+                default = given
+        self._params[p._name] = (default, values)
+        return default, values
+
+    def _read_param(self, p):
+        if p._index:
+            raise ExpansionError('Parameter {} is read in a loop, which is '
+                                 'not supported locally.'.format(p._name))
+        df = self._local_frame(p)
+        column = p._colname if p._colname is not None else p._name
+        keys = sasoptpy.utils.list_pack(p._keyset._colname)\
+            if p._keyset is not None else ['_N_']
+        if keys == ['_N_']:
+            rows = [(i,) for i in range(1, len(df) + 1)]
+        else:
+            if any(c not in df.columns for c in keys):
+                df = df.reset_index()
+            rows = zip(*(df[c].tolist() for c in keys))
+        return {_flat_key(k): v for k, v in zip(rows, df[column].tolist())}
+
+    def param_value(self, pv, env):
+        '''
+        Returns the value of a :class:`ParameterValue` object
+        '''
+        p = pv._ref
+        if not isinstance(p, sasoptpy.data.Parameter) or pv._prefix or\
+                pv._suffix:
+            raise ExpansionError('{} cannot be evaluated locally.'.format(pv))
+        default, values = self._param_table(p)
+        key = _flat_key(self.value(k, env) for k in pv._key)
+        try:
+            return values[key]
+        except KeyError:
+            if default is None:
+                raise ExpansionError('Parameter {} has no local value for '
+                                     'key {}.'.format(p._name, key))
+            return default
+
+    # Iterators
+
+    def _iterator_value(self, it, env):
+        try:
+            return env[id(it)]
+        except KeyError:
+            pass
+        if it._group in env:
+            return env[it._group][it._order]
+        raise ExpansionError('Iterator {} is not bound.'.format(it._name))
+
+    def _check(self, it, env):
+        for c in it._conditions:
+            lhs = self._iterator_value(it, env)
+            if c['type'] == 'IN':
+                if not lhs in self.set_values(c['key']):
+                    return False
+            elif c['type'] in _COMPARISONS:
+                if not _COMPARISONS[c['type']](lhs, self.value(c['key'],
+                                                               env)):
+                    return False
+            else:
+                raise ExpansionError('Condition {} of iterator {} is not '
+                                     'supported.'.format(c['type'], it._name))
+        return all(self._check(i, env) for i in it._children)
+
+    def _iterate(self, iterators, env):
+        '''
+        Yields a binding for each combination of iterator values that
+        satisfies conditions of the iterators
+        '''
+        domains = [self.set_values(it._set) for it in iterators]
+        for combination in product(*domains):
+            local = dict(env)
+            for it, v in zip(iterators, combination):
+                local[id(it)] = v
+            if all(self._check(it, local) for it in iterators):
+                yield local
+
+    # Expressions
+
+    def value(self, obj, env):
+        '''
+        Returns the value of a constant expression
+        '''
+        if isinstance(obj, sasoptpy.data.SetIterator):
+            return self._iterator_value(obj, env)
+        if isinstance(obj, sasoptpy.data.ParameterValue):
+            value = self.param_value(obj, env)
+            if not sasoptpy.utils._is_number(value) and\
+                    not isinstance(value, str):
+                raise ExpansionError('Value of {} is not a number or a '
+                                     'string: {!r}'.format(obj, value))
+            return value
+        if isinstance(obj, tuple):
+            return tuple(self.value(i, env) for i in obj)
+        if isinstance(obj, sasoptpy.components.Expression):
+            terms = {}
+            const = self.collect(obj, env, 1, terms)
+            if terms:
+                raise ExpansionError('Expression {} is not constant.'.format(
+                    obj._expr()))
+            return _normalize(const)
+        return obj
+
+    def number(self, obj, env):
+        '''
+        Returns the value of a constant expression used in arithmetic
+        '''
+        value = self.value(obj, env)
+        if not sasoptpy.utils._is_number(value):
+            raise ExpansionError('Value of {} is not a number: {!r}'.format(
+                obj, value))
+        return value
+
+    def collect(self, exp, env, coef, terms):
+        '''
+        Adds linear terms of an expression into a dictionary and returns
+        its constant
+
+        Parameters
+        ----------
+        exp : :class:`Expression` object
+            Expression to be evaluated
+        env : dict
+            Values of the bound iterators
+        coef : float
+            Multiplier of the expression
+        terms : dict
+            Dictionary of ``[variable, coefficient]`` pairs keyed by
+            variable name
+        '''
+        if exp._operator is None:
+            return self._collect_terms(exp, env, coef, terms)
+        if exp._operator == 'sum' and not exp._arguments:
+            const = 0
+            for local in self._iterate(exp._iterkey, env):
+                const += self._collect_terms(exp, local, coef, terms)
+            return const
+        raise ExpansionError('Operator {} is not linear.'.format(
+            exp._operator))
+
+    def _collect_terms(self, exp, env, coef, terms):
+        const = 0
+        for el in exp._linCoef.values():
+            if el.get('op') is not None:
+                raise ExpansionError('Operator {} is not linear.'.format(
+                    el['op']))
+            ref = el['ref']
+            val = el['val']
+            if not sasoptpy.utils._is_number(val):
+                val = self.number(val, env)
+            val *= coef
+            if ref is None:
+                const += val
+            elif isinstance(ref, list):
+                const += self._collect_product(ref, env, val, terms)
+            else:
+                const += self._collect_ref(ref, env, val, terms)
+        return const
+
+    def _collect_product(self, refs, env, coef, terms):
+        linear = None
+        for ref in refs:
+            if isinstance(ref, sasoptpy.components.Variable):
+                if linear is not None:
+                    raise ExpansionError('Product of variables is not '
+                                         'linear.')
+                linear = ref
+            else:
+                coef *= self.number(ref, env)
+        if linear is None:
+            return coef
+        return self._collect_ref(linear, env, coef, terms)
+
+    def _collect_ref(self, ref, env, coef, terms):
+        if isinstance(ref, sasoptpy.components.Variable):
+            v = self.variable(ref, env)
+            try:
+                terms[v._name][1] += coef
+            except KeyError:
+                terms[v._name] = [v, coef]
+            return 0
+        if isinstance(ref, (sasoptpy.data.SetIterator,
+                            sasoptpy.data.ParameterValue)):
+            return coef * self.number(ref, env)
+        if isinstance(ref, sasoptpy.data.Set):
+            raise ExpansionError('Set {} cannot be used as a value.'.format(
+                ref._name))
+        return self.collect(ref, env, coef, terms)
+
+    # Variables
+
+    def _domain(self, group):
+        try:
+            return self._domains[id(group)]
+        except KeyError:
+            pass
+        keys = [_flat_key(i) for i in
+                product(*(self.set_values(k) for k in group._keyset))]
+        self._domains[id(group)] = (keys, set(keys))
+        return self._domains[id(group)]
+
+    def members(self, group):
+        '''
+        Returns members of an abstract variable group for its local domain
+
+        Notes
+        -----
+
+        - Members are created inside the group when needed, so solution
+          values of the expanded model are available on the group.
+
+        '''
+        keys, _ = self._domain(group)
+        lb, ub = group._lb, group._ub
+        members = []
+        for key in keys:
+            v = group._vardict.get(key)
+            if v is None:
+                v = group.add_member(key)
+            v.set_bounds(lb=self._bound(key, lb), ub=self._bound(key, ub))
+            members.append(v)
+        for sh in group._shadows.values():
+            # Bounds of shadows refer to themselves unless they are set
+            lb = sh._lb if getattr(sh._lb, '_ref', None) is not sh else None
+            ub = sh._ub if getattr(sh._ub, '_ref', None) is not sh else None
+            if lb is None and ub is None:
+                continue
+            iters = [k for k in sh._iterkey
+                     if isinstance(k, sasoptpy.data.SetIterator)]
+            for env in self._iterate(iters, {}):
+                v = self.variable(sh, env)
+                v.set_bounds(
+                    lb=self.value(lb, env) if lb is not None else v._lb,
+                    ub=self.value(ub, env) if ub is not None else v._ub)
+        return members
+
+    def _bound(self, key, bound):
+        value = sasoptpy.utils.extract_list_value(key, bound)
+        if isinstance(value, sasoptpy.components.Expression):
+            value = self.value(value, {})
+        return value
+
+    def variable(self, v, env):
+        '''
+        Returns the concrete variable that an abstract variable refers to
+        '''
+        if not v._abstract:
+            return v
+        if not v._shadow:
+            raise ExpansionError('Variable {} cannot be evaluated '
+                                 'locally.'.format(v._name))
+        group = self._groups.get(id(v))
+        if group is None:
+            group = sasoptpy.utils.get_obj_by_name(v._name)
+        if not isinstance(group, sasoptpy.components.VariableGroup):
+            raise ExpansionError('Variable group of {} is not found.'.format(
+                v._name))
+        key = _flat_key(self.value(k, env) for k in v._iterkey)
+        if group._abstract and key not in self._domain(group)[1]:
+            raise ExpansionError('Key {} is not in the domain of {}.'.format(
+                key, group._name))
+        try:
+            return group._vardict[key]
+        except KeyError:
+            raise ExpansionError('Key {} is not in the domain of {}.'.format(
+                key, group._name))
+
+    # Model
+
+    def expression(self, exp, env):
+        '''
+        Returns the linear expression of an abstract expression
+        '''
+        terms = {}
+        const = self.collect(exp, env, 1, terms)
+        r = sasoptpy.components.Expression()
+        for name, (v, coef) in terms.items():
+            if coef != 0:
+                r._linCoef[name] = {'ref': v, 'val': coef}
+        r._linCoef['CONST']['val'] = const
+        return r
+
+    def constraints(self, c):
+        '''
+        Returns concrete constraints of an abstract constraint
+        '''
+        key = c._key if c._key is not None else ()
+        iters = [k for k in sasoptpy.utils.flatten_tuple(key)
+                 if isinstance(k, sasoptpy.data.SetIterator)]
+        if not iters and not _is_abstract(c):
+            return [c]
+        cons = []
+        for env in self._iterate(iters, {}):
+            con = sasoptpy.components.Constraint(
+                exp=self.expression(c, env), direction=c._direction,
+                crange=self.number(c._range, env))
+            if iters:
+                con._name = '{}[{}]'.format(c._parent._name, ','.join(
+                    format(k) for k in _flat_key(
+                        self.value(k, env) for k in key)))
+            else:
+                con._name = c._name
+            # Names are kept as in OPTMODEL and are local to the concrete
+            # model, so they are not registered
+            con._objorder = sasoptpy.utils._next_order()
+            cons.append(con)
+        return cons
+
+    def expand(self, name=None):
+        '''
+        Returns the concrete model
+        '''
+        model = self._model
+        for iv in model._impvars:
+            if iv._abstract:
+                raise ExpansionError('Implicit variable {} cannot be '
+                                     'expanded.'.format(iv._name))
+        for st in model._statements:
+            if st._source is None and not st._after:
+                raise ExpansionError('Statements cannot be evaluated '
+                                     'locally.')
+
+        # Abstract groups are represented by a single variable in the model
+        placeholders = {
+            id(v): g for g in model._vargroups if g._abstract
+            for k, v in g._vardict.items()
+            if any(isinstance(i, sasoptpy.data.Set) for i in k)}
+        variables = []
+        for v in model._variables:
+            if id(v) in placeholders:
+                variables.extend(self.members(placeholders[id(v)]))
+            elif not v._abstract:
+                variables.append(v)
+        constraints = []
+        for c in model._constraints:
+            constraints.extend(self.constraints(c))
+        obj = model._objective
+        if _is_abstract(obj):
+            objname = obj._name
+            obj = self.expression(obj, {})
+            if objname is not None:
+                obj._name = objname
+                obj._objorder = sasoptpy.utils._next_order()
+
+        if name is None:
+            name = model._name + '_expanded'
+        m = sasoptpy.Model(name=name, session=model._session)
+        for v in variables:
+            m.add_variable(var=v)
+        for c in constraints:
+            m.add_constraint(c)
+        m.set_objective(obj, sense=model._sense)
+        return m
+
+
+def expand_model(model, data=None, name=None):
+    '''
+    Evaluates an abstract model against local data and returns a concrete
+    model
+
+    Parameters
+    ----------
+    model : :class:`Model` object
+        Model including :class:`Set` and :class:`Parameter` objects
+    data : dict, optional
+        Values of sets and parameters, keyed by the objects or their names.
+        Sets take lists; parameters take dictionaries, Series or scalars
+    name : string, optional
+        Name of the concrete model
+
+    Returns
+    -------
+    :class:`Model` object
+        Linear model whose variables and constraints are concrete
+
+    Examples
+    --------
+
+    >>> m = so.Model(name='m')
+    >>> I = m.add_set(name='I', init=[1, 2, 3])
+    >>> c = m.add_parameter(I, name='c', init=1)
+    >>> x = m.add_variables(I, name='x', lb=0, ub=1)
+    >>> m.set_objective(so.quick_sum(c[i] * x[i] for i in I), name='obj',
+    ...                 sense=so.MAX)
+    >>> e = so.expand_model(m, data={c: {1: 5, 2: 3, 3: 4}})
+    >>> print(e.get_objective())
+    5.0 * x[1] + 3.0 * x[2] + 4.0 * x[3]
+
+    Notes
+    -----
+
+    - Values are looked up in ``data`` first, then in local DataFrames read
+      by :meth:`Model.read_data`, then in assignments such as
+      ``p[1] = 5`` and finally in the ``init`` value.
+    - Members of abstract variable groups are created inside the groups,
+      so solution values of the concrete model can be read through the
+      original groups.
+    - Concrete constraints are named after OPTMODEL, e.g. ``c[1]``.
+    - :class:`ExpansionError` is raised if a set or parameter has no local
+      value, or if the model includes nonlinear abstract components or
+      statements.
+
+    See also
+    --------
+    :meth:`Model.expand`
+
+    '''
+    return Expander(model, data=data).expand(name=name)
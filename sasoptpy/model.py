@@ -22,18 +22,98 @@ Model includes :class:`Model` class, the main structure of an opt. model
 '''
 
 
-import inspect
 from math import inf
 from types import GeneratorType
 import warnings
 
-import numpy as np
-import pandas as pd
-
+from sasoptpy._lazy import np, pd
+import sasoptpy._lazy
+import sasoptpy.backends
 import sasoptpy.components
+import sasoptpy.concurrency
+import sasoptpy.decomposition
+import sasoptpy.expand
+import sasoptpy.presolve
+import sasoptpy.report
 import sasoptpy.utils
 
 
+logger = sasoptpy.report.logger
+
+
+class _ComponentList:
+    '''
+    Keeps model components in insertion order with constant time removal
+
+    Notes
+    -----
+
+    - Removed components are replaced with a tombstone (None) and their
+      positions are looked up from a dictionary, so dropping a component
+      does not scan the list.
+    - Tombstones are compacted away once they fill half of the storage,
+      which keeps the order of remaining components.
+
+    '''
+
+    def __init__(self):
+        self._items = []
+        self._pos = {}
+        self._size = 0
+        # Number of appends and removals
+        self._version = 0
+
+    def append(self, item):
+        self._pos.setdefault(id(item), []).append(len(self._items))
+        self._items.append(item)
+        self._size += 1
+        self._version += 1
+
+    def remove(self, item):
+        '''
+        Removes all occurrences of the item and returns their number
+        '''
+        positions = self._pos.pop(id(item), None)
+        if positions is None:
+            return 0
+        for i in positions:
+            self._items[i] = None
+        self._size -= len(positions)
+        self._version += 1
+        if len(self._items) > 2 * self._size + 16:
+            self._compact()
+        return len(positions)
+
+    def _compact(self):
+        self._items = [i for i in self._items if i is not None]
+        self._pos = {}
+        for i, item in enumerate(self._items):
+            self._pos.setdefault(id(item), []).append(i)
+
+    def __contains__(self, item):
+        return id(item) in self._pos
+
+    def __iter__(self):
+        return (i for i in self._items if i is not None)
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, key):
+        if self._size != len(self._items):
+            self._compact()
+        return self._items[key]
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
 class Model:
     '''
     Creates an optimization model
@@ -62,8 +142,8 @@ class Model:
     def __init__(self, name, session=None):
         self._name = sasoptpy.utils.check_name(name, 'model')
         self._session = session
-        self._variables = []
-        self._constraints = []
+        self._variables = _ComponentList()
+        self._constraints = _ComponentList()
         self._vargroups = []
         self._congroups = []
         self._objective = sasoptpy.components.Expression(0, name=name+'_obj')
@@ -71,6 +151,22 @@ class Model:
         self._sense = sasoptpy.utils.MIN
         self._variableDict = {}
         self._constraintDict = {}
+        # Column index: variable name -> {id(constraint): constraint}
+        self._columns = {}
+        self._rows = {}
+        self._stale = {}
+        # Statistics: kept up to date as components are added and dropped
+        self._vartypes = {}
+        self._rowstats = {}
+        self._stats = {'nonzeros': 0, 'nonlinear': 0, 'abstract': 0,
+                       'duplicate_rows': 0, 'parallel_rows': 0,
+                       'dropped_rows': 0, 'merged_rows': 0}
+        # Row hashing: normalized terms -> first constraint
+        self._rowhash = None
+        self._rowhash_action = None
+        self._defn_caching = False
+        # Local expansion: (key, objective, concrete model or None)
+        self._expansion = None
         self._vcid = {}
         self._soltime = 0
         self._objval = None
@@ -79,8 +175,9 @@ class Model:
         self._mpsmode = 0
         self._problemSummary = None
         self._solutionSummary = None
-        self._primalSolution = pd.DataFrame()
-        self._dualSolution = pd.DataFrame()
+        # Solution tables are created on first use to avoid loading pandas
+        self._primalSolution = None
+        self._dualSolution = None
         self._milp_opts = {}
         self._lp_opts = {}
         self._sets = []
@@ -89,7 +186,10 @@ class Model:
         self._statements = []
         self._objorder = sasoptpy.utils.register_name(name, self)
         self.response = None
-        print('NOTE: Initialized model {}.'.format(name))
+        self._reports = []
+        self._report_hooks = []
+        self._report = None
+        logger.info('Initialized model {}.'.format(name))
 
     def __eq__(self, other):
         if not isinstance(other, sasoptpy.Model):
@@ -160,12 +260,12 @@ class Model:
         # Existing or new variable
         if var is not None:
             if isinstance(var, sasoptpy.components.Variable):
-                self._variables.append(var)
+                self._append_variable(var)
             else:
-                print('ERROR: Use the appropriate argument name for variable.')
+                logger.error('Use the appropriate argument name for variable.')
         else:
             var = sasoptpy.components.Variable(name, vartype, lb, ub, init)
-            self._variables.append(var)
+            self._append_variable(var)
         self._variableDict[var._name] = var
         return var
 
@@ -219,9 +319,9 @@ class Model:
         if vg is not None:
             if isinstance(vg, sasoptpy.components.VariableGroup):
                 for i in vg:
-                    self._variables.append(i)
+                    self._append_variable(i)
             else:
-                print('ERROR: Cannot add variable group of type {}'.format(
+                logger.error('Cannot add variable group of type {}'.format(
                     type(vg)))
         else:
             name = sasoptpy.utils.check_name(name, 'var')
@@ -232,7 +332,7 @@ class Model:
                                                    lb=lb, ub=ub, init=init,
                                                    abstract=abstract)
             for i in vg:
-                self._variables.append(i)
+                self._append_variable(i)
         for i in vg:
             self._variableDict[i._name] = i
         self._vargroups.append(vg)
@@ -252,6 +352,9 @@ class Model:
         Returns
         -------
         :class:`Constraint` object
+            The constraint, or the existing constraint it is dropped or
+            merged into if row hashing is enabled, see
+            :meth:`Model.set_row_hashing`
 
         Examples
         --------
@@ -281,7 +384,10 @@ class Model:
                 name = sasoptpy.utils.check_name(name, 'con')
                 c._name = name
                 c._objorder = sasoptpy.utils.register_name(name, c)
+                c._invalidate()
             self._constraintDict[c._name] = c
+            self._index_constraint(c)
+            c = self._hash_row(c)
         else:
             raise Exception('Expression is not a constraint!')
         # Return reference to the Constraint object
@@ -293,8 +399,9 @@ class Model:
 
         Parameters
         ----------
-        argv : Generator type objects
-            List of constraints as a Generator-type object
+        argv : Generator type objects or :class:`ConstraintGroup` object
+            List of constraints as a Generator-type object, or a group
+            created by comparing an :class:`ExpressionArray` object
         cg : :class:`ConstraintGroup` object, optional
             An existing list of constraints if an existing group is being added
         name : string, optional
@@ -303,7 +410,9 @@ class Model:
         Returns
         -------
         :class:`ConstraintGroup` object
-            A group object for all constraints aded
+            A group object for all constraints aded. If row hashing is
+            enabled, members that are dropped or merged are removed from
+            the group, see :meth:`Model.set_row_hashing`
 
         Examples
         --------
@@ -338,37 +447,323 @@ class Model:
           [(2, 3):  t[2, 3]  -  x  <=  0]
         ]
 
+        >>> cap = pd.Series([4, 6, 8])
+        >>> cy = m.add_constraints(2 * y + x <= cap, name='cy')
+        >>> print(cy[1])
+        2 * y[1] + x <=  6
+
         See also
         --------
-        :class:`ConstraintGroup`, :meth:`Model.include`
+        :class:`ConstraintGroup`, :class:`ExpressionArray`,
+        :meth:`Model.include`
 
         '''
         if cg is not None:
             if isinstance(cg, sasoptpy.components.ConstraintGroup):
-                for i in cg:
-                    self._constraints.append(i)
-                    self._constraintDict[i._name] = i
+                self._add_group(cg)
             else:
-                print('ERROR: Cannot add constraint group of type {}'.format(
+                logger.error('Cannot add constraint group of type {}'.format(
                     type(cg)))
-            self._congroups.append(cg)
+                self._congroups.append(cg)
             return cg
+        elif isinstance(argv, sasoptpy.components.ConstraintGroup):
+            if argv._name is None:
+                name = sasoptpy.utils.check_name(name, 'con')
+                argv._set_name(name)
+            return self.add_constraints(None, cg=argv)
         else:
             if type(argv) == list or type(argv) == GeneratorType:
                 name = sasoptpy.utils.check_name(name, 'con')
                 cg = sasoptpy.components.ConstraintGroup(argv, name=name)
-                for i in cg:
-                    self._constraints.append(i)
-                    self._constraintDict[i._name] = i
-                self._congroups.append(cg)
+                self._add_group(cg)
                 return cg
             elif type(argv) == sasoptpy.components.Constraint:
-                print('WARNING: add_constraints argument is a single' +
-                      ' constraint, inserting as a single constraint')
+                logger.warning('add_constraints argument is a single' +
+                               ' constraint, inserting as a single constraint')
                 name = sasoptpy.utils.check_name(name, 'con')
                 c = self.add_constraint(c=argv, name=name)
                 return c
 
+    def _add_group(self, cg):
+        '''
+        Adds members of a constraint group and the group to the model
+        '''
+        size = len(cg._conlist)
+        for i in cg:
+            self._constraints.append(i)
+            self._constraintDict[i._name] = i
+            self._index_constraint(i)
+            self._hash_row(i)
+        if size and not cg._conlist:
+            logger.warning('All constraints of group {} are dropped or '
+                           'merged by row hashing.'.format(cg._name))
+            return
+        self._congroups.append(cg)
+
+    def add_constraints_from_frame(self, df, row_cols, var_group, var_cols,
+                                   coef_col, sense, rhs=0, name=None):
+        '''
+        Adds a set of constraints from a coefficient table in long format
+
+        Parameters
+        ----------
+        df : :class:`pandas.DataFrame` object
+            Table with one row for each coefficient
+        row_cols : string or list of strings
+            Columns holding the key of the constraint
+        var_group : :class:`VariableGroup` object
+            Variable group whose members appear in the constraints
+        var_cols : string or list of strings
+            Columns holding the key of the variable inside ``var_group``
+        coef_col : string
+            Column holding the coefficient
+        sense : string
+            Direction of the constraints, 'E', 'L', or 'G'
+        rhs : float, dictionary or :class:`pandas.Series` object, optional
+            Right-hand side of the constraints, indexed by constraint keys
+        name : string, optional
+            Name for the constraint group and individual constraint prefix
+
+        Returns
+        -------
+        :class:`ConstraintGroup` object
+            A group object for all constraints added
+
+        Examples
+        --------
+
+        >>> x = m.add_variables(['a', 'b'], [1, 2], name='x', lb=0)
+        >>> coef = pd.DataFrame([
+        >>>     ['r1', 'a', 1, 2.0], ['r1', 'b', 2, 3.0], ['r2', 'a', 2, 1.0]],
+        >>>     columns=['row', 'prod', 'period', 'value'])
+        >>> limit = pd.Series([10, 4], index=['r1', 'r2'])
+        >>> c = m.add_constraints_from_frame(
+        >>>     coef, 'row', x, ['prod', 'period'], 'value', 'L', rhs=limit,
+        >>>     name='limit')
+        >>> print(c)
+        Constraint Group (limit) [
+          [r1: 2.0 * x[a, 1] + 3.0 * x[b, 2] <=  10]
+          [r2: x[a, 2] <=  4]
+        ]
+
+        Notes
+        -----
+
+        - Keys are sorted once and variables are looked up once for each
+          unique key, then all rows are built in a single pass. Use this
+          method instead of generators for tables with millions of
+          coefficients.
+        - Duplicate entries of a variable in a row are summed up and zero
+          coefficients are skipped. Only constraints with at least one
+          nonzero entry in ``df`` are created.
+        - ``rhs`` needs a value for each constraint key, missing values
+          raise a KeyError.
+
+        See also
+        --------
+        :meth:`Model.add_constraints`, :class:`ExpressionArray`
+
+        '''
+        if sense not in ['E', 'L', 'G']:
+            raise ValueError('Invalid constraint direction: {}'.format(sense))
+        if isinstance(row_cols, str):
+            row_cols = [row_cols]
+        if isinstance(var_cols, str):
+            var_cols = [var_cols]
+        coefs = df[coef_col].values
+        df = df[coefs != 0]
+        row_codes, row_keys = sasoptpy.utils._factorize_frame(df, row_cols)
+        var_codes, var_keys = sasoptpy.utils._factorize_frame(df, var_cols)
+        members = np.empty(len(var_keys), dtype=object)
+        missing = []
+        for i, key in enumerate(var_keys):
+            members[i] = var_group._vardict.get(key)
+            if members[i] is None:
+                missing.append(key)
+        if missing:
+            raise KeyError('Variable group {} has no members {}'.format(
+                var_group._name, missing[:5]))
+        order = np.lexsort((var_codes, row_codes))
+        arr = sasoptpy.components.ExpressionArray(keys=row_keys)
+        arr._blocks.append((row_codes[order].tolist(),
+                            members[var_codes[order]].tolist(),
+                            df[coef_col].values[order].tolist()))
+        if sense == 'L':
+            cg = arr <= rhs
+        elif sense == 'G':
+            cg = arr >= rhs
+        else:
+            cg = arr == rhs
+        return self.add_constraints(cg, name=name)
+
+    def set_row_hashing(self, action='detect'):
+        '''
+        Enables detection of duplicate and parallel constraints
+
+        Parameters
+        ----------
+        action : string, optional
+            Action for a new constraint whose terms are a multiple of an
+            existing constraint:
+
+            - 'detect' keeps the constraint and only counts it
+            - 'drop' drops the constraint if it is implied by the existing
+              one
+            - 'merge' also tightens the bound of the existing constraint
+              to the bound of the new one, and drops the new one
+            - None disables row hashing
+
+        Examples
+        --------
+
+        >>> x = m.add_variables(2, name='x')
+        >>> m.set_row_hashing('merge')
+        >>> c1 = m.add_constraint(x[0] + 2 * x[1] <= 8, name='c1')
+        >>> c2 = m.add_constraint(2 * x[0] + 4 * x[1] <= 10, name='c2')
+        >>> print(c2.get_name())
+        c1
+        >>> print(c1)
+        x[0] + 2 * x[1] <=  5.0
+        >>> print(m.get_statistics()['merged_rows'])
+        1
+
+        Notes
+        -----
+
+        - Constraints are hashed by the names of their variables and their
+          coefficients scaled by the first coefficient, so each new
+          constraint is checked in time proportional to its length.
+        - Two constraints are duplicates if they have the same bounds
+          after scaling, such as ``x + 2 * y <= 5`` and
+          ``2 * x + 4 * y <= 10``, and parallel otherwise. Counts are
+          reported by :meth:`Model.get_statistics`.
+        - A constraint is dropped if its bounds are implied by the
+          tightest lower and upper bounds of the existing constraints, e.g.
+          ``x + 2 * y >= -100`` after ``x + 2 * y <= 8`` and
+          ``3 * x + 6 * y >= 3``.
+        - Constraints with a range, nonlinear terms or abstract components
+          are not hashed. A constraint with a tighter bound is kept unless
+          it is merged, as are equality constraints that are not implied.
+        - When a constraint is dropped, :meth:`Model.add_constraint`
+          returns the existing constraint, and the constraint is removed
+          as in :meth:`Model.drop_constraint`, which also removes members
+          of constraint groups from their group. If all members of a
+          group are dropped, :meth:`Model.add_constraints` logs a warning
+          and returns the empty group.
+        - Existing constraints are indexed when row hashing is enabled,
+          without dropping or merging any of them.
+
+        '''
+        if action not in (None, 'detect', 'drop', 'merge'):
+            raise ValueError('Row hashing action should be None, \'detect\','
+                             ' \'drop\' or \'merge\'.')
+        if action is None:
+            self._rowhash = None
+            self._rowhash_action = None
+            return
+        self._rowhash_action = 'detect'
+        if self._rowhash is None:
+            self._rowhash = {}
+            for c in list(self._constraints):
+                self._hash_row(c)
+        self._rowhash_action = action
+
+    def _normalize_row(self, c):
+        '''
+        Returns the hash key, scale and normalized bounds of a linear row
+        '''
+        if c._range != 0 or c._abstract or c._operator:
+            return None
+        terms = []
+        for name, val in c._linCoef.items():
+            if name == 'CONST' or val['val'] == 0:
+                continue
+            if val.get('op') or not isinstance(
+                    val['ref'], sasoptpy.components.Variable):
+                return None
+            terms.append((name, val['val']))
+        if not terms:
+            return None
+        terms.sort()
+        scale = terms[0][1]
+        key = tuple((name, round(coef / scale, 12)) for name, coef in terms)
+        bound = - c._linCoef['CONST']['val'] / scale
+        upper = c._direction in ('L', 'E')
+        lower = c._direction in ('G', 'E')
+        if scale < 0:
+            upper, lower = lower, upper
+        return (key, scale, bound if lower else -inf, bound if upper else inf)
+
+    def _hash_row(self, c):
+        '''
+        Checks a new row against the row hashing index
+
+        Returns
+        -------
+        :class:`Constraint` object
+            The constraint kept in the model
+
+        Notes
+        -----
+
+        - The index keeps the row with the tightest lower bound and the row
+          with the tightest upper bound for each key, so a new row is
+          compared against both sides of the existing rows.
+
+        '''
+        if self._rowhash is None:
+            return c
+        row = self._normalize_row(c)
+        if row is None:
+            return c
+        key, scale, lo, up = row
+        slots = self._rowhash.setdefault(key, [None, None])
+        # Bounds of stored rows are read again, since they can be changed
+        old = [None, None]
+        for side, r in enumerate(slots):
+            if r is not None and r is not c and id(r) in self._rows:
+                old[side] = self._normalize_row(r)
+                if old[side] is not None and old[side][0] != key:
+                    old[side] = None
+            if old[side] is None:
+                slots[side] = None
+        if old == [None, None]:
+            # First row with these terms
+            self._store_row(slots, c, lo, up, -inf, inf)
+            return c
+        best_lo = old[0][2] if old[0] is not None else -inf
+        best_up = old[1][3] if old[1] is not None else inf
+        stats = self._stats
+        if any(o is not None and lo == o[2] and up == o[3] for o in old):
+            stats['duplicate_rows'] += 1
+        else:
+            stats['parallel_rows'] += 1
+        action = self._rowhash_action
+        if action != 'detect' and lo <= best_lo and up >= best_up:
+            self.drop_constraint(c)
+            stats['dropped_rows'] += 1
+            return slots[0] if lo != -inf else slots[1]
+        if action == 'merge' and (lo == -inf) != (up == inf):
+            side = 0 if lo != -inf else 1
+            target = slots[side]
+            if target is not None and target._direction != 'E':
+                _, target_scale, _, _ = old[side]
+                target.set_rhs((lo if side == 0 else up) * target_scale)
+                self.drop_constraint(c)
+                stats['merged_rows'] += 1
+                return target
+        self._store_row(slots, c, lo, up, best_lo, best_up)
+        return c
+
+    def _store_row(self, slots, c, lo, up, best_lo, best_up):
+        '''
+        Keeps the row in the index for each side where its bound is tighter
+        '''
+        if lo > best_lo:
+            slots[0] = c
+        if up < best_up:
+            slots[1] = c
+
     def add_set(self, name, init=None, settype=['num']):
         '''
         Adds a set to the model
@@ -524,7 +919,7 @@ class Model:
                     str(statement), after_solve=after_solve))
         elif isinstance(statement, str):
             if 'print' in statement and not after_solve:
-                print('WARNING: Moving print statement after solve.')
+                logger.warning('Moving print statement after solve.')
                 after_solve = True
             self._statements.append(
                 sasoptpy.data.Statement(statement, after_solve=after_solve))
@@ -554,6 +949,8 @@ class Model:
         - This function is still under development and subject to change.
         - `key_cols` parameters should be a list. When passing
           a single item, string type can be used instead.
+        - A :class:`pandas.DataFrame` can be passed as ``table`` when the
+          model is expanded locally, see :meth:`Model.expand`.
         - Values inside each dictionary in ``params`` list should be as follows:
           
           - **param** : :class:`Parameter` object
@@ -715,6 +1112,13 @@ params=[{'param': value, 'column': 'value'}])
         >>> print(m.get_variable('x'))
         None
 
+        Notes
+        -----
+
+        - The variable is removed from the objective and from the
+          constraints of the model, which are found using the column index
+          of the model.
+
         See also
         --------
         :func:`Model.drop_variables`
@@ -722,10 +1126,23 @@ params=[{'param': value, 'column': 'value'}])
         :func:`Model.drop_constraints`
 
         '''
-        for i, v in enumerate(self._variables):
-            if id(variable) == id(v):
-                del self._variables[i]
-                return
+        count = self._variables.remove(variable)
+        if not count:
+            return
+        self._count_variable(variable, -count)
+        self._variableDict.pop(variable._name, None)
+        self._objective._linCoef.pop(variable._name, None)
+        self._refresh_columns()
+        for key, c in self._columns.pop(variable._name, {}).items():
+            self._rows[key].discard(variable._name)
+            val = c._linCoef.pop(variable._name, None)
+            if val is not None and val['val'] != 0:
+                nnz, nonlinear, abstract = self._rowstats[key]
+                self._rowstats[key] = (nnz - 1, nonlinear, abstract)
+                self._stats['nonzeros'] -= 1
+            c._invalidate()
+            # Index of this model is already up to date
+            self._stale.pop(key, None)
 
     def drop_constraint(self, constraint):
         '''
@@ -753,15 +1170,24 @@ params=[{'param': value, 'column': 'value'}])
         :func:`Model.drop_variables`
 
         '''
-        try:
+        if not self._remove_constraint(constraint):
+            return
+        group = constraint._parent
+        if group is not None and group._remove_member(constraint):
+            if not group._conlist and group in self._congroups:
+                self._congroups.remove(group)
+
+    def _remove_constraint(self, constraint):
+        '''
+        Removes a constraint from the constraint list and the column index
+        '''
+        if not isinstance(constraint, sasoptpy.components.Constraint):
+            return False
+        if self._constraintDict.get(constraint._name) is constraint:
             del self._constraintDict[constraint._name]
-            for i, c in enumerate(self._constraints):
-                if c._name == constraint._name:
-                    del self._constraints[i]
-        except KeyError:
-            pass
-        except AttributeError:
-            pass
+        found = self._constraints.remove(constraint) > 0
+        self._unindex_constraint(constraint)
+        return found
 
     def drop_variables(self, variables):
         '''
@@ -823,7 +1249,7 @@ params=[{'param': value, 'column': 'value'}])
 
         '''
         for c in constraints:
-            self.drop_constraint(c)
+            self._remove_constraint(c)
         if constraints in self._congroups:
             self._congroups.remove(constraints)
 
@@ -875,7 +1301,10 @@ params=[{'param': value, 'column': 'value'}])
 
         '''
         for _, c in enumerate(argv):
-            if c is None or type(c) == pd.DataFrame or type(c) == pd.Series:
+            if c is None or sasoptpy._lazy.isinstance_of(
+                    c, 'pandas', 'DataFrame', exact=True) or\
+                    sasoptpy._lazy.isinstance_of(
+                        c, 'pandas', 'Series', exact=True):
                 continue
             elif isinstance(c, sasoptpy.components.Variable):
                 self.add_variable(var=c)
@@ -904,13 +1333,14 @@ params=[{'param': value, 'column': 'value'}])
                 for s in c._vargroups:
                     self._vargroups.append(s)
                     for subvar in s:
-                        self._variables.append(subvar)
+                        self._append_variable(subvar)
                 for s in c._variables:
-                    self._variables.append(s)
+                    self._append_variable(s)
                 for s in c._congroups:
                     self._congroups.append(s)
                 for s in c._constraints:
                     self._constraints.append(s)
+                    self._index_constraint(s)
                 self._objective = c._objective
 
     def set_objective(self, expression, sense=None, name=None):
@@ -1061,7 +1491,7 @@ params=[{'param': value, 'column': 'value'}])
          sasoptpy.Constraint( 2.0 * x[1]  -  y  >=  1, name='c2_1')]
 
         '''
-        return self._constraints
+        return list(self._constraints)
 
     def get_variable(self, name):
         '''
@@ -1109,21 +1539,23 @@ params=[{'param': value, 'column': 'value'}])
          sasoptpy.Variable(name='y',  vartype='CONT')]
 
         '''
-        return self._variables
+        return list(self._variables)
 
-    def get_variable_coef(self, var):
+    def get_variable_coef(self, var, con=None):
         '''
-        Returns the objective value coefficient of a variable
+        Returns the objective value or constraint coefficient of a variable
 
         Parameters
         ----------
         var : :class:`Variable` object or string
-            Variable whose objective value is requested or its name
+            Variable whose coefficient is requested or its name
+        con : :class:`Constraint` object or string, optional
+            Constraint or its name, the objective is used if not given
 
         Returns
         -------
         float
-            Objective value coefficient of the given variable
+            Coefficient of the given variable
 
         Examples
         --------
@@ -1135,17 +1567,158 @@ params=[{'param': value, 'column': 'value'}])
         4.0
         >>> print(m.get_variable_coef('y'))
         -5.0
+        >>> c1 = m.add_constraint(x + 3 * y <= 6, name='c1')
+        >>> print(m.get_variable_coef(y, c1))
+        3
+
+        See also
+        --------
+        :meth:`Model.get_column`
 
         '''
         if isinstance(var, sasoptpy.components.Variable):
             varname = var._name
         else:
             varname = var
+        if con is not None:
+            if not isinstance(con, sasoptpy.components.Constraint):
+                con = self._constraintDict.get(con)
+            self._refresh_columns()
+            if con is None or\
+                    id(con) not in self._columns.get(varname, {}):
+                return 0
+            return con._linCoef[varname]['val']
         if varname in self._objective._linCoef:
             return self._objective._linCoef[varname]['val']
         else:
             return 0
 
+    def get_column(self, var):
+        '''
+        Returns the constraint coefficients of a variable
+
+        Parameters
+        ----------
+        var : :class:`Variable` object or string
+            Variable whose column is requested or its name
+
+        Returns
+        -------
+        dict
+            Coefficients of the variable, keyed by constraint names
+
+        Examples
+        --------
+
+        >>> x = m.add_variable(name='x')
+        >>> y = m.add_variable(name='y')
+        >>> c1 = m.add_constraint(x + 3 * y <= 6, name='c1')
+        >>> c2 = m.add_constraint(2 * y >= 1, name='c2')
+        >>> print(m.get_column(y))
+        {'c1': 3, 'c2': 2}
+
+        Notes
+        -----
+
+        - The column index of the model is updated as constraints are
+          added, changed or dropped, so this method takes time
+          proportional to the number of constraints of the variable.
+
+        '''
+        if isinstance(var, sasoptpy.components.Variable):
+            varname = var._name
+        else:
+            varname = var
+        self._refresh_columns()
+        return {c._name: c._linCoef[varname]['val']
+                for c in self._columns.get(varname, {}).values()}
+
+    def _index_constraint(self, c):
+        '''
+        Adds linear terms of a constraint into the column index
+        '''
+        key = id(c)
+        if key in self._rows:
+            self._unindex_constraint(c)
+        names = set()
+        columns = self._columns
+        nnz = 0
+        nonlinear = 0
+        for name, val in c._linCoef.items():
+            ref = val['ref']
+            if isinstance(ref, sasoptpy.components.Variable):
+                columns.setdefault(name, {})[key] = c
+                names.add(name)
+            if name == 'CONST' or val['val'] == 0:
+                continue
+            if val.get('op') or type(ref) is list or\
+                    (ref is not None and ref._operator):
+                nonlinear = 1
+            elif ref is not None:
+                nnz += 1
+        self._rows[key] = names
+        row = (nnz, nonlinear, int(bool(c._abstract)))
+        self._rowstats[key] = row
+        self._update_stats(row, 1)
+        if self not in c._models:
+            c._models.append(self)
+
+    def _unindex_constraint(self, c):
+        '''
+        Removes a constraint from the column index
+        '''
+        key = id(c)
+        self._stale.pop(key, None)
+        for name in self._rows.pop(key, ()):
+            column = self._columns.get(name)
+            if column is not None:
+                column.pop(key, None)
+        row = self._rowstats.pop(key, None)
+        if row is not None:
+            self._update_stats(row, -1)
+        if self in c._models:
+            c._models.remove(self)
+
+    def _update_stats(self, row, sign):
+        '''
+        Adds or subtracts nonzero, nonlinear and abstract counts of a row
+        '''
+        stats = self._stats
+        stats['nonzeros'] += sign * row[0]
+        stats['nonlinear'] += sign * row[1]
+        stats['abstract'] += sign * row[2]
+
+    def _append_variable(self, var):
+        '''
+        Adds a variable into the variable list and counts its type
+        '''
+        self._variables.append(var)
+        self._count_variable(var, 1)
+
+    def _count_variable(self, var, count):
+        '''
+        Updates type and abstract counts of variables
+        '''
+        self._vartypes[var._type] = self._vartypes.get(var._type, 0) + count
+        if var._abstract:
+            self._stats['abstract'] += count
+
+    def _has_integers(self):
+        '''
+        Checks if the model has integer or binary variables
+        '''
+        return any(count for vartype, count in self._vartypes.items()
+                   if vartype != sasoptpy.utils.CONT)
+
+    def _refresh_columns(self):
+        '''
+        Indexes constraints changed since they are added again
+        '''
+        while self._stale:
+            _, c = self._stale.popitem()
+            if id(c) in self._rows:
+                self._index_constraint(c)
+
     def get_variable_value(self, var=None, name=None):
         '''
         Returns the value of a variable.
@@ -1184,6 +1757,75 @@ params=[{'param': value, 'column': 'value'}])
                         return row['value']
         return None
 
+    def get_statistics(self):
+        '''
+        Returns the size and problem class of the model
+
+        Returns
+        -------
+        dict
+            Numbers of variables by type, constraints, nonzero linear
+            coefficients, nonlinear constraints and abstract components,
+            constant of the objective and the problem class (LP, MILP, QP,
+            MIQP, NLP or MINLP), and numbers of duplicate, parallel,
+            dropped and merged constraints found by row hashing
+
+        Examples
+        --------
+
+        >>> x = m.add_variables(2, name='x', vartype=so.INT)
+        >>> y = m.add_variable(name='y')
+        >>> c = m.add_constraint(x[0] + 2 * x[1] - y <= 4, name='c')
+        >>> m.set_objective(x[0] + y + 3, sense=so.MIN, name='obj')
+        >>> print(m.get_statistics())
+        {'variables': 3, 'continuous': 1, 'integer': 2, 'binary': 0,
+         'constraints': 1, 'nonzeros': 3, 'nonlinear': 0, 'abstract': 0,
+         'objective_constant': 3, 'problem': 'MILP', 'duplicate_rows': 0,
+         'parallel_rows': 0, 'dropped_rows': 0, 'merged_rows': 0}
+
+        Notes
+        -----
+
+        - Counts are updated as components are added, changed and dropped,
+          so this method only inspects the objective, unless the model is
+          abstract.
+        - Abstract models are reported as LP (or MILP) if their components
+          are linear in the variables, treating sets and parameters as
+          constants. Other models with nonlinear objectives are reported
+          as NLP.
+
+        '''
+        self._refresh_columns()
+        types = self._vartypes
+        stats = self._stats
+        constant = self._objective._linCoef.get('CONST', {'val': 0})['val']
+        quadratic = self._objective._get_quadratic()
+        if (stats['abstract'] or sasoptpy.expand._is_abstract(
+                self._objective)) and sasoptpy.expand._is_linear_model(self):
+            problem = 'LP'
+        elif stats['nonlinear'] or quadratic is None:
+            problem = 'NLP'
+        elif len(quadratic):
+            problem = 'QP'
+        else:
+            problem = 'LP'
+        if self._has_integers():
+            problem = 'MI' + problem
+        return {'variables': len(self._variables),
+                'continuous': types.get(sasoptpy.utils.CONT, 0),
+                'integer': types.get(sasoptpy.utils.INT, 0),
+                'binary': types.get(sasoptpy.utils.BIN, 0),
+                'constraints': len(self._constraints),
+                'nonzeros': stats['nonzeros'],
+                'nonlinear': stats['nonlinear'],
+                'abstract': stats['abstract'],
+                'objective_constant': constant,
+                'problem': problem,
+                'duplicate_rows': stats['duplicate_rows'],
+                'parallel_rows': stats['parallel_rows'],
+                'dropped_rows': stats['dropped_rows'],
+                'merged_rows': stats['merged_rows']}
+
     def get_problem_summary(self):
         '''
         Returns the problem summary table to the user
@@ -1286,6 +1928,73 @@ params=[{'param': value, 'column': 'value'}])
         '''
         return self._solutionSummary
 
+    def get_reports(self):
+        '''
+        Returns the reports of previous solves
+
+        Returns
+        -------
+        list
+            List of :class:`SolveReport` objects, oldest first
+
+        Examples
+        --------
+
+        >>> m.solve()
+        >>> r = m.get_reports()[-1]
+        >>> print(r.get_phase_time('upload'), r.bytes_uploaded)
+        0.0151 1504
+
+        '''
+        return self._reports
+
+    def add_report_hook(self, func):
+        '''
+        Registers a function to be called with the report of each solve of
+        the model
+
+        Parameters
+        ----------
+        func : function
+            Function taking a :class:`SolveReport` object
+
+        See also
+        --------
+        :func:`add_report_hook`
+
+        '''
+        self._report_hooks.append(func)
+
+    def _active_report(self, method):
+        '''
+        Returns the report of the running solve
+
+        Notes
+        -----
+
+        - A detached report is returned when solve methods are called
+          directly. Only batch solves, :meth:`Model.solve_scenarios` and
+          :meth:`Model.solve_sweep`, add it to the history of the model.
+
+        '''
+        report = self._report
+        if report is None:
+            report = sasoptpy.report.SolveReport(self)
+        report.method = method
+        backend = sasoptpy.backends.get_backend(self._session)
+        if backend is not None:
+            report.session = backend.address()
+        return report
+
+    def _publish_batch_report(self, report, statuses):
+        '''
+        Records the statuses of a batch solve and publishes its report
+        '''
+        statuses = sorted(set(str(i) for i in statuses))
+        report.status = ', '.join(statuses)
+        if self._report is None:
+            sasoptpy.report.publish_report(self, report)
+
     def get_solution(self, vtype='Primal', solution=None, pivot=False):
         '''
         Returns the solution details associated with the primal or dual
@@ -1383,6 +2092,9 @@ params=[{'param': value, 'column': 'value'}])
           results using :code:`solution` parameter.
 
         '''
+        if self._primalSolution is None:
+            self._primalSolution = pd.DataFrame()
+            self._dualSolution = pd.DataFrame()
         if vtype == 'Primal' or vtype == 'primal':
             if pivot:
                 return self._primalSolution.pivot_table(
@@ -1502,7 +2214,109 @@ params=[{'param': value, 'column': 'value'}])
         self._id = self._id+1
         return rowid
 
-    def to_frame(self, constant=False):
+    def expand(self, data=None, name=None):
+        '''
+        Evaluates sets and parameters of the model against local data and
+        returns a concrete model
+
+        Parameters
+        ----------
+        data : dict, optional
+            Values of sets and parameters, keyed by the objects or their
+            names. Sets take lists; parameters take dictionaries, Series or
+            scalars
+        name : string, optional
+            Name of the concrete model
+
+        Returns
+        -------
+        :class:`Model` object
+            Linear model whose variables and constraints are concrete
+
+        Examples
+        --------
+
+        >>> I = m.add_set(name='I', init=[1, 2, 3])
+        >>> a = m.add_parameter(I, name='a', init=2)
+        >>> x = m.add_variables(I, name='x', lb=0)
+        >>> c = m.add_constraints((x[i] <= a[i] for i in I), name='c')
+        >>> e = m.expand(data={a: {1: 5}})
+        >>> print(e.get_constraint('c[1]'))
+        x[1] <=  5.0
+
+        Notes
+        -----
+
+        - The model itself is not changed, except for the members created
+          inside abstract variable groups. Solution values of the concrete
+          model can be read through these groups.
+        - :meth:`Model.solve` expands the model automatically when ``frame``
+          is requested and all sets and parameters have local data. The
+          concrete model is reused by later solves until a component or
+          parameter value changes. Changes made directly to DataFrames
+          after they are read are not detected.
+        - See :func:`sasoptpy.expand.expand_model` for where values are
+          looked up.
+
+        '''
+        return sasoptpy.expand.expand_model(self, data=data, name=name)
+
+    def _local_expansion(self):
+        '''
+        Returns the concrete model if the model can be expanded locally into
+        a linear model, None otherwise
+        '''
+        if self._expansion is not None and\
+                self._expansion[0] == self._expansion_key():
+            return self._expansion[2]
+        try:
+            expanded = self.expand()
+        except sasoptpy.expand.ExpansionError as e:
+            logger.info('Model {} cannot be expanded locally: {}'.format(
+                self._name, e))
+            expanded = None
+        if expanded is not None and not expanded._is_linear():
+            expanded = None
+        # Expansion creates members of abstract groups, so the key is read
+        # afterwards
+        self._expansion = (self._expansion_key(), self._objective, expanded)
+        return expanded
+
+    def _expansion_key(self):
+        '''
+        Returns the numbers of changes that a local expansion depends on
+        '''
+        return (sasoptpy.utils._get_changes(),
+                sasoptpy.components._variable_renames,
+                self._variables._version,
+                self._constraints._version, len(self._sets),
+                len(self._parameters), len(self._statements),
+                len(self._impvars), len(self._vargroups),
+                id(self._objective), self._sense)
+
+    def _solve_expanded(self, expanded, method, **kwargs):
+        '''
+        Solves the concrete model of an abstract model and copies results
+        '''
+        logger.info('Model {} is expanded locally into model {}.'.format(
+            self._name, expanded._name))
+        expanded._session = self._session
+        expanded._report = self._report
+        try:
+            result = getattr(expanded, method)(**kwargs)
+        finally:
+            expanded._report = None
+        self.response = expanded.response
+        self._primalSolution = expanded._primalSolution
+        self._dualSolution = expanded._dualSolution
+        self._problemSummary = expanded._problemSummary
+        self._solutionSummary = expanded._solutionSummary
+        self._status = expanded._status
+        self._soltime = expanded._soltime
+        self._objval = expanded._objval
+        return result
+
+    def to_frame(self, constant=False, presolver=None):
         '''
         Converts the Python model into a DataFrame object in MPS format
 
@@ -1511,6 +2325,8 @@ params=[{'param': value, 'column': 'value'}])
         constant : boolean, optional
             Switching for using objConstant argument for solveMilp, solveLp. \
             Adds the constant as an auxiliary variable if value is True.
+        presolver : :class:`Presolver` object, optional
+            Presolver whose reductions are applied to the exported problem
 
         Returns
         -------
@@ -1541,6 +2357,12 @@ params=[{'param': value, 'column': 'value'}])
         Notes
         -----
         * This method is called inside :meth:`Model.solve`.
+        * Quadratic terms of the objective are written in the QUADOBJ
+          section as the lower triangle of the matrix :math:`Q` of
+          :math:`\\frac{1}{2} x^T Q x`, see :class:`QuadraticBlock`.
+        * With a ``presolver``, rows and columns removed by
+          :meth:`Presolver.run` are skipped, and changed bounds and
+          right-hand sides are written instead of those of the model.
         '''
         self._id = 1
         if(len(self._datarows) > 0):  # For future reference
@@ -1549,11 +2371,16 @@ params=[{'param': value, 'column': 'value'}])
             self._datarows = []
         else:
             self._datarows = []
-        # Create a dictionary of variables with constraint names
-        var_con = {}
-        for c in self._constraints:
-            for v in c._linCoef:
-                var_con.setdefault(v, []).append(c._name)
+        # Columns are read from the column index
+        self._refresh_columns()
+        columns = self._columns
+        removed_rows = {}
+        removed_cols = {}
+        bounds = {}
+        if presolver is not None:
+            removed_rows = presolver._removed_rows
+            removed_cols = presolver._removed_cols
+            bounds = presolver._bounds
         # Check if objective has a constant field
         if constant and self._objective._linCoef['CONST']['val'] != 0:
             obj_constant = self.add_variable(name=sasoptpy.utils.check_name(
@@ -1564,8 +2391,8 @@ params=[{'param': value, 'column': 'value'}])
             obj_name = self._objective._name + '_constant'
             self._objective = self._objective - constant_value + obj_constant
             self._objective._name = obj_name
-            print('WARNING: The objective function contains a constant term,' +
-                  ' an auxiliary variable is added.')
+            logger.warning('The objective function contains a constant '
+                           'term, an auxiliary variable is added.')
         # self._append_row(['*','SAS-Viya-Opt','MPS-Free Format','0','0','0'])
         self._append_row(['NAME', '', self._name, 0, '', 0])
         self._append_row(['ROWS', '', '', '', '', ''])
@@ -1574,10 +2401,14 @@ params=[{'param': value, 'column': 'value'}])
                              '', '', '', ''])
 
         for c in self._constraints:
+            if id(c) in removed_rows:
+                continue
             self._append_row([c._direction, c._name, '', '', '', ''])
         self._append_row(['COLUMNS', '', '', '', '', ''])
         curtype = sasoptpy.utils.CONT
         for v in self._variables:
+            if v._name in removed_cols:
+                continue
             f5 = 0
             self._vcid[v._name] = {}
             if v._type is sasoptpy.utils.INT and\
@@ -1590,29 +2421,29 @@ params=[{'param': value, 'column': 'value'}])
                 self._append_row(['', 'MARK0001', '\'MARKER\'', '',
                                  '\'INTEND\'', ''])
                 curtype = sasoptpy.utils.CONT
+            column = columns.get(v._name, {})
+            if removed_rows:
+                column = {key: c for key, c in column.items()
+                          if key not in removed_rows}
             if v._name in self._objective._linCoef:
                 cv = self._objective._linCoef[v._name]
                 current_row = ['', v._name, self._objective._name, cv['val']]
                 f5 = 1
-            elif v._name not in var_con:
+            elif not column:
                 current_row = ['', v._name, self._objective._name, 0.0]
                 f5 = 1
-                var_con[v._name] = []
-            for cn in var_con.get(v._name, []):
-                if cn in self._constraintDict:
-                    c = self._constraintDict[cn]
-                    if v._name in c._linCoef:
-                        if f5 == 0:
-                            current_row = ['', v._name, c._name,
-                                           c._linCoef[v._name]['val']]
-                            f5 = 1
-                        else:
-                            current_row.append(c._name)
-                            current_row.append(c._linCoef[v._name]['val'])
-                            ID = self._append_row(current_row)
-                            self._vcid[v._name][current_row[2]] = ID
-                            self._vcid[v._name][current_row[4]] = ID
-                            f5 = 0
+            for c in column.values():
+                if f5 == 0:
+                    current_row = ['', v._name, c._name,
+                                   c._linCoef[v._name]['val']]
+                    f5 = 1
+                else:
+                    current_row.append(c._name)
+                    current_row.append(c._linCoef[v._name]['val'])
+                    ID = self._append_row(current_row)
+                    self._vcid[v._name][current_row[2]] = ID
+                    self._vcid[v._name][current_row[4]] = ID
+                    f5 = 0
             if f5 == 1:
                 current_row.append('')
                 current_row.append('')
@@ -1624,11 +2455,13 @@ params=[{'param': value, 'column': 'value'}])
         self._append_row(['RHS', '', '', '', '', ''])
         f5 = 0
         for c in self._constraints:
-            if c._direction == 'L' and c._linCoef['CONST']['val'] == -inf:
-                continue
-            if c._direction == 'G' and c._linCoef['CONST']['val'] == 0:
+            if id(c) in removed_rows:
                 continue
             rhs = - c._linCoef['CONST']['val']
+            if presolver is not None:
+                rhs = presolver._rhs.get(id(c), rhs)
+            if c._direction == 'L' and rhs == inf:
+                continue
             if rhs != 0:
                 if f5 == 0:
                     current_row = ['', 'RHS', c._name, rhs]
@@ -1645,29 +2478,35 @@ params=[{'param': value, 'column': 'value'}])
             self._append_row(current_row)
         self._append_row(['RANGES', '', '', '', '', ''])
         for c in self._constraints:
-            if c._range != 0:
+            if c._range != 0 and id(c) not in removed_rows:
                 self._append_row(['', 'rng', c._name, c._range, '', ''])
         self._append_row(['BOUNDS', '', '', '', '', ''])
         for v in self._variables:
-            if self._vcid[v._name] == {}:
+            if v._name in removed_cols or self._vcid[v._name] == {}:
                 continue
-            if v._lb == v._ub:
-                self._append_row(['FX', 'BND', v._name, v._ub, '', ''])
-            if v._lb is not None and v._type is not sasoptpy.utils.BIN:
-                if v._ub == inf and v._lb == -inf:
+            lb, ub = bounds.get(v._name, (v._lb, v._ub))
+            if lb == ub:
+                self._append_row(['FX', 'BND', v._name, ub, '', ''])
+            if lb is not None and v._type is not sasoptpy.utils.BIN:
+                if ub == inf and lb == -inf:
                     self._append_row(['FR', 'BND', v._name, '', '', ''])
-                elif not v._ub == v._lb:
+                elif not ub == lb:
                     if v._type == sasoptpy.utils.INT and\
-                       v._lb == 0 and v._ub == inf:
+                       lb == 0 and ub == inf:
                         self._append_row(['PL', 'BND', v._name, '', '', ''])
-                    elif not(v._type == sasoptpy.utils.CONT and v._lb == 0):
-                        self._append_row(['LO', 'BND', v._name, v._lb, '', ''])
-            if v._ub != inf and v._ub is not None and not\
-               (v._type is sasoptpy.utils.BIN and v._ub == 1) and\
-               v._lb != v._ub:
-                self._append_row(['UP', 'BND', v._name, v._ub, '', ''])
+                    elif not(v._type == sasoptpy.utils.CONT and lb == 0):
+                        self._append_row(['LO', 'BND', v._name, lb, '', ''])
+            if ub != inf and ub is not None and not\
+               (v._type is sasoptpy.utils.BIN and ub == 1) and\
+               lb != ub:
+                self._append_row(['UP', 'BND', v._name, ub, '', ''])
             if v._type is sasoptpy.utils.BIN:
                 self._append_row(['BV', 'BND', v._name, '1.0', '', ''])
+        quadratic = self._objective._get_quadratic()
+        if quadratic is not None and len(quadratic) > 0:
+            self._append_row(['QUADOBJ', '', '', '', '', ''])
+            for v1, v2, value in quadratic.get_entries():
+                self._append_row(['', v1._name, v2._name, value, '', ''])
         self._append_row(['ENDATA', '', '', 0.0, '', 0.0])
         mpsdata = pd.DataFrame(data=self._datarows,
                                columns=['Field1', 'Field2', 'Field3', 'Field4',
@@ -1675,24 +2514,74 @@ params=[{'param': value, 'column': 'value'}])
         self._datarows = []
         return mpsdata
 
-    def to_optmodel(self, header=True, expand=False, ordered=False,
-                    ods=False, options={}):
+    def set_definition_cache(self, enabled=True):
         '''
-        Generates the equivalent PROC OPTMODEL code for the model.
+        Enables caching of OPTMODEL definitions of variables and constraints
 
         Parameters
         ----------
-        header : boolean, optional
-            Option to include PROC headers
-        expand : boolean, optional
-            Option to include 'expand' command to OPTMODEL code
-        ordered : boolean, optional
-            Option to generate OPTMODEL code in a specific order (True) or\
-            in creation order (False)
-        options : dict, optional
-            Solver options for the OPTMODEL solve command
+        enabled : boolean, optional
+            Switch for keeping the definitions rendered by
+            :meth:`Model.to_optmodel`
 
-        Returns
+        Examples
+        --------
+
+        >>> m.set_definition_cache()
+        >>> code = m.to_optmodel()
+        >>> c[5].set_rhs(99)
+        >>> code = m.to_optmodel()
+
+        Notes
+        -----
+
+        - When enabled, each variable and constraint keeps its definition
+          after it is rendered, so calling :meth:`Model.to_optmodel` again
+          only renders the components changed since the last call. Cached
+          definitions take about as much memory as the generated program.
+        - Definitions are rendered again after set_bounds, set_init,
+          set_rhs, set_direction, coefficient updates and renames.
+        - Disabling the cache drops the definitions kept by the components
+          of the model.
+
+        '''
+        self._defn_caching = bool(enabled)
+        if not enabled:
+            for v in self._variables:
+                v._defn_cache = None
+            for c in self._constraints:
+                c._defn_cache = None
+
+    def _component_defn(self, cm):
+        '''
+        Returns the definition of a component, cached if enabled
+        '''
+        if isinstance(cm, (sasoptpy.components.Variable,
+                           sasoptpy.components.Constraint)):
+            return cm._defn(cache=self._defn_caching)
+        return cm._defn()
+
+    def to_optmodel(self, header=True, expand=False, ordered=False,
+                    ods=False, options={}, tables=None):
+        '''
+        Generates the equivalent PROC OPTMODEL code for the model.
+
+        Parameters
+        ----------
+        header : boolean, optional
+            Option to include PROC headers
+        expand : boolean, optional
+            Option to include 'expand' command to OPTMODEL code
+        ordered : boolean, optional
+            Option to generate OPTMODEL code in a specific order (True) or\
+            in creation order (False)
+        options : dict, optional
+            Solver options for the OPTMODEL solve command
+        tables : dict, optional
+            Dictionary to collect coefficient tables of constraint groups
+            written in compact form, see :meth:`Model.iter_optmodel`
+
+        Returns
         -------
         string
             PROC OPTMODEL representation of the model
@@ -1729,57 +2618,114 @@ params=[{'param': value, 'column': 'value'}])
 
         '''
 
-        if ordered:
-            s = ''
+        return ''.join(self.iter_optmodel(
+            header=header, expand=expand, ordered=ordered, ods=ods,
+            options=options, tables=tables))
+
+    def iter_optmodel(self, header=True, expand=False, ordered=False,
+                      ods=False, options={}, tables=None):
+        '''
+        Generates the PROC OPTMODEL code of the model in chunks
+
+        Parameters
+        ----------
+        header : boolean, optional
+            Option to include PROC headers
+        expand : boolean, optional
+            Option to include 'expand' command to OPTMODEL code
+        ordered : boolean, optional
+            Option to generate OPTMODEL code in a specific order (True) or\
+            in creation order (False)
+        ods : boolean, optional
+            Option to write output tables using ODS statements
+        options : dict, optional
+            Solver options for the OPTMODEL solve command
+        tables : dict, optional
+            If given, constraint groups whose members are structurally
+            identical are written as a single indexed constraint reading
+            its coefficients with READ DATA. Coefficient tables are added
+            to this dictionary, keyed by table name, and have to be
+            uploaded before the code is submitted
 
+        Returns
+        -------
+        generator
+            Yields the code in the order of :meth:`Model.to_optmodel`,
+            one component or one member of a group at a time
+
+        Examples
+        --------
+
+        >>> for chunk in m.iter_optmodel():
+        ...     print(chunk, end='')
+        proc optmodel;
+        var get {{'clock','mug','headphone','book','pen'}} integer >= 0;
+        ...
+        quit;
+
+        Notes
+        -----
+        * Joining the chunks gives the same string as
+          :meth:`Model.to_optmodel`, without keeping the whole program in
+          memory at once.
+        * Members of variable and constraint groups are yielded one at a
+          time, so the length of each part is bounded by the longest
+          single definition, such as the objective.
+        * Components should not be changed while the generator is consumed.
+        * Tables are added to ``tables`` while the generator is consumed.
+
+        '''
+        if ordered:
             if header:
-                s = 'proc optmodel;\n'
+                yield 'proc optmodel;\n'
 
             tab = '   '
 
-            s += tab + '/* Sets */\n'
+            yield tab + '/* Sets */\n'
             for i in self._sets:
-                s += tab + i._defn() + '\n'
+                yield tab + i._defn() + '\n'
 
-            s += '\n' + tab + '/* Parameters */\n'
+            yield '\n' + tab + '/* Parameters */\n'
             for i in self._parameters:
-                s += i._defn(tab) + '\n'
+                yield i._defn(tab) + '\n'
 
-            s += '\n' + tab + '/* Statements */\n'
+            yield '\n' + tab + '/* Statements */\n'
             for i in self._statements:
-                s += tab + i._defn() + '\n'
+                yield tab + i._defn() + '\n'
 
-            s += '\n' + tab + '/* Variables */\n'
+            yield '\n' + tab + '/* Variables */\n'
             for i in self._vargroups:
-                s += i._defn(tabs=tab) + '\n'
+                yield from i._iter_defn(tabs=tab)
+                yield '\n'
 
             for v in self._variables:
                 if v._parent is None:
-                    s += tab + v._defn() + '\n'
+                    yield tab + self._component_defn(v) + '\n'
 
-            s += '\n' + tab + '/* Implicit variables */\n'
+            yield '\n' + tab + '/* Implicit variables */\n'
             for v in self._impvars:
-                s += tab + v._defn() + '\n'
+                yield tab + v._defn() + '\n'
 
-            s += '\n' + tab + '/* Constraints */\n'
+            yield '\n' + tab + '/* Constraints */\n'
             for c in self._congroups:
-                s += c._defn(tabs=tab) + '\n'
+                yield from self._iter_group_defn(c, tables, tabs=tab)
+                yield '\n'
 
             for c in self._constraints:
                 if c._parent is None:
-                    s += tab + c._defn() + '\n'
+                    yield tab + self._component_defn(c) + '\n'
 
-            s += '\n' + tab + '/* Objective */\n'
+            yield '\n' + tab + '/* Objective */\n'
             if self._objective is not None:
-                s += tab + '{} {} = '.format(self._sense.lower(),
-                                             self._objective._name)
-                s += self._objective._defn() + '; \n'
+                yield tab + '{} {} = '.format(self._sense.lower(),
+                                              self._objective._name)
+                yield self._objective._defn() + '; \n'
 
-            s += '\n' + tab + '/* Solver call */\n'
+            yield '\n' + tab + '/* Solver call */\n'
             if expand:
-                s += tab + 'expand;\n'
+                yield tab + 'expand;\n'
 
-            s += tab + 'solve'
+            s = tab + 'solve'
             if options.get('with', None):
                 s += ' with ' + options['with']
             if options.get('relaxint', False):
@@ -1802,55 +2748,18 @@ params=[{'param': value, 'column': 'value'}])
 
             if header:
                 s += 'quit;\n'
+            yield s
         else:
             # Based on creation order
-            s = ''
             if header:
-                s = 'proc optmodel;\n'
-            allcomp = (
-                self._sets +
-                self._parameters +
-                self._statements +
-                self._vargroups +
-                self._variables +
-                self._impvars +
-                self._congroups +
-                self._constraints +
-                [self._objective]
-                )
-            sorted_comp = sorted(allcomp, key=lambda i: i._objorder)
-            for cm in sorted_comp:
-                if id(cm) == id(self._objective):
-                    s += '{} {} = '.format(self._sense.lower(),
-                                           self._objective._name)
-                    s += self._objective._defn() + '; \n'
-                elif (cm._objorder > 0 and
-                      not (hasattr(cm, '_shadow') and cm._shadow) and
-                      not (hasattr(cm, '_parent') and cm._parent)):
-                    if not hasattr(cm, '_after') or not cm._after:
-                        s += cm._defn() + '\n'
+                yield 'proc optmodel;\n'
+            yield from self._iter_definitions(tables=tables)
+            s = ''
             if expand:
                 s += 'expand;\n'
 
             # Solve block
-            s += 'solve'
-            if options.get('with', None):
-                s += ' with ' + options['with']
-            if options.get('relaxint', False):
-                s += ' relaxint'
-            if options:
-                optstring = ''
-                for key, value in options.items():
-                    if key not in ('with', 'relaxint'):
-                        if type(value) is dict:
-                            optstring += ' {}=('.format(key) + ','.join(
-                                '{}={}'.format(i, j)
-                                for i, j in value.items()) + ')'
-                        else:
-                            optstring += ' {}={}'.format(key, value)
-                if optstring:
-                    s += ' /' + optstring
-            s += ';\n'
+            s += self._optmodel_solve(options) + '\n'
             # Output ODS tables
             if ods:
                 s += 'ods output PrintTable=primal_out;\n'
@@ -1866,7 +2775,161 @@ params=[{'param': value, 'column': 'value'}])
 
             if header:
                 s += 'quit;\n'
-        return(s)
+            yield s
+
+    def write_optmodel(self, file, header=True, expand=False, ordered=False,
+                       ods=False, options={}, tables=None):
+        '''
+        Writes the PROC OPTMODEL code of the model into a file
+
+        Parameters
+        ----------
+        file : string or file-like object
+            Path of the file, or an object with a ``write`` method
+        header : boolean, optional
+            Option to include PROC headers
+        expand : boolean, optional
+            Option to include 'expand' command to OPTMODEL code
+        ordered : boolean, optional
+            Option to generate OPTMODEL code in a specific order (True) or\
+            in creation order (False)
+        ods : boolean, optional
+            Option to write output tables using ODS statements
+        options : dict, optional
+            Solver options for the OPTMODEL solve command
+        tables : dict, optional
+            Dictionary to collect coefficient tables of constraint groups
+            written in compact form, see :meth:`Model.iter_optmodel`
+
+        Returns
+        -------
+        int
+            Number of characters written
+
+        Examples
+        --------
+
+        >>> m.write_optmodel('knapsack.sas')
+        1057
+
+        >>> with open('knapsack.sas', 'a') as f:
+        ...     m.write_optmodel(f, header=False)
+
+        '''
+        chunks = self.iter_optmodel(header=header, expand=expand,
+                                    ordered=ordered, ods=ods, options=options,
+                                    tables=tables)
+        if isinstance(file, str):
+            with open(file, 'w') as f:
+                return sum(f.write(chunk) for chunk in chunks)
+        written = 0
+        for chunk in chunks:
+            file.write(chunk)
+            written += len(chunk)
+        return written
+
+    def _optmodel_definitions(self, assignable=()):
+        '''
+        Returns OPTMODEL declarations of all components in creation order
+
+        Parameters
+        ----------
+        assignable : list, optional
+            Parameters to be declared with initial values instead of
+            definitions, so they can be assigned later
+        '''
+        return ''.join(self._iter_definitions(assignable))
+
+    def _iter_definitions(self, assignable=(), tables=None):
+        '''
+        Yields OPTMODEL declarations of all components in creation order
+        '''
+        allcomp = (
+            self._sets +
+            self._parameters +
+            self._statements +
+            self._vargroups +
+            self._variables +
+            self._impvars +
+            self._congroups +
+            self._constraints +
+            [self._objective]
+            )
+        assignable = [id(i) for i in assignable]
+        sorted_comp = sorted(allcomp, key=lambda i: i._objorder)
+        for cm in sorted_comp:
+            if id(cm) == id(self._objective):
+                yield '{} {} = '.format(self._sense.lower(),
+                                        self._objective._name)
+                yield self._objective._defn() + '; \n'
+            elif id(cm) in assignable and cm._init is not None and\
+                    cm._keys == ():
+                yield '{} {} init {};\n'.format(cm._type, cm._name, cm._init)
+            elif isinstance(cm, sasoptpy.components.ConstraintGroup) and\
+                    cm._objorder > 0:
+                yield from self._iter_group_defn(cm, tables)
+                yield '\n'
+            elif isinstance(cm, sasoptpy.components.VariableGroup) and\
+                    cm._objorder > 0:
+                yield from cm._iter_defn()
+                yield '\n'
+            elif (cm._objorder > 0 and
+                  not (hasattr(cm, '_shadow') and cm._shadow) and
+                  not (hasattr(cm, '_parent') and cm._parent)):
+                if not hasattr(cm, '_after') or not cm._after:
+                    yield self._component_defn(cm) + '\n'
+
+    def _upload_tables(self, session, tables, report):
+        '''
+        Uploads coefficient tables of constraint groups in compact form
+        '''
+        if not tables:
+            return
+        logger.info('Uploading {} coefficient tables to the server.'.format(
+            len(tables)))
+        with report.phase('upload'):
+            for table, df in tables.items():
+                session.upload_frame(df, casout={'name': table,
+                                                 'replace': True})
+                report.bytes_uploaded += sasoptpy.backends.frame_bytes(df)
+
+    def _iter_group_defn(self, cg, tables, tabs=''):
+        '''
+        Yields the definition of a constraint group, in compact form if
+        ``tables`` is given and the group allows it
+        '''
+        if tables is not None:
+            table = '{}_COEF'.format(cg._name)
+            compact = cg._compact_defn(table, tabs=tabs)
+            if compact is not None:
+                tables[table] = compact[1]
+                yield compact[0]
+                return
+        yield from cg._iter_defn(tabs=tabs, cache=self._defn_caching)
+
+    def _optmodel_solve(self, options):
+        '''
+        Returns the OPTMODEL solve statement for given solver options
+        '''
+        s = 'solve'
+        if options.get('with', None):
+            s += ' with ' + options['with']
+        if options.get('relaxint', False):
+            s += ' relaxint'
+        if options:
+            optstring = ''
+            for key, value in options.items():
+                if key not in ('with', 'relaxint'):
+                    if type(value) is dict:
+                        optstring += ' {}=('.format(key) + ','.join(
+                            '{}={}'.format(i, j)
+                            for i, j in value.items()) + ')'
+                    else:
+                        optstring += ' {}={}'.format(key, value)
+            if optstring:
+                s += ' /' + optstring
+        s += ';'
+        return s
 
     def __str__(self):
         '''
@@ -1902,9 +2965,9 @@ params=[{'param': value, 'column': 'value'}])
         '''
         s = 'Model: [\n'
         s += '  Name: {}\n'.format(self._name)
-        if self._session is not None:
-            s += '  Session: {}:{}\n'.format(self._session._hostname,
-                                             self._session._port)
+        backend = sasoptpy.backends.get_backend(self._session)
+        if backend is not None:
+            s += '  Session: {}\n'.format(backend.address())
         s += '  Objective: {} [{}]\n'.format(self._sense,
                                              self._objective)
         s += '  Variables ({}): [\n'.format(len(self._variables))
@@ -1966,12 +3029,107 @@ params=[{'param': value, 'column': 'value'}])
             True if model does not have any nonlinear components or abstract\
             operations, False otherwise
         '''
-        for c in self._constraints:
-            if not c._is_linear():
-                return False
-        if not self._objective._is_linear():
+        self._refresh_columns()
+        if self._stats['nonlinear']:
+            return False
+        return self._objective._is_linear()
+
+    def _is_quadratic(self):
+        '''
+        Checks if the model can be written as a quadratic model (in MPS
+        format with a QUADOBJ section)
+
+        Returns
+        -------
+        boolean
+            True if constraints are linear, variables are continuous and
+            the objective has only products of two variables as nonlinear
+            terms, False otherwise
+        '''
+        self._refresh_columns()
+        if self._stats['nonlinear'] or self._has_integers():
             return False
-        return True
+        return self._objective._get_quadratic() is not None
+
+    def detect_blocks(self, linking=None, partitioner=None):
+        '''
+        Finds decomposition blocks of constraints automatically
+
+        Parameters
+        ----------
+        linking : list, optional
+            List of :class:`Constraint` and :class:`ConstraintGroup` objects
+            to be used as linking constraints
+        partitioner : function, optional
+            Function called as ``partitioner(rows, ncols)`` on the
+            constraint-variable incidence, returning the block number of
+            each row, see :func:`connected_components`
+
+        Returns
+        -------
+        int
+            Number of blocks found
+
+        Examples
+        --------
+
+        >>> x = m.add_variables(3, 2, name='x', vartype=so.BIN)
+        >>> link = m.add_constraints((x.sum('*', j) <= 1 for j in range(2)),
+        ...                          name='link')
+        >>> cap = m.add_constraints((x.sum(i, '*') <= 1 for i in range(3)),
+        ...                         name='cap')
+        >>> print(m.detect_blocks())
+        NOTE: Found 3 blocks with 2 linking constraints in model m.
+        3
+        >>> m.solve(options={'with': 'milp', 'decomp': {'method': 'user'}})
+
+        Notes
+        -----
+
+        - Blocks are connected components of the incidence graph of
+          constraints and variables after linking constraints are removed.
+        - If ``linking`` is not given and the constraints are connected,
+          each constraint group is tried as linking constraints and the
+          group giving the most blocks is chosen. The search costs one
+          partitioner call per constraint group.
+        - Block numbers are assigned to constraints using
+          :meth:`Constraint.set_block`, replacing existing blocks. Linking
+          and empty constraints are not assigned to a block.
+
+        '''
+        if partitioner is None:
+            partitioner = sasoptpy.decomposition.connected_components
+        self._refresh_columns()
+        cons = list({id(c): c for c in self._constraints}.values())
+        columns = {}
+        rows = []
+        for c in cons:
+            rows.append([columns.setdefault(name, len(columns))
+                         for name in self._rows[id(c)]])
+        positions = {id(c): i for i, c in enumerate(cons)}
+        if linking is not None:
+            fixed = set()
+            for c in linking:
+                members = c if isinstance(
+                    c, sasoptpy.components.ConstraintGroup) else [c]
+                fixed.update(positions[id(i)] for i in members
+                             if id(i) in positions)
+            rows = [[] if i in fixed else row for i, row in enumerate(rows)]
+            blocks = partitioner(rows, len(columns))
+            linking_rows = fixed
+        else:
+            groups = {}
+            for i, c in enumerate(cons):
+                if c._parent is not None:
+                    groups.setdefault(id(c._parent), set()).add(i)
+            blocks, linking_rows = sasoptpy.decomposition._find_blocks(
+                rows, len(columns), list(groups.values()), partitioner)
+        for c, b in zip(cons, blocks):
+            c.set_block(b)
+        count = len(set(blocks) - {None})
+        logger.info('Found {} blocks with {} linking constraints in model '
+                    '{}.'.format(count, len(linking_rows), self._name))
+        return count
 
     def upload_user_blocks(self):
         '''
@@ -1988,14 +3146,22 @@ params=[{'param': value, 'column': 'value'}])
         >>> userblocks = m.upload_user_blocks()
         >>> m.solve(milp={'decomp': {'blocks': userblocks}})
 
+        Notes
+        -----
+
+        - If no constraint has a block, blocks are found using
+          :meth:`Model.detect_blocks`.
+
         '''
-        sess = self._session
+        sess = sasoptpy.backends.get_backend(self._session)
         blocks_dict = {}
         block_counter = 0
         if sess is None:
-            print('ERROR: CAS Session is not defined for model {}.'.format(
+            logger.error('CAS Session is not defined for model {}.'.format(
                 self._name))
             return None
+        if all(c._block is None for c in self._constraints):
+            self.detect_blocks()
         decomp_table = []
         for c in self._constraints:
             if c._block is not None:
@@ -2024,19 +3190,36 @@ params=[{'param': value, 'column': 'value'}])
         # Check if session is defined
         sess = self._session
         if sess is None:
-            print('ERROR: No session is not defined for model {}.'.format(
+            logger.error('No session is not defined for model {}.'.format(
                 self._name))
             return None
         else:
+            backend = sasoptpy.backends.get_backend(sess)
             sess_type = type(sess).__name__
-            if sess_type == 'CAS':
-                return 'CAS'
-            elif sess_type == 'SASsession':
-                return 'SAS'
+            if backend is not None:
+                return backend.kind
             else:
-                print('ERROR: Unrecognized session type: {}'.format(sess_type))
+                logger.error('Unrecognized session type: {}'.format(sess_type))
                 return None
 
+    def get_backend(self):
+        '''
+        Returns the backend wrapping the model session
+
+        Returns
+        -------
+        :class:`SessionBackend` object
+            Backend of the session, None if the session is not valid
+
+        See also
+        --------
+        :func:`get_backend`, :func:`register_backend`
+
+        '''
+        if self.test_session():
+            return sasoptpy.backends.get_backend(self._session)
+        return None
+
     def upload_model(self, name=None, replace=True, constant=False):
         '''
         Converts internal model to MPS table and upload to CAS session
@@ -2063,22 +3246,24 @@ params=[{'param': value, 'column': 'value'}])
           to be used. :func:`Model.solve` calls this method internally.
 
         '''
-        if self.test_session():
+        backend = self.get_backend()
+        if backend is not None:
             # Conversion and upload
             df = self.to_frame(constant=constant)
-            print('NOTE: Uploading the problem DataFrame to the server.')
+            logger.info('Uploading the problem DataFrame to the server.')
             if name is not None:
-                return self._session.upload_frame(
+                return backend.upload_frame(
                     data=df, casout={'name': name, 'replace': replace})
             else:
-                return self._session.upload_frame(
+                return backend.upload_frame(
                     data=df, casout={'replace': replace})
         else:
             return None
 
     def solve(self, options=None, submit=True, name=None,
               frame=False, drop=False, replace=True, primalin=False,
-              milp=None, lp=None, verbose=False):
+              milp=None, lp=None, verbose=False, compact=False,
+              presolve=False):
         '''
         Solves the model by calling CAS or SAS optimization solvers
 
@@ -2100,6 +3285,12 @@ params=[{'param': value, 'column': 'value'}])
             Switch for using initial values (only MILP)
         verbose : boolean, optional (experimental)
             Switch for printing generated OPTMODEL code
+        compact : boolean, optional
+            Switch for uploading coefficients of constraint groups as tables
+            in OPTMODEL mode, see :meth:`Model.iter_optmodel`
+        presolve : boolean, optional
+            Switch for removing redundant rows and columns before the
+            problem is uploaded in MPS format, see :class:`Presolver`
 
         Returns
         -------
@@ -2126,12 +3317,24 @@ params=[{'param': value, 'column': 'value'}])
         -----
 
         * This method is essentially a wrapper for two other methods.
+        * Phase timings, transferred bytes and problem size of each solve
+          are recorded in a :class:`SolveReport`, see
+          :meth:`Model.get_reports`.
         * Some of the options listed under ``options`` argument may not be
           passed based on which CAS Action is being used.
         * The ``option`` argument should be a dictionary, where keys are
           option names. For example, ``m.solve(options={'maxtime': 600})``
           limits the solution time to 600 seconds.
         * See :ref:`solver-options` for a list of solver options.
+        * With ``frame=True``, models with linear constraints, continuous
+          variables and a quadratic objective are uploaded in MPS format
+          and solved with the QP solver instead of OPTMODEL.
+        * With ``presolve=True``, values and dual values of removed
+          variables and constraints are computed after the solve, and
+          numbers of removed components are recorded in the ``info`` of
+          the solve report. The objective value reported by the solver
+          does not include terms of removed variables, whereas
+          :meth:`Model.get_objective_value` does.
 
         See also
         --------
@@ -2145,11 +3348,11 @@ params=[{'param': value, 'column': 'value'}])
         session_type = self.test_session()
         solver_func = None
         if session_type == 'CAS':
-            sess = self._session
+            sess = self.get_backend()
             # Check if dataframe format, if it is, pass relevant parameters
             solver_func = self.solve_on_cas
         elif session_type == 'SAS':
-            sess = self._session
+            sess = self.get_backend()
             solver_func = self.solve_on_mva
         else:
             return None
@@ -2169,13 +3372,511 @@ params=[{'param': value, 'column': 'value'}])
             options['with'] = 'lp'
 
         # Call solver based on session type
-        return solver_func(
-            sess, options=options, submit=submit, name=name,
-            drop=drop, frame=frame, replace=replace, primalin=primalin,
-            verbose=verbose)
+        report = sasoptpy.report.SolveReport(self)
+        self._report = report
+        try:
+            return solver_func(
+                sess, options=options, submit=submit, name=name,
+                drop=drop, frame=frame, replace=replace, primalin=primalin,
+                verbose=verbose, compact=compact, presolve=presolve)
+        finally:
+            self._report = None
+            if submit:
+                sasoptpy.report.publish_report(self, report)
+
+    def solve_async(self, options=None, timeout=None, executor=None,
+                    **kwargs):
+        '''
+        Solves the model in a worker thread and returns immediately
+
+        Parameters
+        ----------
+        options : dict, optional
+            A dictionary solver options
+        timeout : float, optional
+            Time limit in seconds, measured from the submission
+        executor : :class:`concurrent.futures.Executor`, optional
+            Executor to run the solve, a shared bounded pool by default
+        kwargs :
+            Other arguments of :meth:`Model.solve`
+
+        Returns
+        -------
+        :class:`SolveFuture` object
+            Future whose result is the return value of :meth:`Model.solve`
+
+        Examples
+        --------
+
+        >>> f = m.solve_async(options={'maxtime': 600})
+        >>> # ... build other models meanwhile
+        >>> f.result()
+
+        >>> result = await asyncio.wrap_future(m.solve_async())
+
+        Notes
+        -----
+
+        - The shared pool runs at most ``DEFAULT_MAX_WORKERS`` solves at a
+          time, see :func:`set_max_workers`.
+        - Calling :meth:`SolveFuture.cancel` on a running solve stops it at
+          the next phase boundary.
+        - Models sharing a session wait for each other during server calls.
+
+        See also
+        --------
+        :meth:`Model.solve`, :func:`solve_all`
+
+        '''
+        return sasoptpy.concurrency.submit_solve(
+            self, executor=executor, timeout=timeout, options=options,
+            **kwargs)
+
+    def _scenario_target(self, column):
+        '''
+        Returns OPTMODEL references and parameter overridden by a column
+        '''
+        column = str(column)
+        base, _, suffix = column.rpartition('.')
+        if suffix not in ('lb', 'ub'):
+            base, suffix = column, None
+        if base in self._constraintDict:
+            c = self._constraintDict[base]
+            if c._parent is not None:
+                ref = c._parent._name + sasoptpy.utils._to_optmodel_loop(
+                    c._key)
+            else:
+                ref = c._name
+            if suffix is not None:
+                return ['{}.{}'.format(ref, suffix)], None
+            elif c._range != 0:
+                logger.error('Use {0}.lb or {0}.ub to override the range '
+                             'constraint {0}.'.format(base))
+                return None, None
+            elif c._direction == 'L':
+                return [ref + '.ub'], None
+            elif c._direction == 'G':
+                return [ref + '.lb'], None
+            else:
+                return [ref + '.lb', ref + '.ub'], None
+        if suffix is not None and base in self._variableDict:
+            v = self._variableDict[base]
+            return ['{}.{}'.format(v._expr(), suffix)], None
+        pname = column.split('[')[0]
+        for p in self._parameters:
+            if p._name == pname:
+                if p._keys != () or column != pname:
+                    logger.error('Column {} overrides the indexed parameter '
+                                 '{}; only scalar parameters can be '
+                                 'overridden.'.format(column, pname))
+                    return None, None
+                return [column], p
+        logger.error('Column {} does not match any constraint, variable '
+                     'bound or parameter of model {}.'.format(
+                         column, self._name))
+        return None, None
+
+    def solve_scenarios(self, scenarios, options=None, name=None,
+                        submit=True, verbose=False, drop=False):
+        '''
+        Solves the model for a batch of scenarios in a single server call
+
+        Parameters
+        ----------
+        scenarios : :class:`pandas.DataFrame` object
+            Overrides of each scenario, indexed by scenario. Columns are
+            constraint names (right-hand side), constraint or variable names
+            with '.lb' or '.ub' suffix (bounds) and parameter names
+        options : dict, optional
+            Solver options for each solve
+        name : string, optional
+            Prefix of the server tables
+        submit : boolean, optional
+            Switch for calling the solver instantly
+        verbose : boolean, optional
+            Switch for printing generated OPTMODEL code
+        drop : boolean, optional
+            Switch for dropping the server tables after solve
+
+        Returns
+        -------
+        :class:`pandas.DataFrame` object
+            Status, objective value and variable values, one row for each
+            scenario
+
+        Examples
+        --------
+
+        >>> scenarios = pd.DataFrame(
+        ...     [[55, 3], [60, 4], [65, 3]], index=['low', 'mid', 'high'],
+        ...     columns=['weight_con', 'get[clock].ub'])
+        >>> m.solve_scenarios(scenarios)
+        NOTE: Converting model knapsack to OPTMODEL.
+        NOTE: Submitting 3 scenarios to the server.
+                status  objective  get[clock]  get[mug]  ...
+        scenario
+        low    OPTIMAL         99         3.0       4.0  ...
+        mid    OPTIMAL        108         4.0       4.0  ...
+        high   OPTIMAL        117         3.0       5.0  ...
+
+        Notes
+        -----
+
+        - The overrides are uploaded as a table and read into OPTMODEL.
+          Scenarios are solved concurrently on the server using a COFOR
+          loop and results are collected with CREATE DATA, so the model is
+          sent and parsed once for all scenarios.
+        - Missing values in ``scenarios`` keep the original values.
+        - Only scalar parameters can be overridden.
+        - Solutions are not assigned to the variables of the model.
+        - A 'CAS' session with runOptmodel action or a 'SAS' session is
+          required.
+
+        '''
+        if options is None:
+            options = {}
+        session = self.get_backend()
+        if session is None:
+            return None
+        if not session.has_optmodel():
+            logger.error('Scenario solve requires the runOptmodel action.')
+            return None
+
+        prefix = sasoptpy.utils.check_name(name, 'table')
+        sasoptpy.utils.register_name(prefix, scenarios)
+        overrides = pd.DataFrame(index=scenarios.index)
+        targets = []
+        params = []
+        for i, col in enumerate(scenarios.columns, start=1):
+            refs, param = self._scenario_target(col)
+            if refs is None:
+                return None
+            if param is not None:
+                params.append(param)
+            overrides['_S{}_'.format(i)] = scenarios[col].astype(float)
+            targets.append(refs)
+        overrides.index.name = '_SCENARIO_'
+        overrides = overrides.reset_index()
+        str_keys = not pd.api.types.is_numeric_dtype(
+            overrides['_SCENARIO_'])
+
+        report = self._active_report('scenarios')
+        report.set_size(self)
+        report.info['scenarios'] = len(overrides)
+        logger.info('Converting model {} to OPTMODEL.'.format(self._name))
+        with report.phase('convert'):
+            s = self._optmodel_definitions(assignable=params)
+            s += 'set {}SCENARIOS;\n'.format('<str> ' if str_keys else '')
+            for i in range(1, len(targets)+1):
+                s += 'num _sc{0}_ {{SCENARIOS}};\n'.format(i)
+            s += 'read data {} into SCENARIOS=[_SCENARIO_] '.format(
+                prefix + '_IN')
+            s += ' '.join('_sc{0}_=_S{0}_'.format(i)
+                          for i in range(1, len(targets)+1)) + ';\n'
+            # Keep original values for missing overrides
+            for i, refs in enumerate(targets, start=1):
+                for j, ref in enumerate(refs):
+                    s += 'num _sc{}_base{}_ init {};\n'.format(i, j, ref)
+            s += 'num _sc_obj_ {SCENARIOS};\n'
+            s += 'str _sc_status_ {SCENARIOS};\n'
+            s += 'num _sc_value_ {SCENARIOS, 1.._NVAR_};\n'
+            s += 'cofor {s in SCENARIOS} do;\n'
+            for i, refs in enumerate(targets, start=1):
+                for j, ref in enumerate(refs):
+                    s += ('   {0} = if _sc{1}_[s] = . then _sc{1}_base{2}_ '
+                          'else _sc{1}_[s];\n').format(ref, i, j)
+            s += '   ' + self._optmodel_solve(options) + '\n'
+            s += '   _sc_obj_[s] = _OBJ_;\n'
+            s += '   _sc_status_[s] = _solution_status_;\n'
+            s += '   for {j in 1.._NVAR_} _sc_value_[s, j] = _VAR_[j].sol;\n'
+            s += 'end;\n'
+            s += ('create data {} from [_SCENARIO_]={{s in SCENARIOS}} '
+                  '_STATUS_=_sc_status_ _OBJECTIVE_=_sc_obj_;\n').format(
+                      prefix + '_SUMMARY')
+            s += ('create data {} from [_SCENARIO_ _J_]='
+                  '{{s in SCENARIOS, j in 1.._NVAR_}} _VAR_=_VAR_[j].name '
+                  '_VALUE_=_sc_value_[s, j];\n').format(prefix + '_PRIMAL')
+
+        if session.kind == 'SAS':
+            s = 'proc optmodel;\n' + s + 'quit;\n'
+        if verbose:
+            print(s)
+        if not submit:
+            return s
+
+        sasoptpy.concurrency.checkpoint()
+        logger.info('Submitting {} scenarios to the server.'.format(
+            len(overrides)))
+        frame_bytes = sasoptpy.backends.frame_bytes
+        with sasoptpy.concurrency.session_lock(session.session):
+            with report.phase('upload'):
+                session.upload_frame(overrides, casout={
+                    'name': prefix + '_IN', 'replace': True})
+            report.bytes_uploaded += frame_bytes(overrides) + len(
+                s.encode('utf-8'))
+            with report.phase('solve'):
+                self.response = session.run_optmodel(s)
+            with report.phase('download'):
+                summary = session.fetch_table(prefix + '_SUMMARY')
+                primal = session.fetch_table(prefix + '_PRIMAL')
+            report.bytes_downloaded += frame_bytes(summary) + frame_bytes(
+                primal)
+            if drop:
+                for t in ('_IN', '_SUMMARY', '_PRIMAL'):
+                    session.drop_table(prefix + t)
+
+        # Collect results in scenario order
+        with report.phase('parse'):
+            summary = summary.set_index(['_SCENARIO_'])
+            summary.columns = [c.strip('_').lower() for c in summary.columns]
+            values = primal.pivot(index='_SCENARIO_', columns='_VAR_',
+                                  values='_VALUE_')
+            var_order = primal.drop_duplicates(['_VAR_'])['_VAR_'].tolist()
+            result = summary.join(values[var_order])
+            result = result.reindex(scenarios.index)
+            result.index.name = 'scenario'
+            result.columns.name = None
+        self._publish_batch_report(report, result['status'])
+        return result
+
+    def _sweep_frame(self, obj_vars, rhs_cons):
+        '''
+        Returns the MPS table for sweeps and the row ids of varying entries
+
+        Notes
+        -----
+
+        - Every variable in ``obj_vars`` gets an objective entry and every
+          constraint in ``rhs_cons`` gets its own RHS row, even when their
+          values are zero, so variants can be applied by replacing Field4.
+
+        '''
+        objective = self._objective
+        added = [v for v in obj_vars if v._name not in objective._linCoef]
+        for v in added:
+            objective._linCoef[v._name] = {'ref': v, 'val': 0}
+        try:
+            df = self.to_frame()
+        finally:
+            for v in added:
+                del objective._linCoef[v._name]
+
+        # Objective entries are always the first pair of a column row
+        obj_ids = {v._name: self._vcid[v._name][objective._name]
+                   for v in obj_vars}
+
+        # Write each RHS value on a separate row
+        start = df.index[df['Field1'] == 'RHS'][0]
+        end = df.index[df['Field1'] == 'RANGES'][0]
+        rhs_rows = []
+        for c in self._constraints:
+            rhs = - c._linCoef['CONST']['val']
+            if c._name in rhs_cons or (rhs != 0 and rhs != inf):
+                rhs_rows.append(['', 'RHS', c._name, rhs, '', '', 0])
+        rhs_rows = pd.DataFrame(rhs_rows, columns=df.columns)
+        df = pd.concat([df.iloc[:start+1], rhs_rows, df.iloc[end:]],
+                       ignore_index=True)
+        df['_id_'] = range(1, len(df)+1)
+        rhs_ids = {r: start + 2 + i for i, r in
+                   enumerate(rhs_rows['Field3'].tolist())}
+
+        for f in ['Field4', 'Field6']:
+            df[f] = df[f].replace('', np.nan).astype(float)
+        return df, obj_ids, rhs_ids
+
+    def solve_sweep(self, objectives=None, rhs=None, options=None,
+                    name=None, drop=False):
+        '''
+        Solves the model for several objective functions and right-hand
+        sides by uploading the problem once
+
+        Parameters
+        ----------
+        objectives : dict, optional
+            Linear :class:`Expression` objects to be used as the objective,
+            keyed by variant name
+        rhs : :class:`pandas.DataFrame` object, optional
+            Right-hand side values, indexed by constraint name, with a
+            column for each variant
+        options : dict, optional
+            Solver options
+        name : string, optional
+            Name of the MPS table on the server
+        drop : boolean, optional
+            Switch for dropping the MPS table after the sweep
+
+        Returns
+        -------
+        :class:`pandas.DataFrame` object
+            Status, objective value and variable values, one row for each
+            variant
+
+        Examples
+        --------
+
+        >>> sol = m.solve_sweep(
+        ...     objectives={'capacity': total_productive_capacity,
+        ...                 'production': total_production},
+        ...     rhs=pd.DataFrame({'low': [100, 120], 'high': [150, 180]},
+        ...                      index=['c1', 'c2']))
+        >>> print(sol)
+                     status      objective  production[coal, 0]  ...
+        variant
+        capacity    OPTIMAL  2141.87763138                  0.0  ...
+        production  OPTIMAL  2618.57841614                  0.0  ...
+        low         OPTIMAL  ...
+
+        Notes
+        -----
+
+        - The structure of the problem is converted and uploaded once.
+          For each variant, only the objective coefficients and right-hand
+          side values that differ from the previous variant are uploaded
+          and patched into the table on the server.
+        - A variant name appearing in both ``objectives`` and ``rhs``
+          changes both. Otherwise, the model objective and the original
+          right-hand sides are used.
+        - Missing values in ``rhs`` keep the original values.
+        - Objective sense is the model sense. Solutions are not assigned to
+          the variables of the model.
+        - Only available for linear models in a 'CAS' session.
+
+        '''
+        if options is None:
+            options = {}
+        if objectives is None:
+            objectives = {}
+        if rhs is None:
+            rhs = pd.DataFrame()
+        session = self.get_backend()
+        if session is None or session.kind != 'CAS':
+            logger.error('Sweeps require a CAS session.')
+            return None
+        if not self._is_linear() or not all(
+                e._is_linear() for e in objectives.values()):
+            logger.error('Sweeps are only available for linear models.')
+            return None
+
+        variants = list(objectives)
+        variants += [i for i in rhs.columns if i not in objectives]
+
+        # Variables and constraints whose values vary
+        obj_vars = [self._variableDict[v] for v in self._objective._linCoef
+                    if v in self._variableDict]
+        for e in objectives.values():
+            for v, t in e._linCoef.items():
+                if v == 'CONST':
+                    continue
+                if v not in self._variableDict:
+                    logger.error('Variable {} is not in model {}.'.format(
+                        v, self._name))
+                    return None
+                obj_vars.append(self._variableDict[v])
+        obj_vars = list({v._name: v for v in obj_vars}.values())
+        rhs_cons = set(str(i) for i in rhs.index)
+        for c in rhs_cons:
+            if c not in self._constraintDict:
+                logger.error('Constraint {} is not in model {}.'.format(
+                    c, self._name))
+                return None
+
+        session.prepare()
+        ptype = 2 if self._has_integers() else 1  # MILP or LP
+        has_const = 'objconstant' in session.valid_options(ptype)
+
+        report = self._active_report('sweep')
+        report.set_size(self)
+        report.info['variants'] = len(variants)
+        frame_bytes = sasoptpy.backends.frame_bytes
+        logger.info('Converting model {} to DataFrame.'.format(self._name))
+        with report.phase('convert'):
+            df, obj_ids, rhs_ids = self._sweep_frame(obj_vars, rhs_cons)
+        current = {}
+        for v, i in obj_ids.items():
+            current[i] = df.at[i-1, 'Field4']
+        for c, i in rhs_ids.items():
+            current[i] = df.at[i-1, 'Field4']
+        base_coef = {v: self._objective._linCoef.get(v, {'val': 0})['val']
+                     for v in obj_ids}
+        base_rhs = {c: - self._constraintDict[c]._linCoef['CONST']['val']
+                    for c in rhs_ids}
+
+        primal = []
+        summary = []
+        with sasoptpy.concurrency.session_lock(session.session):
+            logger.info('Uploading the problem DataFrame to the server.')
+            casout = {'replace': True}
+            if name is not None:
+                casout['name'] = name
+            with report.phase('upload'):
+                mps_table = session.upload_frame(data=df, casout=casout)
+            report.bytes_uploaded += frame_bytes(df)
+            for variant in variants:
+                sasoptpy.concurrency.checkpoint()
+                # Find the entries changed by the variant
+                target = {}
+                expr = objectives.get(variant, self._objective)
+                for v, i in obj_ids.items():
+                    if variant in objectives:
+                        target[i] = expr._linCoef.get(v, {'val': 0})['val']
+                    else:
+                        target[i] = base_coef[v]
+                for c, i in rhs_ids.items():
+                    value = np.nan
+                    if variant in rhs.columns and c in rhs.index:
+                        value = rhs.at[c, variant]
+                    target[i] = base_rhs[c] if pd.isnull(value) else value
+                changed = sorted(i for i in target if target[i] != current[i])
+                if changed:
+                    delta = pd.DataFrame(
+                        {'_id_': changed,
+                         'Field4': [float(target[i]) for i in changed]})
+                    with report.phase('upload'):
+                        session.patch_table(mps_table.name, delta)
+                    report.bytes_uploaded += frame_bytes(delta)
+                    current.update({i: target[i] for i in changed})
+
+                opts = dict(options)
+                if has_const:
+                    opts['objconstant'] = expr._linCoef['CONST']['val']
+                with report.phase('solve'):
+                    response = session.solve_frame(
+                        mps_table.name, ptype, opts, self._sense,
+                        primalout='primal', dualout='dual')
+                if response.get_tables('status')[0] != 'OK':
+                    logger.error('{}'.format(response.get_tables('status')[0]))
+                    summary.append([variant, None, None])
+                    continue
+                with report.phase('download'):
+                    solution = session.fetch_table('primal', caslib='CASUSER')
+                report.bytes_downloaded += frame_bytes(solution)
+                if '_SOL_' in solution:
+                    solution = solution[solution['_SOL_'] == 1]
+                solution = solution.set_index(['_VAR_'])['_VALUE_']
+                solution.name = variant
+                primal.append(solution)
+                summary.append([variant, response.solutionStatus,
+                                response.objective])
+            if drop:
+                session.drop_table(mps_table.name)
+
+        # Collect solutions in columnar format
+        with report.phase('parse'):
+            summary = pd.DataFrame(summary, columns=['variant', 'status',
+                                                     'objective'])
+            summary = summary.set_index(['variant'])
+            if primal:
+                values = pd.concat(primal, axis=1).T
+                values = values[[v._name for v in self._variables
+                                 if v._name in values.columns]]
+                summary = summary.join(values)
+            summary.columns.name = None
+        self._publish_batch_report(report, summary['status'])
+        return summary
 
     def solve_on_cas(self, session, options, submit, name,
-                     frame, drop, replace, primalin, verbose):
+                     frame, drop, replace, primalin, verbose, compact=False,
+                     presolve=False):
         '''
         Solves the optimization problem on CAS Servers
 
@@ -2185,6 +3886,8 @@ params=[{'param': value, 'column': 'value'}])
         - This function is not supposed to be used directly. Instead, use
           the :class:`swat.cas.CAS` type of session for :class:`Model`
           objects and use :meth:`Model.solve`.
+        - ``session`` can be a CAS session or any :class:`SessionBackend`
+          of 'CAS' kind, such as :class:`LocalSession`.
 
         See also
         --------
@@ -2192,10 +3895,13 @@ params=[{'param': value, 'column': 'value'}])
 
         '''
 
+        session = sasoptpy.backends.get_backend(session)
+        frame_bytes = sasoptpy.backends.frame_bytes
+
         # Check which method will be used for solve
-        session.loadactionset(actionset='optimization')
+        session.prepare()
 
-        if frame or not hasattr(session.optimization, 'runoptmodel'):
+        if frame or not session.has_optmodel():
             frame = True
 
         # OPTMODEL variant does not accept decomp blocks yet
@@ -2207,273 +3913,328 @@ params=[{'param': value, 'column': 'value'}])
             switch = False
             # Check if model has sets or parameters
             if self._sets or self._parameters:
-                print('INFO: Model {} has data on server,'.format(self._name),
-                      'switching to OPTMODEL mode.')
+                # Models with local data are solved in MPS format
+                expanded = self._local_expansion()
+                if expanded is not None:
+                    return self._solve_expanded(
+                        expanded, 'solve_on_cas', session=session,
+                        options=options, submit=submit, name=name,
+                        frame=True, drop=drop, replace=replace,
+                        primalin=primalin, verbose=verbose,
+                        presolve=presolve)
+                logger.info('Model {} has data on server, switching to '
+                            'OPTMODEL mode.'.format(self._name))
                 switch = True
             # Check if model is nonlinear (or abstract)
-            elif not self._is_linear():
-                print('INFO: Model {} includes nonlinear or abstract ',
-                      'components, switching to OPTMODEL mode.')
+            elif not self._is_linear() and not self._is_quadratic():
+                logger.info('Model {} includes nonlinear or abstract '
+                            'components, switching to OPTMODEL mode.'.format(
+                                self._name))
                 switch = True
 
-            if switch and hasattr(session.optimization, 'runoptmodel'):
+            if switch and session.has_optmodel():
                 frame = False
             elif switch:
-                print('ERROR: Switching to OPTMODEL mode is failed,',
-                      ' runOptmodel action is not available in CAS Server.')
+                logger.error('Switching to OPTMODEL mode is failed, '
+                             'runOptmodel action is not available in CAS '
+                             'Server.')
                 return None
 
         if frame:  # MPS
-            print('NOTE: Converting model {} to DataFrame.'.format(self._name))
+            report = self._active_report('frame')
+            report.set_size(self)
+            logger.info('Converting model {} to DataFrame.'.format(self._name))
             # Pre-upload argument parse
 
             # Find problem type and initial values
-            ptype = 1  # LP
-            for v in self._variables:
-                if v._type != sasoptpy.utils.CONT:
-                    ptype = 2
-                    break
-
-            # Decomp check
-            try:
-                if options['decomp']['method'] == 'user':
-                            user_blocks = self.upload_user_blocks()
-                            options['decomp'] = {'blocks': user_blocks}
-            except KeyError:
-                pass
-
-            # Initial value check for MIP
-            if primalin:
-                init_values = []
-                var_names = []
-                if ptype == 2:
-                    for v in self._variables:
-                        if v._init is not None:
-                            var_names.append(v._name)
-                            init_values.append(v._init)
-                    if (len(init_values) > 0 and
-                       options.get('primalin', 1) is not None):
-                        primalinTable = pd.DataFrame(
-                            data={'_VAR_': var_names, '_VALUE_': init_values})
-                        session.upload_frame(
-                            primalinTable, casout={
-                                'name': 'PRIMALINTABLE', 'replace': True})
-                        options['primalin'] = 'PRIMALINTABLE'
+            ptype = 2 if self._has_integers() else 1  # MILP or LP
+            if not self._objective._is_linear():
+                ptype = 3  # QP
 
             # Check if objective constant workaround is needed
-            sfunc = session.solveLp if ptype == 1 else session.solveMilp
-            has_arg = 'objconstant' in inspect.signature(sfunc).parameters
+            has_arg = 'objconstant' in session.valid_options(ptype)
             if has_arg and 'objconstant' not in options:
                 objconstant = self._objective._linCoef['CONST']['val']
                 options['objconstant'] = objconstant
 
-            # Upload the problem
-            mps_table = self.upload_model(name, replace=replace,
-                                          constant=not has_arg)
-
-            if ptype == 1:
-                valid_opts = inspect.signature(session.solveLp).parameters
-                lp_opts = {}
-                for key, value in options.items():
-                    if key in valid_opts:
-                        lp_opts[key] = value
-                response = session.solveLp(
-                    data=mps_table.name, **lp_opts,
-                    primalOut={'caslib': 'CASUSER', 'name': 'primal',
-                               'replace': True},
-                    dualOut={'caslib': 'CASUSER', 'name': 'dual',
-                             'replace': True},
-                    objSense=self._sense)
-            elif ptype == 2:
-                valid_opts = inspect.signature(session.solveMilp).parameters
-                milp_opts = {}
-                for key, value in options.items():
-                    if key in valid_opts:
-                        milp_opts[key] = value
-                response = session.solveMilp(
-                    data=mps_table.name, **milp_opts,
-                    primalOut={'caslib': 'CASUSER', 'name': 'primal',
-                               'replace': True},
-                    dualOut={'caslib': 'CASUSER', 'name': 'dual',
-                             'replace': True},
-                    objSense=self._sense)
-
-            self.response = response
-
-            # Parse solution
-            if(response.get_tables('status')[0] == 'OK'):
-                self._primalSolution = session.CASTable(
-                    'primal', caslib='CASUSER').to_frame()
-                self._dualSolution = session.CASTable(
-                    'dual', caslib='CASUSER').to_frame()
-                # Bring solution to variables
-                for _, row in self._primalSolution.iterrows():
-                    if ('_SOL_' in self._primalSolution and row['_SOL_'] == 1)\
-                         or '_SOL_' not in self._primalSolution:
-                        self._variableDict[row['_VAR_']]._value =\
-                            row['_VALUE_']
-
-                # Capturing dual values for LP problems
-                if ptype == 1:
-                    self._primalSolution = self._primalSolution[
-                        ['_VAR_', '_LBOUND_', '_UBOUND_', '_VALUE_',
-                         '_R_COST_']]
-                    self._primalSolution.columns = ['var', 'lb', 'ub',
-                                                    'value', 'rc']
-                    self._dualSolution = self._dualSolution[
-                        ['_ROW_', '_ACTIVITY_', '_VALUE_']]
-                    self._dualSolution.columns = ['con', 'value', 'dual']
-                    for _, row in self._primalSolution.iterrows():
-                        self._variableDict[row['var']]._dual = row['rc']
-                    for _, row in self._dualSolution.iterrows():
-                        self._constraintDict[row['con']]._dual = row['dual']
-                elif ptype == 2:
+            # Convert the problem
+            presolver = None
+            with report.phase('convert'):
+                if presolve:
+                    presolver = sasoptpy.presolve.Presolver(self)
+                    report.info['presolve'] = presolver.run()
+                df = self.to_frame(constant=not has_arg, presolver=presolver)
+            sasoptpy.concurrency.checkpoint()
+
+            # Server calls on a session are serialized
+            with sasoptpy.concurrency.session_lock(session.session):
+                with report.phase('upload'):
+                    # Decomp check
+                    user_blocks = None
                     try:
+                        if options['decomp']['method'] == 'user':
+                                    user_blocks = self.upload_user_blocks()
+                                    options['decomp'] = {'blocks': user_blocks}
+                    except KeyError:
+                        pass
+
+                    # Initial value check for MIP
+                    if primalin:
+                        init_values = []
+                        var_names = []
+                        if ptype == 2:
+                            for v in self._variables:
+                                if presolver is not None and\
+                                        v._name in presolver._removed_cols:
+                                    continue
+                                if v._init is not None:
+                                    var_names.append(v._name)
+                                    init_values.append(v._init)
+                            if (len(init_values) > 0 and
+                               options.get('primalin', 1) is not None):
+                                primalinTable = pd.DataFrame(
+                                    data={'_VAR_': var_names,
+                                          '_VALUE_': init_values})
+                                session.upload_frame(
+                                    primalinTable, casout={
+                                        'name': 'PRIMALINTABLE',
+                                        'replace': True})
+                                report.bytes_uploaded += frame_bytes(
+                                    primalinTable)
+                                options['primalin'] = 'PRIMALINTABLE'
+
+                    # Upload the problem
+                    logger.info(
+                        'Uploading the problem DataFrame to the server.')
+                    casout = {'replace': replace}
+                    if name is not None:
+                        casout['name'] = name
+                    mps_table = session.upload_frame(data=df, casout=casout)
+                    report.bytes_uploaded += frame_bytes(df)
+                sasoptpy.concurrency.checkpoint()
+
+                with report.phase('solve'):
+                    response = session.solve_frame(
+                        mps_table.name, ptype, options, self._sense,
+                        primalout='primal', dualout='dual')
+                sasoptpy.concurrency.checkpoint()
+
+                self.response = response
+
+                # Fetch solution
+                if(response.get_tables('status')[0] == 'OK'):
+                    with report.phase('download'):
+                        self._primalSolution = session.fetch_table(
+                            'primal', caslib='CASUSER')
+                        self._dualSolution = session.fetch_table(
+                            'dual', caslib='CASUSER')
+                    report.bytes_downloaded += frame_bytes(
+                        self._primalSolution) + frame_bytes(self._dualSolution)
+
+                # Drop tables
+                if drop:
+                    session.drop_table(mps_table.name)
+                    if user_blocks is not None:
+                        session.drop_table(user_blocks)
+                    if primalin:
+                        session.drop_table('PRIMALINTABLE')
+
+            with report.phase('parse'):
+                # Parse solution
+                if(response.get_tables('status')[0] == 'OK'):
+                    # Bring solution to variables
+                    for _, row in self._primalSolution.iterrows():
+                        if ('_SOL_' in self._primalSolution and
+                                row['_SOL_'] == 1) or\
+                                '_SOL_' not in self._primalSolution:
+                            self._variableDict[row['_VAR_']]._value =\
+                                row['_VALUE_']
+
+                    # Capturing dual values for LP and QP problems
+                    if ptype in (1, 3):
                         self._primalSolution = self._primalSolution[
                             ['_VAR_', '_LBOUND_', '_UBOUND_', '_VALUE_',
-                             '_SOL_']]
+                             '_R_COST_']]
                         self._primalSolution.columns = ['var', 'lb', 'ub',
-                                                        'value', 'solution']
+                                                        'value', 'rc']
                         self._dualSolution = self._dualSolution[
-                            ['_ROW_', '_ACTIVITY_', '_SOL_']]
-                        self._dualSolution.columns = ['con', 'value',
-                                                      'solution']
-                    except:
-                        self._primalSolution = self._primalSolution[
-                            ['_VAR_', '_LBOUND_', '_UBOUND_', '_VALUE_']]
-                        self._primalSolution.columns = ['var', 'lb', 'ub',
-                                                        'value']
-                        self._dualSolution = self._dualSolution[
-                            ['_ROW_', '_ACTIVITY_']]
-                        self._dualSolution.columns = ['con', 'value']
-
-            # Drop tables
-            if drop:
-                session.table.droptable(table=mps_table.name)
-                if user_blocks is not None:
-                    session.table.droptable(table=user_blocks)
-                if primalin:
-                    session.table.droptable(table='PRIMALINTABLE')
-
-            # Post-solve parse
-            if(response.get_tables('status')[0] == 'OK'):
-                # Print problem and solution summaries
-                self._problemSummary = response.ProblemSummary[['Label1',
-                                                                'cValue1']]
-                self._solutionSummary = response.SolutionSummary[['Label1',
-                                                                  'cValue1']]
-                self._problemSummary.set_index(['Label1'], inplace=True)
-                self._problemSummary.columns = ['Value']
-                self._problemSummary.index.names = ['Label']
-                self._solutionSummary.set_index(['Label1'], inplace=True)
-                self._solutionSummary.columns = ['Value']
-                self._solutionSummary.index.names = ['Label']
-                # Record status and time
-                self._status = response.solutionStatus
-                self._soltime = response.solutionTime
-                if('OPTIMAL' in response.solutionStatus):
-                    self._objval = response.objective
-                    # Replace initial values with current values
-                    for v in self._variables:
-                        v._init = v._value
-                    return self._primalSolution
+                            ['_ROW_', '_ACTIVITY_', '_VALUE_']]
+                        self._dualSolution.columns = ['con', 'value', 'dual']
+                        for _, row in self._primalSolution.iterrows():
+                            self._variableDict[row['var']]._dual = row['rc']
+                        for _, row in self._dualSolution.iterrows():
+                            self._constraintDict[row['con']]._dual = \
+                                row['dual']
+                    elif ptype == 2:
+                        try:
+                            self._primalSolution = self._primalSolution[
+                                ['_VAR_', '_LBOUND_', '_UBOUND_', '_VALUE_',
+                                 '_SOL_']]
+                            self._primalSolution.columns = [
+                                'var', 'lb', 'ub', 'value', 'solution']
+                            self._dualSolution = self._dualSolution[
+                                ['_ROW_', '_ACTIVITY_', '_SOL_']]
+                            self._dualSolution.columns = ['con', 'value',
+                                                          'solution']
+                        except:
+                            self._primalSolution = self._primalSolution[
+                                ['_VAR_', '_LBOUND_', '_UBOUND_', '_VALUE_']]
+                            self._primalSolution.columns = ['var', 'lb', 'ub',
+                                                            'value']
+                            self._dualSolution = self._dualSolution[
+                                ['_ROW_', '_ACTIVITY_']]
+                            self._dualSolution.columns = ['con', 'value']
+
+                    # Values of removed variables and constraints
+                    if presolver is not None:
+                        presolver.postsolve(duals=(ptype in (1, 3)))
+
+                # Post-solve parse
+                if(response.get_tables('status')[0] == 'OK'):
+                    # Print problem and solution summaries
+                    self._problemSummary = response.ProblemSummary[
+                        ['Label1', 'cValue1']]
+                    self._solutionSummary = response.SolutionSummary[
+                        ['Label1', 'cValue1']]
+                    self._problemSummary.set_index(['Label1'], inplace=True)
+                    self._problemSummary.columns = ['Value']
+                    self._problemSummary.index.names = ['Label']
+                    self._solutionSummary.set_index(['Label1'], inplace=True)
+                    self._solutionSummary.columns = ['Value']
+                    self._solutionSummary.index.names = ['Label']
+                    # Record status and time
+                    self._status = response.solutionStatus
+                    self._soltime = response.solutionTime
+                    if('OPTIMAL' in response.solutionStatus):
+                        self._objval = response.objective
+                        if presolver is not None:
+                            self._objval += presolver._offset
+                        # Replace initial values with current values
+                        for v in self._variables:
+                            v.set_init(v._value)
+                        return self._primalSolution
+                    else:
+                        logger.info('Response {}'.format(
+                            response.solutionStatus))
+                        self._objval = 0
+                        return None
                 else:
-                    print('NOTE: Response {}'.format(response.solutionStatus))
-                    self._objval = 0
+                    logger.error('{}'.format(response.get_tables('status')[0]))
                     return None
-            else:
-                print('ERROR: {}'.format(response.get_tables('status')[0]))
-                return None
         else:  # OPTMODEL
 
             # Find problem type and initial values
-            ptype = 1  # LP
-            for v in self._variables:
-                if v._type != sasoptpy.utils.CONT:
-                    ptype = 2
-                    break
-
-            print('NOTE: Converting model {} to OPTMODEL.'.format(self._name))
-            optmodel_string = self.to_optmodel(header=False, options=options,
-                                               ods=False)
-            if verbose:
-                print(optmodel_string)
-            if not submit:
-                return optmodel_string
-            print('NOTE: Submitting OPTMODEL codes to CAS server.')
-            response = session.runOptmodel(
-                optmodel_string,
-                outputTables={
-                    'names': {'solutionSummary': 'solutionSummary',
-                              'problemSummary': 'problemSummary',
-                              'Print1.PrintTable': 'primal',
-                              'Print2.PrintTable': 'dual'}
-                    }
-                )
+            ptype = 2 if self._has_integers() else 1  # MILP or LP
+
+            report = self._active_report('optmodel')
+            report.set_size(self)
+            logger.info('Converting model {} to OPTMODEL.'.format(self._name))
+            tables = {} if compact else None
+            if submit and not verbose and not compact and\
+                    session.streams_optmodel:
+                # Code is generated while it is sent, inside the solve phase
+                code = self.iter_optmodel(
+                    header=False, options=options, ods=False)
+            else:
+                with report.phase('convert'):
+                    optmodel_string = self.to_optmodel(
+                        header=False, options=options, ods=False,
+                        tables=tables)
+                if verbose:
+                    print(optmodel_string)
+                if not submit:
+                    return optmodel_string
+                code = [optmodel_string]
+            sasoptpy.concurrency.checkpoint()
+            logger.info('Submitting OPTMODEL codes to CAS server.')
+            with sasoptpy.concurrency.session_lock(session.session):
+                self._upload_tables(session, tables, report)
+                with report.phase('solve'):
+                    response = session.run_optmodel_chunks(
+                        report.count_uploaded(code),
+                        output_tables={
+                            'names': {'solutionSummary': 'solutionSummary',
+                                      'problemSummary': 'problemSummary',
+                                      'Print1.PrintTable': 'primal',
+                                      'Print2.PrintTable': 'dual'}
+                            }
+                        )
+                if drop and tables:
+                    for table in tables:
+                        session.drop_table(table)
+            sasoptpy.concurrency.checkpoint()
 
             self.response = response
 
-            # Parse solution
-            if(response.get_tables('status')[0] == 'OK'):
-
-                self._primalSolution = response['Print1.PrintTable']
-                self._primalSolution = self._primalSolution[
-                    ['_VAR__NAME', '_VAR__LB', '_VAR__UB', '_VAR_',
-                     '_VAR__RC']]
-                self._primalSolution.columns = ['var', 'lb', 'ub', 'value',
-                                                'rc']
-                self._dualSolution = response['Print2.PrintTable']
-                self._dualSolution = self._dualSolution[
-                    ['_CON__NAME', '_CON__BODY', '_CON__DUAL']]
-                self._dualSolution.columns = ['con', 'value', 'dual']
-                # Bring solution to variables
-                for _, row in self._primalSolution.iterrows():
-                    if row['var'] in self._variableDict:
-                        self._variableDict[row['var']]._value = row['value']
-                    else:
-                        # Search in vargroups for the original name
-                        sasoptpy.utils._set_abstract_values(row)
+            with report.phase('parse'):
+                # Parse solution
+                if(response.get_tables('status')[0] == 'OK'):
 
-                # Capturing dual values for LP problems
-                if ptype == 1:
+                    report.bytes_downloaded += frame_bytes(
+                        response['Print1.PrintTable']) + frame_bytes(
+                            response['Print2.PrintTable'])
+                    self._primalSolution = response['Print1.PrintTable']
+                    self._primalSolution = self._primalSolution[
+                        ['_VAR__NAME', '_VAR__LB', '_VAR__UB', '_VAR_',
+                         '_VAR__RC']]
+                    self._primalSolution.columns = ['var', 'lb', 'ub', 'value',
+                                                    'rc']
+                    self._dualSolution = response['Print2.PrintTable']
+                    self._dualSolution = self._dualSolution[
+                        ['_CON__NAME', '_CON__BODY', '_CON__DUAL']]
+                    self._dualSolution.columns = ['con', 'value', 'dual']
+                    # Bring solution to variables
                     for _, row in self._primalSolution.iterrows():
                         if row['var'] in self._variableDict:
-                            self._variableDict[row['var']]._dual = row['rc']
-                    for _, row in self._dualSolution.iterrows():
-                        if row['con'] in self._constraintDict:
-                            self._constraintDict[row['con']]._dual =\
-                                row['dual']
-
-                self._solutionSummary = response['Solve1.SolutionSummary']\
-                    [['Label1', 'cValue1']].set_index(['Label1'])
-                self._problemSummary = response['Solve1.ProblemSummary']\
-                    [['Label1', 'cValue1']].set_index(['Label1'])
-
-                self._solutionSummary.index.names = ['Label']
-                self._solutionSummary.columns = ['Value']
-
-                self._problemSummary.index.names = ['Label']
-                self._problemSummary.columns = ['Value']
-
-                self._status = response.solutionStatus
-                self._soltime = response.solutionTime
-
-                if('OPTIMAL' in response.solutionStatus):
-                    self._objval = response.objective
-                    # Replace initial values with current values
-                    for v in self._variables:
-                        v._init = v._value
-                    return self._primalSolution
+                            self._variableDict[row['var']]._value = \
+                                row['value']
+                        else:
+                            # Search in vargroups for the original name
+                            sasoptpy.utils._set_abstract_values(row)
+
+                    # Capturing dual values for LP problems
+                    if ptype == 1:
+                        for _, row in self._primalSolution.iterrows():
+                            if row['var'] in self._variableDict:
+                                self._variableDict[row['var']]._dual = \
+                                    row['rc']
+                        for _, row in self._dualSolution.iterrows():
+                            if row['con'] in self._constraintDict:
+                                self._constraintDict[row['con']]._dual =\
+                                    row['dual']
+
+                    self._solutionSummary = response['Solve1.SolutionSummary']\
+                        [['Label1', 'cValue1']].set_index(['Label1'])
+                    self._problemSummary = response['Solve1.ProblemSummary']\
+                        [['Label1', 'cValue1']].set_index(['Label1'])
+
+                    self._solutionSummary.index.names = ['Label']
+                    self._solutionSummary.columns = ['Value']
+
+                    self._problemSummary.index.names = ['Label']
+                    self._problemSummary.columns = ['Value']
+
+                    self._status = response.solutionStatus
+                    self._soltime = response.solutionTime
+
+                    if('OPTIMAL' in response.solutionStatus):
+                        self._objval = response.objective
+                        # Replace initial values with current values
+                        for v in self._variables:
+                            v.set_init(v._value)
+                        return self._primalSolution
+                    else:
+                        logger.info('Response {}'.format(
+                            response.solutionStatus))
+                        self._objval = 0
+                        return None
                 else:
-                    print('NOTE: Response {}'.format(response.solutionStatus))
-                    self._objval = 0
+                    logger.error('{}'.format(response.get_tables('status')[0]))
                     return None
-            else:
-                print('ERROR: {}'.format(response.get_tables('status')[0]))
-                return None
 
     def solve_on_mva(self, session, options, submit, name,
-                     frame, drop, replace, primalin, verbose):
+                     frame, drop, replace, primalin, verbose, compact=False,
+                     presolve=False):
         '''
         Solves the optimization problem on SAS Clients
 
@@ -2493,14 +4254,9 @@ params=[{'param': value, 'column': 'value'}])
         if not name:
             name = 'MPS'
 
-        try:
-            import saspy as sp
-        except ImportError:
-            print('ERROR: saspy cannot be imported.')
-            return False
-
-        if not isinstance(session, sp.SASsession):
-            print('ERROR: session= argument is not a valid SAS session.')
+        session = sasoptpy.backends.get_backend(session)
+        if session is None or session.kind != 'SAS':
+            logger.error('session= argument is not a valid SAS session.')
             return False
 
         # Will be enabled later when runOptmodel supports blocks
@@ -2512,21 +4268,41 @@ params=[{'param': value, 'column': 'value'}])
             switch = False
             # Check if model has sets or parameters
             if self._sets or self._parameters:
-                print('INFO: Model {} has data on server,'.format(self._name),
-                      'switching to OPTMODEL mode.')
+                # Models with local data are solved in MPS format
+                expanded = self._local_expansion()
+                if expanded is not None:
+                    return self._solve_expanded(
+                        expanded, 'solve_on_mva', session=session,
+                        options=options, submit=submit, name=name,
+                        frame=True, drop=drop, replace=replace,
+                        primalin=primalin, verbose=verbose,
+                        presolve=presolve)
+                logger.info('Model {} has data on server, switching to '
+                            'OPTMODEL mode.'.format(self._name))
                 switch = True
             # Check if model is nonlinear (or abstract)
-            elif not self._is_linear():
-                print('INFO: Model {} includes nonlinear or abstract ',
-                      'components, switching to OPTMODEL mode.')
+            elif not self._is_linear() and not self._is_quadratic():
+                logger.info('Model {} includes nonlinear or abstract '
+                            'components, switching to OPTMODEL mode.'.format(
+                                self._name))
                 switch = True
             if switch:
                 frame = False
 
+        frame_bytes = sasoptpy.backends.frame_bytes
+
         if frame:  # MPS
 
+            report = self._active_report('frame')
+            report.set_size(self)
+
             # Get the MPS data
-            df = self.to_frame(constant=True)
+            presolver = None
+            with report.phase('convert'):
+                if presolve:
+                    presolver = sasoptpy.presolve.Presolver(self)
+                    report.info['presolve'] = presolver.run()
+                df = self.to_frame(constant=True, presolver=presolver)
 
             # Prepare for the upload
             for f in ['Field4', 'Field6']:
@@ -2534,148 +4310,144 @@ params=[{'param': value, 'column': 'value'}])
             df['_id_'] = df['_id_'].astype('int')
             df[['Field4', 'Field6']] = df[['Field4', 'Field6']].astype(float)
 
-            # Upload MPS table
-            try:
-                session.df2sd(df, table=name, keep_outer_quotes=True)
-            except:
-                print(df.to_string())
-                session.df2sd(df, table=name)
-                session.submit("""
-                data {};
-                    set {};
-                    field3=tranwrd(field3, "'MARKER'", "MARKER");
-                    field3=tranwrd(field3, "MARKER", "'MARKER'");
-                    field5=tranwrd(field5, "'INTORG'", "INTORG");
-                    field5=tranwrd(field5, "INTORG", "'INTORG'");
-                    field5=tranwrd(field5, "'INTEND'", "INTEND");
-                    field5=tranwrd(field5, "INTEND", "'INTEND'");
-                run;
-                """.format(name, name))
+            sasoptpy.concurrency.checkpoint()
+
+            # Server calls on a session are serialized
+            with sasoptpy.concurrency.session_lock(session.session):
+                # Upload MPS table
+                with report.phase('upload'):
+                    session.upload_frame(df, casout={'name': name})
+                report.bytes_uploaded += frame_bytes(df)
+
+                # Find problem type and initial values
+                ptype = 2 if self._has_integers() else 1  # MILP or LP
+                if not self._objective._is_linear():
+                    ptype = 3  # QP
+
+                with report.phase('solve'):
+                    c = session.solve_frame(name, ptype, options, self._sense,
+                                            primalout='primal_out',
+                                            dualout='dual_out')
+
+                for line in c['LOG'].split('\n'):
+                    if line[0:4] == '    ' or line[0:4] == 'NOTE':
+                        logger.info(line, extra={'sas_log': True})
+
+                with report.phase('download'):
+                    self._primalSolution = session.fetch_table('PRIMAL_OUT')
+                    self._dualSolution = session.fetch_table('DUAL_OUT')
+                report.bytes_downloaded += frame_bytes(
+                    self._primalSolution) + frame_bytes(self._dualSolution)
+
+                # Get Problem Summary
+                self._problemSummary = session.fetch_table('PROB_SUMMARY')
+                self._problemSummary.replace(np.nan, '', inplace=True)
+                self._problemSummary = self._problemSummary[['Label1',
+                                                             'cValue1']]
+                self._problemSummary.set_index(['Label1'], inplace=True)
+                self._problemSummary.columns = ['Value']
+                self._problemSummary.index.names = ['Label']
 
-            # Find problem type and initial values
-            ptype = 1  # LP
-            for v in self._variables:
-                if v._type != sasoptpy.utils.CONT:
-                    ptype = 2
-                    break
-
-            if ptype == 1:
-                c = session.submit("""
-                ods output SolutionSummary=SOL_SUMMARY;
-                ods output ProblemSummary=PROB_SUMMARY;
-                proc optlp data = {}
-                   primalout  = primal_out
-                   dualout    = dual_out;
-                run;
-                """.format(name))
-            else:
-                c = session.submit("""
-                ods output SolutionSummary=SOL_SUMMARY;
-                ods output ProblemSummary=PROB_SUMMARY;
-                proc optmilp data = {}
-                   primalout  = primal_out
-                   dualout    = dual_out;
-                run;
-                """.format(name))
-
-            for line in c['LOG'].split('\n'):
-                if line[0:4] == '    ' or line[0:4] == 'NOTE':
-                    print(line)
-
-            self._primalSolution = session.sd2df('PRIMAL_OUT')
-            self._dualSolution = session.sd2df('DUAL_OUT')
-
-            # Get Problem Summary
-            self._problemSummary = session.sd2df('PROB_SUMMARY')
-            self._problemSummary.replace(np.nan, '', inplace=True)
-            self._problemSummary = self._problemSummary[['Label1',
-                                                         'cValue1']]
-            self._problemSummary.set_index(['Label1'], inplace=True)
-            self._problemSummary.columns = ['Value']
-            self._problemSummary.index.names = ['Label']
-
-            # Get Solution Summary
-            self._solutionSummary = session.sd2df('SOL_SUMMARY')
-            self._solutionSummary.replace(np.nan, '', inplace=True)
-            self._solutionSummary = self._solutionSummary[['Label1',
-                                                           'cValue1']]
-            self._solutionSummary.set_index(['Label1'], inplace=True)
-            self._solutionSummary.columns = ['Value']
-            self._solutionSummary.index.names = ['Label']
+                # Get Solution Summary
+                self._solutionSummary = session.fetch_table('SOL_SUMMARY')
+                self._solutionSummary.replace(np.nan, '', inplace=True)
+                self._solutionSummary = self._solutionSummary[['Label1',
+                                                               'cValue1']]
+                self._solutionSummary.set_index(['Label1'], inplace=True)
+                self._solutionSummary.columns = ['Value']
+                self._solutionSummary.index.names = ['Label']
 
             # Parse solutions
-            for _, row in self._primalSolution.iterrows():
-                self._variableDict[row['_VAR_']]._value = row['_VALUE_']
+            with report.phase('parse'):
+                for _, row in self._primalSolution.iterrows():
+                    self._variableDict[row['_VAR_']]._value = row['_VALUE_']
+                if presolver is not None:
+                    presolver.postsolve()
 
             return self._primalSolution
 
         else:  # OPTMODEL
 
             # Find problem type and initial values
-            ptype = 1  # LP
-            for v in self._variables:
-                if v._type != sasoptpy.utils.CONT:
-                    ptype = 2
-                    break
-
-            print('NOTE: Converting model {} to OPTMODEL.'.format(self._name))
-            optmodel_string = self.to_optmodel(header=True, options=options,
-                                               ods=True)
+            ptype = 2 if self._has_integers() else 1  # MILP or LP
+
+            report = self._active_report('optmodel')
+            report.set_size(self)
+            logger.info('Converting model {} to OPTMODEL.'.format(self._name))
+            tables = {} if compact else None
+            with report.phase('convert'):
+                optmodel_string = self.to_optmodel(
+                    header=True, options=options, ods=True, tables=tables)
             if verbose:
                 print(optmodel_string)
             if not submit:
                 return optmodel_string
-            print('NOTE: Submitting OPTMODEL codes to SAS server.')
+            logger.info('Submitting OPTMODEL codes to SAS server.')
             optmodel_string = 'ods output SolutionSummary=SOL_SUMMARY;\n' +\
                               'ods output ProblemSummary=PROB_SUMMARY;\n' +\
                               optmodel_string
-            c = session.submit(optmodel_string)
-
-            # Print output
-            for line in c['LOG'].split('\n'):
-                if line[0:4] == '    ' or line[0:4] == 'NOTE':
-                    print(line)
-
-            # Parse solution
-            self._primalSolution = session.sd2df('PRIMAL_OUT')
-            self._primalSolution = self._primalSolution[
-                    ['.VAR..NAME', '.VAR..LB', '.VAR..UB', '_VAR_',
-                     '.VAR..RC']]
-            self._primalSolution.columns = ['var', 'lb', 'ub', 'value', 'rc']
-            self._dualSolution = session.sd2df('DUAL_OUT')
-            self._dualSolution = self._dualSolution[
-                    ['.CON..NAME', '.CON..BODY', '.CON..DUAL']]
-            self._dualSolution.columns = ['con', 'value', 'dual']
-
-            # Get Problem Summary
-            self._problemSummary = session.sd2df('PROB_SUMMARY')
-            self._problemSummary.replace(np.nan, '', inplace=True)
-            self._problemSummary = self._problemSummary[['Label1', 'cValue1']]
-            self._problemSummary.set_index(['Label1'], inplace=True)
-            self._problemSummary.columns = ['Value']
-            self._problemSummary.index.names = ['Label']
-
-            # Get Solution Summary
-            self._solutionSummary = session.sd2df('SOL_SUMMARY')
-            self._solutionSummary.replace(np.nan, '', inplace=True)
-            self._solutionSummary = self._solutionSummary[['Label1',
-                                                           'cValue1']]
-            self._solutionSummary.set_index(['Label1'], inplace=True)
-            self._solutionSummary.columns = ['Value']
-            self._solutionSummary.index.names = ['Label']
+            sasoptpy.concurrency.checkpoint()
+            with sasoptpy.concurrency.session_lock(session.session):
+                self._upload_tables(session, tables, report)
+                with report.phase('solve'):
+                    c = session.run_optmodel(optmodel_string)
+                report.bytes_uploaded += len(optmodel_string.encode('utf-8'))
+                if drop and tables:
+                    for table in tables:
+                        session.drop_table(table)
+
+                # Print output
+                for line in c['LOG'].split('\n'):
+                    if line[0:4] == '    ' or line[0:4] == 'NOTE':
+                        logger.info(line, extra={'sas_log': True})
+
+                # Parse solution
+                with report.phase('download'):
+                    self._primalSolution = session.fetch_table('PRIMAL_OUT')
+                    self._dualSolution = session.fetch_table('DUAL_OUT')
+                report.bytes_downloaded += frame_bytes(
+                    self._primalSolution) + frame_bytes(self._dualSolution)
+                self._primalSolution = self._primalSolution[
+                        ['.VAR..NAME', '.VAR..LB', '.VAR..UB', '_VAR_',
+                         '.VAR..RC']]
+                self._primalSolution.columns = ['var', 'lb', 'ub', 'value',
+                                                'rc']
+                self._dualSolution = self._dualSolution[
+                        ['.CON..NAME', '.CON..BODY', '.CON..DUAL']]
+                self._dualSolution.columns = ['con', 'value', 'dual']
 
-            # Parse solutions
-            for _, row in self._primalSolution.iterrows():
-                if row['var'] in self._variableDict:
-                    self._variableDict[row['var']]._value = row['value']
+                # Get Problem Summary
+                self._problemSummary = session.fetch_table('PROB_SUMMARY')
+                self._problemSummary.replace(np.nan, '', inplace=True)
+                self._problemSummary = self._problemSummary[['Label1',
+                                                             'cValue1']]
+                self._problemSummary.set_index(['Label1'], inplace=True)
+                self._problemSummary.columns = ['Value']
+                self._problemSummary.index.names = ['Label']
+
+                # Get Solution Summary
+                self._solutionSummary = session.fetch_table('SOL_SUMMARY')
+                self._solutionSummary.replace(np.nan, '', inplace=True)
+                self._solutionSummary = self._solutionSummary[['Label1',
+                                                               'cValue1']]
+                self._solutionSummary.set_index(['Label1'], inplace=True)
+                self._solutionSummary.columns = ['Value']
+                self._solutionSummary.index.names = ['Label']
 
-            # Capturing dual values for LP problems
-            if ptype == 1:
+            # Parse solutions
+            with report.phase('parse'):
                 for _, row in self._primalSolution.iterrows():
                     if row['var'] in self._variableDict:
-                        self._variableDict[row['var']]._dual = row['rc']
-                for _, row in self._dualSolution.iterrows():
-                    if row['con'] in self._constraintDict:
-                        self._constraintDict[row['con']]._dual = row['dual']
+                        self._variableDict[row['var']]._value = row['value']
+
+                # Capturing dual values for LP problems
+                if ptype == 1:
+                    for _, row in self._primalSolution.iterrows():
+                        if row['var'] in self._variableDict:
+                            self._variableDict[row['var']]._dual = row['rc']
+                    for _, row in self._dualSolution.iterrows():
+                        if row['con'] in self._constraintDict:
+                            self._constraintDict[row['con']]._dual = \
+                                row['dual']
 
             return self._primalSolution
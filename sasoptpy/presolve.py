@@ -0,0 +1,369 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Presolve includes :class:`Presolver` for removing redundant rows and
+columns of a linear model before it is exported in MPS format
+
+'''
+
+from math import ceil, floor, inf
+
+import sasoptpy.components
+import sasoptpy.report
+import sasoptpy.utils
+
+
+logger = sasoptpy.report.logger
+
+# Tolerance for comparing bounds and right-hand sides
+_TOL = 1e-9
+
+
+class Presolver:
+    '''
+    Reduces the sparse form of a model before it is uploaded
+
+    Parameters
+    ----------
+    model : :class:`Model` object
+        Model to be reduced
+
+    Examples
+    --------
+
+    >>> x = m.add_variables(3, name='x', lb=0)
+    >>> m.add_constraint(x[0] + x[1] + x[2] <= 4, name='c1')
+    >>> m.add_constraint(2 * x[2] <= 6, name='c2')
+    >>> x[1].set_bounds(lb=1, ub=1)
+    >>> p = so.Presolver(m)
+    >>> print(p.run())
+    {'rows': 1, 'columns': 1, 'nonzeros': 2, 'empty_rows': 0,
+     'singleton_rows': 1, 'duplicate_rows': 0, 'fixed_columns': 1,
+     'empty_columns': 0}
+    >>> df = m.to_frame(presolver=p)
+
+    Notes
+    -----
+
+    - Reductions are empty rows, singleton rows which are replaced with
+      bounds, fixed variables, variables that appear in no constraint and
+      exact duplicate rows. Reductions are repeated until none applies.
+    - The model itself is not changed. Removed rows and columns and
+      changed bounds and right-hand sides are kept in the presolver and
+      applied by :meth:`Model.to_frame`.
+    - After a solve, :meth:`Presolver.postsolve` sets values of removed
+      variables and dual values of removed constraints on the original
+      objects.
+    - Variables of quadratic objective terms are never removed.
+    - Infeasible empty rows and singleton rows are kept, so they are
+      reported by the solver.
+
+    '''
+
+    def __init__(self, model):
+        self._model = model
+        self._vars = {}
+        self._cons = {}
+        self._rows = {}
+        self._rhs = {}
+        self._cols = {}
+        self._obj = {}
+        self._lb = {}
+        self._ub = {}
+        self._bounds = {}
+        self._protected = set()
+        self._removed_rows = {}
+        self._removed_cols = {}
+        self._stack = []
+        self._offset = 0
+        self._summary = {'rows': 0, 'columns': 0, 'nonzeros': 0,
+                         'empty_rows': 0, 'singleton_rows': 0,
+                         'duplicate_rows': 0, 'fixed_columns': 0,
+                         'empty_columns': 0}
+
+    def _read_model(self):
+        '''
+        Reads variables, linear rows and objective of the model, returns
+        False if a constraint refers to a variable outside the model
+        '''
+        model = self._model
+        Variable = sasoptpy.components.Variable
+        for v in model._variables:
+            name = v._name
+            if name in self._vars:
+                continue
+            self._vars[name] = v
+            self._lb[name] = v._lb if v._lb is not None else 0
+            self._ub[name] = v._ub if v._ub is not None else inf
+            self._cols[name] = {}
+        for c in model._constraints:
+            key = id(c)
+            if key in self._cons:
+                continue
+            self._cons[key] = c
+            row = {}
+            for name, val in c._linCoef.items():
+                if isinstance(val['ref'], Variable) and val['val'] != 0:
+                    if name not in self._cols:
+                        logger.warning(
+                            'Presolve is skipped for model {}, constraint {} '
+                            'refers to variable {} which is not in the '
+                            'model.'.format(model._name, c._name, name))
+                        return False
+                    row[name] = val['val']
+                    self._cols[name][key] = val['val']
+            self._rows[key] = row
+            self._rhs[key] = - c._linCoef['CONST']['val']
+        for name, val in model._objective._linCoef.items():
+            if isinstance(val['ref'], Variable):
+                self._obj[name] = val['val']
+        quadratic = model._objective._get_quadratic()
+        if quadratic is not None:
+            self._protected = {v._name for v in quadratic._vars}
+        return True
+
+    def run(self):
+        '''
+        Applies reductions until none of them changes the problem
+
+        Returns
+        -------
+        dict
+            Numbers of removed rows, columns and nonzeros, and number of
+            each reduction
+
+        '''
+        model = self._model
+        model._refresh_columns()
+        if model._stats['nonlinear'] or model._stats['abstract']:
+            logger.warning('Presolve is skipped for model {} with '
+                           'nonlinear or abstract constraints.'.format(
+                               model._name))
+            return self.get_summary()
+        if not self._read_model():
+            return self.get_summary()
+        nonzeros = sum(len(row) for row in self._rows.values())
+
+        rows_todo = [key for key, row in self._rows.items() if len(row) <= 1]
+        cols_todo = list(self._cols)
+        while rows_todo or cols_todo:
+            while cols_todo:
+                name = cols_todo.pop()
+                if name in self._removed_cols or name in self._protected:
+                    continue
+                if self._lb[name] == self._ub[name]:
+                    self._remove_column(name, self._lb[name], rows_todo,
+                                        'fixed_columns')
+                elif not self._cols[name]:
+                    value = self._get_best_bound(name)
+                    if value is not None:
+                        self._remove_column(name, value, rows_todo,
+                                            'empty_columns')
+            while rows_todo:
+                key = rows_todo.pop()
+                if key not in self._rows or self._cons[key]._range != 0:
+                    continue
+                row = self._rows[key]
+                if not row:
+                    self._remove_empty_row(key)
+                elif len(row) == 1:
+                    name = self._remove_singleton_row(key)
+                    if name is not None:
+                        cols_todo.append(name)
+        self._remove_duplicate_rows()
+
+        remaining = sum(len(row) for row in self._rows.values())
+        summary = self._summary
+        summary['rows'] = len(self._removed_rows)
+        summary['columns'] = len(self._removed_cols)
+        summary['nonzeros'] = nonzeros - remaining
+        logger.info('Presolve removed {} rows, {} columns and {} nonzeros '
+                    'of model {}.'.format(summary['rows'], summary['columns'],
+                                          summary['nonzeros'], model._name))
+        return self.get_summary()
+
+    def _get_best_bound(self, name):
+        '''
+        Returns the optimal value of a variable without constraints
+        '''
+        cost = self._obj.get(name, 0)
+        if self._model._sense == sasoptpy.utils.MAX:
+            cost = -cost
+        lb = self._lb[name]
+        ub = self._ub[name]
+        if cost > 0:
+            value = lb
+        elif cost < 0:
+            value = ub
+        else:
+            value = min(max(0, lb), ub)
+        if value in (inf, -inf):
+            return None
+        return value
+
+    def _remove_column(self, name, value, rows_todo, reduction):
+        '''
+        Removes a variable by moving its terms into right-hand sides
+        '''
+        entries = self._cols.pop(name)
+        for key, coef in entries.items():
+            row = self._rows[key]
+            del row[name]
+            self._rhs[key] -= coef * value
+            if len(row) <= 1:
+                rows_todo.append(key)
+        self._removed_cols[name] = value
+        self._offset += self._obj.get(name, 0) * value
+        self._stack.append(('column', name, value, entries))
+        self._summary[reduction] += 1
+
+    def _remove_row(self, key, reduction):
+        for name in self._rows.pop(key):
+            self._cols[name].pop(key, None)
+        self._removed_rows[key] = self._cons[key]
+        self._summary[reduction] += 1
+
+    def _remove_empty_row(self, key):
+        '''
+        Removes an empty row if it is satisfied
+        '''
+        c = self._cons[key]
+        rhs = self._rhs[key]
+        if (c._direction == 'L' and rhs < -_TOL) or\
+                (c._direction == 'G' and rhs > _TOL) or\
+                (c._direction == 'E' and abs(rhs) > _TOL):
+            logger.warning('Constraint {} is infeasible after '
+                           'presolve.'.format(c._name))
+            return
+        self._remove_row(key, 'empty_rows')
+        self._stack.append(('row', key))
+
+    def _remove_singleton_row(self, key):
+        '''
+        Replaces a row with a single variable with bounds of the variable
+        '''
+        c = self._cons[key]
+        (name, coef), = self._rows[key].items()
+        value = self._rhs[key] / coef
+        lo = -inf
+        up = inf
+        if c._direction == 'E':
+            lo = up = value
+        elif (c._direction == 'L') == (coef > 0):
+            up = value
+        else:
+            lo = value
+        if self._vars[name]._type != sasoptpy.utils.CONT:
+            lo = ceil(lo - _TOL) if lo != -inf else lo
+            up = floor(up + _TOL) if up != inf else up
+        lb = max(self._lb[name], lo)
+        ub = min(self._ub[name], up)
+        if lb > ub + _TOL:
+            logger.warning('Constraint {} is infeasible after '
+                           'presolve.'.format(c._name))
+            return None
+        ub = max(lb, ub)
+        self._lb[name] = lb
+        self._ub[name] = ub
+        self._bounds[name] = (lb, ub)
+        self._remove_row(key, 'singleton_rows')
+        self._stack.append(('bound', key, name, coef, lo, up))
+        return name
+
+    def _remove_duplicate_rows(self):
+        '''
+        Removes rows with the same terms, direction and right-hand side
+        '''
+        seen = set()
+        duplicates = []
+        for key, row in self._rows.items():
+            c = self._cons[key]
+            if c._range != 0:
+                continue
+            signature = (c._direction, self._rhs[key],
+                         frozenset(row.items()))
+            if signature in seen:
+                duplicates.append(key)
+            else:
+                seen.add(signature)
+        for key in duplicates:
+            self._remove_row(key, 'duplicate_rows')
+            self._stack.append(('row', key))
+
+    def postsolve(self, duals=False):
+        '''
+        Sets solution values of removed variables and constraints
+
+        Parameters
+        ----------
+        duals : boolean, optional
+            Switch for computing reduced costs of removed variables and
+            dual values of removed constraints, available for LPs and QPs
+
+        Notes
+        -----
+
+        - Steps are undone in reverse order. A removed variable takes its
+          fixed value and its reduced cost is computed from the dual values
+          of its rows. A singleton row gets the reduced cost of its
+          variable as dual value if the variable is at the bound implied
+          by the row; other removed rows get a dual value of zero.
+
+        '''
+        for name, value in self._removed_cols.items():
+            self._vars[name]._value = value
+        if not duals:
+            return
+        for step in reversed(self._stack):
+            if step[0] == 'row':
+                self._cons[step[1]]._dual = 0
+            elif step[0] == 'column':
+                _, name, _, entries = step
+                self._vars[name]._dual = self._obj.get(name, 0) - sum(
+                    coef * (self._cons[key]._dual or 0)
+                    for key, coef in entries.items())
+            else:
+                _, key, name, coef, lo, up = step
+                v = self._vars[name]
+                rc = v._dual or 0
+                if rc != 0 and v._value is not None and (
+                        abs(v._value - lo) <= _TOL or
+                        abs(v._value - up) <= _TOL):
+                    self._cons[key]._dual = rc / coef
+                    v._dual = 0
+                else:
+                    self._cons[key]._dual = 0
+
+    def get_summary(self):
+        '''
+        Returns the numbers of removed rows, columns and nonzeros
+
+        Returns
+        -------
+        dict
+            Numbers of removed rows, columns and nonzeros, and number of
+            each reduction
+
+        '''
+        return dict(self._summary)
+
+    def __repr__(self):
+        return 'sasoptpy.Presolver(model={}, rows={}, columns={})'.format(
+            self._model._name, len(self._removed_rows),
+            len(self._removed_cols))
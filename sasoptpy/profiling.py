@@ -0,0 +1,455 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Profiling includes :func:`profile` for counting allocations on the
+expression algebra paths and :func:`profile_memory` for measuring memory
+use of model build and solve phases
+
+'''
+
+from contextlib import contextmanager
+import os
+import threading
+import time
+import tracemalloc
+
+import sasoptpy.report
+
+
+# Switch checked on the hot paths, True only inside a profile block
+_enabled = False
+
+# Counter names and descriptions
+COUNTERS = {
+    'expressions': 'Expression objects created, including variables and '
+                   'constraints',
+    'variables': 'Variable objects created',
+    'constraints': 'Constraint objects created',
+    'copies': 'Calls of Expression.copy',
+    'lincoef_copies': 'Coefficient entries copied between expressions',
+    'add_temp': 'Additions performed in place on a temporary expression',
+    'add_copy': 'Additions performed on a new expression',
+    'mult_temp': 'Multiplications performed in place on a temporary '
+                 'expression',
+    'mult_copy': 'Multiplications performed on a new expression',
+    'relational_temp': 'Constraints built in place on a temporary '
+                       'expression',
+    'relational_copy': 'Constraints built on a new expression',
+    'name_retries': 'Names generated again since the name is taken',
+    'register_name': 'Calls of register_name',
+}
+
+__counters = dict.fromkeys(COUNTERS, 0)
+__depth = 0
+__lock = threading.Lock()
+
+
+def _count(key, n=1):
+    '''
+    Increments a counter, callers check :data:`_enabled` first
+    '''
+    __counters[key] += n
+
+
+def _snapshot():
+    return dict(__counters)
+
+
+def _start():
+    global _enabled, __depth
+    with __lock:
+        __depth += 1
+        _enabled = True
+
+
+def _stop():
+    global _enabled, __depth
+    with __lock:
+        __depth -= 1
+        if __depth == 0:
+            _enabled = False
+
+
+class Profile:
+    '''
+    Counters collected inside a :func:`profile` block
+
+    Attributes
+    ----------
+    elapsed : float
+        Wall time of the block in seconds
+
+    Notes
+    -----
+
+    - Counters are read live inside the block and frozen after it.
+    - Profiles can be nested, each one reports the counts of its own block.
+    - Counts include all threads running while the block is active.
+
+    '''
+
+    def __init__(self):
+        self._begin = None
+        self._final = None
+        self._start_time = None
+        self.elapsed = None
+
+    def __enter__(self):
+        self._begin = _snapshot()
+        self._start_time = time.perf_counter()
+        _start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _stop()
+        self.elapsed = time.perf_counter() - self._start_time
+        self._final = self._diff(_snapshot())
+
+    def _diff(self, current):
+        return {k: current[k] - self._begin[k] for k in COUNTERS}
+
+    @property
+    def counters(self):
+        '''
+        Dictionary of counter values
+        '''
+        if self._final is not None:
+            return dict(self._final)
+        if self._begin is None:
+            return dict.fromkeys(COUNTERS, 0)
+        return self._diff(_snapshot())
+
+    def __getitem__(self, key):
+        return self.counters[key]
+
+    def to_frame(self):
+        '''
+        Returns counters as a DataFrame
+
+        Returns
+        -------
+        :class:`pandas.DataFrame` object
+            Counter values and descriptions, indexed by counter name
+        '''
+        import pandas as pd
+        counters = self.counters
+        df = pd.DataFrame(
+            [[k, counters[k], COUNTERS[k]] for k in COUNTERS],
+            columns=['counter', 'count', 'description'])
+        return df.set_index(['counter'])
+
+    def __str__(self):
+        counters = self.counters
+        s = 'Profile:\n'
+        for k in COUNTERS:
+            s += '  {:<16}{:>12}\n'.format(k, counters[k])
+        if self.elapsed is not None:
+            s += '  {:<16}{:>12.4f} s\n'.format('elapsed', self.elapsed)
+        return s
+
+    def __repr__(self):
+        return 'sasoptpy.Profile()'
+
+
+def profile():
+    '''
+    Counts allocations and copies of the expression algebra in a block
+
+    Returns
+    -------
+    :class:`Profile` object
+        Context manager collecting the counters
+
+    Examples
+    --------
+
+    >>> with so.profile() as p:
+    ...     m = so.Model(name='m')
+    ...     x = m.add_variables(100, name='x')
+    ...     m.set_objective(so.quick_sum(x[i] for i in range(100)),
+    ...                     sense=so.MIN, name='obj')
+    NOTE: Initialized model m.
+    >>> print(p['copies'], p['add_temp'])
+    1 100
+    >>> print(p.to_frame())
+
+    Notes
+    -----
+
+    - Counter names are listed in :data:`sasoptpy.profiling.COUNTERS`.
+    - Outside of a profile block, counting costs a single flag check.
+
+    '''
+    return Profile()
+
+
+class MemoryProfile:
+    '''
+    Peak and retained memory of model build and solve phases
+
+    Parameters
+    ----------
+    top : int, optional
+        Number of allocation sites kept for each phase
+    frames : int, optional
+        Number of frames stored for each allocation
+
+    Attributes
+    ----------
+    phases : list
+        List of dictionaries with 'phase', 'peak', 'retained' and 'top'
+        keys. 'top' is a list of (site, size, count) tuples of sasoptpy
+        source lines holding the largest retained memory
+
+    Notes
+    -----
+
+    - Inside the ``with`` block, phases of every :meth:`Model.solve` are
+      measured and their peak and retained bytes are added to
+      ``report.info['memory']`` of :class:`SolveReport` objects, so report
+      hooks can forward them.
+    - Other phases can be measured using :meth:`MemoryProfile.phase`,
+      which starts tracing if needed. Call :meth:`MemoryProfile.stop`
+      afterwards when the profile is not used as a context manager.
+    - Each phase measures allocations made inside the phase only. Traces
+      are cleared at the start of each phase, so phases should not be
+      nested.
+    - Allocations made inside other libraries are attributed to the last
+      sasoptpy line on the call stack.
+
+    '''
+
+    def __init__(self, top=10, frames=10):
+        self.top = top
+        self.frames = frames
+        self.phases = []
+        self._tracing = False
+        self._current = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        '''
+        Starts tracing memory allocations
+        '''
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._tracing = True
+        if self._listener not in sasoptpy.report.SolveReport.listeners:
+            sasoptpy.report.SolveReport.listeners.append(self._listener)
+
+    def stop(self):
+        '''
+        Stops tracing memory allocations
+        '''
+        if self._listener in sasoptpy.report.SolveReport.listeners:
+            sasoptpy.report.SolveReport.listeners.remove(self._listener)
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _begin(self, name):
+        with self._lock:
+            tracemalloc.clear_traces()
+            self._current[name] = True
+
+    def _end(self, name):
+        with self._lock:
+            self._current.pop(name, None)
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            entry = {'phase': name, 'peak': peak, 'retained': current,
+                     'top': _top_sites(snapshot, self.top)}
+            self.phases.append(entry)
+            return entry
+
+    @contextmanager
+    def phase(self, name):
+        '''
+        Measures memory used inside a with block
+
+        Parameters
+        ----------
+        name : string
+            Name of the phase
+
+        Examples
+        --------
+
+        >>> with so.profile_memory() as mp:
+        ...     with mp.phase('build'):
+        ...         m = build_model()
+        ...     m.solve()
+        >>> print(mp.to_frame())
+                      peak  retained
+        phase
+        build     18451210  12873522
+        convert   20176310   6104113
+        upload     6191022      1056
+        solve        81290      2440
+        download   4185224   4102771
+        parse       411302     20711
+
+        '''
+        if not tracemalloc.is_tracing():
+            self.start()
+        self._begin(name)
+        try:
+            yield self
+        finally:
+            self._end(name)
+
+    def _listener(self, report, name, event):
+        if not tracemalloc.is_tracing():
+            return
+        if event == 'start':
+            self._begin(name)
+        elif name in self._current:
+            entry = self._end(name)
+            memory = report.info.setdefault('memory', {})
+            previous = memory.get(name, {'peak': 0, 'retained': 0})
+            memory[name] = {
+                'peak': max(previous['peak'], entry['peak']),
+                'retained': previous['retained'] + entry['retained']}
+
+    def get_top(self, name):
+        '''
+        Returns the top allocation sites of a phase
+
+        Parameters
+        ----------
+        name : string
+            Name of the phase
+
+        Returns
+        -------
+        :class:`pandas.DataFrame` object
+            Retained size and number of blocks of each site, summed over
+            all occurrences of the phase
+        '''
+        import pandas as pd
+        sites = {}
+        for p in self.phases:
+            if p['phase'] != name:
+                continue
+            for site, size, count in p['top']:
+                prev = sites.get(site, (0, 0))
+                sites[site] = (prev[0] + size, prev[1] + count)
+        df = pd.DataFrame([[k, v[0], v[1]] for k, v in sites.items()],
+                          columns=['site', 'size', 'count'])
+        return df.sort_values('size', ascending=False).set_index(['site'])
+
+    def to_frame(self):
+        '''
+        Returns peak and retained bytes of each phase
+
+        Returns
+        -------
+        :class:`pandas.DataFrame` object
+            Maximum peak and total retained bytes, indexed by phase
+        '''
+        import pandas as pd
+        df = pd.DataFrame([[p['phase'], p['peak'], p['retained']]
+                           for p in self.phases],
+                          columns=['phase', 'peak', 'retained'])
+        return df.groupby('phase', sort=False).agg(
+            {'peak': 'max', 'retained': 'sum'})
+
+    def __str__(self):
+        s = 'MemoryProfile:\n'
+        for p in self.phases:
+            s += '  {:<10}{:>14} peak{:>14} retained\n'.format(
+                p['phase'], p['peak'], p['retained'])
+            for site, size, count in p['top']:
+                s += '    {:>12}  {}\n'.format(size, site)
+        return s
+
+    def __repr__(self):
+        return 'sasoptpy.MemoryProfile(phases={})'.format(len(self.phases))
+
+
+# Directory of the package, used to find sasoptpy frames
+__package_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def _top_sites(snapshot, top):
+    '''
+    Groups traces by the most recent sasoptpy frame of the traceback
+    '''
+    sites = {}
+    for trace in snapshot.traces:
+        site = None
+        for frame in reversed(trace.traceback):
+            if frame.filename.startswith(__package_dir):
+                site = '{}:{}'.format(
+                    os.path.relpath(frame.filename, __package_dir),
+                    frame.lineno)
+                break
+        if site is None:
+            continue
+        prev = sites.get(site, (0, 0))
+        sites[site] = (prev[0] + trace.size, prev[1] + 1)
+    ordered = sorted(sites.items(), key=lambda i: i[1][0], reverse=True)
+    return [(k, v[0], v[1]) for k, v in ordered[:top]]
+
+
+def profile_memory(top=10, frames=10):
+    '''
+    Measures peak and retained memory of solve phases in a block
+
+    Parameters
+    ----------
+    top : int, optional
+        Number of allocation sites kept for each phase
+    frames : int, optional
+        Number of frames stored for each allocation
+
+    Returns
+    -------
+    :class:`MemoryProfile` object
+        Context manager collecting the measurements
+
+    Examples
+    --------
+
+    >>> with so.profile_memory() as mp:
+    ...     m.solve()
+    >>> print(mp)
+    MemoryProfile:
+      convert         20176310 peak       6104113 retained
+             5921024  components.py:1530
+      ...
+    >>> m.get_reports()[-1].info['memory']['convert']
+    {'peak': 20176310, 'retained': 6104113}
+
+    Notes
+    -----
+
+    - Memory tracing slows down Python code considerably, so timings of
+      the same reports are not representative.
+    - Solves running on other threads are measured together.
+
+    '''
+    return MemoryProfile(top=top, frames=frames)
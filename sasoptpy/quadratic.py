@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Quadratic includes :class:`QuadraticBlock` for storing quadratic terms of
+an objective as a sparse matrix
+
+'''
+
+from sasoptpy._lazy import np
+
+
+class QuadraticBlock:
+    '''
+    Creates a sparse block of quadratic terms over variables
+
+    Examples
+    --------
+
+    >>> x = so.VariableGroup(3, name='x')
+    >>> q = so.QuadraticBlock()
+    >>> q.add_term(x[0], x[0], 3)
+    >>> q.add_product(x[0] + 2 * x[1], x[1] - x[2])
+    >>> for v1, v2, value in q.get_entries():
+    >>>     print(v1.get_name(), v2.get_name(), value)
+    x[0] x[0] 6.0
+    x[0] x[1] 1.0
+    x[0] x[2] -1.0
+    x[1] x[1] 4.0
+    x[1] x[2] -2.0
+
+    Notes
+    -----
+
+    - Terms are stored as coordinate lists of variable ids and
+      coefficients. Duplicates are summed up only when the entries are
+      requested, so adding a term takes constant time.
+    - :meth:`QuadraticBlock.get_entries` returns the lower triangle of the
+      symmetric matrix :math:`Q` such that the terms are equal to
+      :math:`\\frac{1}{2} x^T Q x`, which is the convention of the QUADOBJ
+      section of MPS files.
+
+    '''
+
+    def __init__(self):
+        self._vars = []
+        self._ids = {}
+        self._rows = []
+        self._cols = []
+        self._vals = []
+
+    def _id(self, var):
+        i = self._ids.get(var._name)
+        if i is None:
+            i = len(self._vars)
+            self._ids[var._name] = i
+            self._vars.append(var)
+        return i
+
+    def _linear_terms(self, exp):
+        ids = []
+        coefs = []
+        for v in exp._linCoef.values():
+            ref = v['ref']
+            if ref is None:
+                continue
+            if v.get('op') is not None or type(ref) is list or\
+                    ref._operator is not None:
+                raise ValueError('Only products of linear expressions can '
+                                 'be added to a quadratic block.')
+            ids.append(self._id(ref))
+            coefs.append(v['val'])
+        return ids, coefs
+
+    def add_term(self, var1, var2, coef=1):
+        '''
+        Adds the product of two variables
+
+        Parameters
+        ----------
+        var1 : :class:`Variable` object
+            First variable of the product
+        var2 : :class:`Variable` object
+            Second variable of the product
+        coef : float, optional
+            Coefficient of the product
+        '''
+        self._rows.append(self._id(var1))
+        self._cols.append(self._id(var2))
+        self._vals.append(coef)
+
+    def add_product(self, exp1, exp2, coef=1):
+        '''
+        Adds the product of two linear expressions
+
+        Parameters
+        ----------
+        exp1 : :class:`Expression` object
+            First expression of the product
+        exp2 : :class:`Expression` object
+            Second expression of the product
+        coef : float, optional
+            Coefficient of the product
+
+        Notes
+        -----
+
+        - Only products of variable terms are added. Products with the
+          constant parts of the expressions are linear terms and are
+          not stored in the block.
+
+        '''
+        ids1, coefs1 = self._linear_terms(exp1)
+        ids2, coefs2 = self._linear_terms(exp2)
+        n = len(ids2)
+        for i, c in zip(ids1, coefs1):
+            self._rows.extend([i] * n)
+            self._cols.extend(ids2)
+            c = c * coef
+            self._vals.extend([c * d for d in coefs2])
+
+    def get_entries(self):
+        '''
+        Returns the lower triangle of the symmetric quadratic matrix
+
+        Returns
+        -------
+        list
+            List of (variable, variable, value) tuples sorted by the order
+            variables are added into the block, where the first variable
+            is not added after the second one
+
+        '''
+        if not self._vals:
+            return []
+        n = len(self._vars)
+        rows = np.array(self._rows, dtype=np.int64)
+        cols = np.array(self._cols, dtype=np.int64)
+        vals = np.array(self._vals, dtype=float)
+        low = np.minimum(rows, cols)
+        high = np.maximum(rows, cols)
+        # Diagonal terms are doubled, since the terms are halved in x'Qx/2
+        vals[low == high] *= 2
+        keys, inverse = np.unique(low * n + high, return_inverse=True)
+        sums = np.bincount(inverse, weights=vals)
+        return [(self._vars[k // n], self._vars[k % n], v)
+                for k, v in zip(keys.tolist(), sums.tolist()) if v != 0]
+
+    def get_value(self):
+        '''
+        Returns the value of the quadratic terms at the current solution
+        '''
+        return sum(c * self._vars[i]._value * self._vars[j]._value
+                   for i, j, c in zip(self._rows, self._cols, self._vals))
+
+    def __len__(self):
+        return len(self._vals)
+
+    def __repr__(self):
+        return 'sasoptpy.QuadraticBlock(variables={}, terms={})'.format(
+            len(self._vars), len(self._vals))
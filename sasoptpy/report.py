@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Report includes :class:`SolveReport` for solve instrumentation and the
+logger of the solve pipeline
+
+'''
+
+from contextlib import contextmanager
+import logging
+import time
+
+
+class _ConsoleHandler(logging.Handler):
+    '''
+    Writes log records to the current standard output
+    '''
+
+    def emit(self, record):
+        try:
+            print(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+class _PrefixFormatter(logging.Formatter):
+    '''
+    Adds SAS-style NOTE, WARNING and ERROR prefixes to log messages
+    '''
+
+    prefixes = {logging.DEBUG: 'NOTE', logging.INFO: 'NOTE',
+                logging.WARNING: 'WARNING', logging.ERROR: 'ERROR',
+                logging.CRITICAL: 'ERROR'}
+
+    def format(self, record):
+        message = super().format(record)
+        if getattr(record, 'sas_log', False):
+            return message
+        return '{}: {}'.format(self.prefixes.get(record.levelno, 'NOTE'),
+                               message)
+
+
+# Logger of the solve pipeline
+# Use logger.setLevel(logging.WARNING) to silence NOTE messages
+logger = logging.getLogger('sasoptpy')
+if not logger.handlers:
+    __handler = _ConsoleHandler()
+    __handler.setFormatter(_PrefixFormatter())
+    logger.addHandler(__handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Functions called with each finished report
+__hooks = []
+
+
+class SolveReport:
+    '''
+    Timing, transfer and size information of a single solve
+
+    Parameters
+    ----------
+    model : :class:`Model` object
+        Model being solved
+    method : string, optional
+        Solve method, e.g. 'frame' or 'optmodel'
+
+    Attributes
+    ----------
+    phases : list
+        List of phase spans as dictionaries with 'phase', 'start', 'end'
+        and 'duration' keys, in seconds relative to the start of the solve
+    bytes_uploaded : int
+        Bytes of the tables and programs sent to the server
+    bytes_downloaded : int
+        Bytes of the tables received from the server
+    rows, columns, nonzeros : int
+        Number of constraints, variables and linear coefficients
+
+    Examples
+    --------
+
+    >>> m.solve()
+    >>> r = m.get_reports()[-1]
+    >>> print(r)
+    SolveReport(model=knapsack, method=frame, status=OPTIMAL)
+      Size: 6 rows, 5 columns, 10 nonzeros
+      Transfer: 1504 bytes up, 780 bytes down
+      convert     0.0012 s
+      upload      0.0151 s
+      solve       0.2101 s
+      download    0.0207 s
+      parse       0.0049 s
+      total       0.2530 s
+
+    Notes
+    -----
+
+    - Phases are 'convert', 'upload', 'solve', 'download' and 'parse'.
+      A phase might appear several times, e.g. for each variant of
+      :meth:`Model.solve_sweep`.
+    - Reports are kept in the model history, see :meth:`Model.get_reports`,
+      and passed to hooks registered using :func:`add_report_hook` and
+      :meth:`Model.add_report_hook`.
+
+    '''
+
+    # Functions called as listener(report, phase, event) on phase events
+    listeners = []
+
+    def __init__(self, model, method=None):
+        self.model = model._name
+        self.method = method
+        self.session = None
+        self.phases = []
+        self.bytes_uploaded = 0
+        self.bytes_downloaded = 0
+        self.rows = 0
+        self.columns = 0
+        self.nonzeros = 0
+        self.status = None
+        self.objective = None
+        self.solution_time = None
+        self.info = {}
+        self.timestamp = time.time()
+        self._start = time.perf_counter()
+        self._end = None
+
+    @contextmanager
+    def phase(self, name):
+        '''
+        Records the time spent inside a with block as a phase
+
+        Parameters
+        ----------
+        name : string
+            Name of the phase
+
+        Examples
+        --------
+
+        >>> with report.phase('convert'):
+        ...     df = m.to_frame()
+
+        '''
+        for listener in SolveReport.listeners:
+            listener(self, name, 'start')
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            end = time.perf_counter()
+            self.phases.append({'phase': name,
+                                'start': start - self._start,
+                                'end': end - self._start,
+                                'duration': end - start})
+            for listener in SolveReport.listeners:
+                listener(self, name, 'end')
+
+    def set_size(self, model):
+        '''
+        Records the number of rows, columns and nonzeros of a model
+        '''
+        stats = model.get_statistics()
+        self.rows = stats['constraints']
+        self.columns = stats['variables']
+        self.nonzeros = stats['nonzeros']
+
+    def count_uploaded(self, chunks):
+        '''
+        Yields chunks of code while adding their size to ``bytes_uploaded``
+        '''
+        for chunk in chunks:
+            self.bytes_uploaded += len(chunk.encode('utf-8'))
+            yield chunk
+
+    def get_phase_time(self, name):
+        '''
+        Returns the total duration of a phase in seconds
+        '''
+        return sum(p['duration'] for p in self.phases if p['phase'] == name)
+
+    @property
+    def total_time(self):
+        '''
+        Wall time of the solve in seconds
+        '''
+        end = self._end if self._end is not None else time.perf_counter()
+        return end - self._start
+
+    def finish(self, model):
+        '''
+        Closes the report and records the solution status of the model
+
+        Notes
+        -----
+
+        - Status is kept if it is already set, e.g. by batch solves.
+
+        '''
+        self._end = time.perf_counter()
+        if self.status is None:
+            self.status = model._status if model._status else None
+            self.objective = model._objval
+            self.solution_time = model._soltime
+
+    def to_dict(self):
+        '''
+        Returns the report as a dictionary
+
+        Returns
+        -------
+        dict
+            Dictionary with scalar fields and a 'phases' entry containing
+            total duration of each phase
+        '''
+        phases = {}
+        for p in self.phases:
+            phases[p['phase']] = phases.get(p['phase'], 0) + p['duration']
+        return {'model': self.model, 'method': self.method,
+                'session': self.session, 'timestamp': self.timestamp,
+                'status': self.status, 'objective': self.objective,
+                'solution_time': self.solution_time,
+                'total_time': self.total_time, 'phases': phases,
+                'bytes_uploaded': self.bytes_uploaded,
+                'bytes_downloaded': self.bytes_downloaded,
+                'rows': self.rows, 'columns': self.columns,
+                'nonzeros': self.nonzeros, 'info': dict(self.info)}
+
+    def __str__(self):
+        s = 'SolveReport(model={}, method={}, status={})\n'.format(
+            self.model, self.method, self.status)
+        s += '  Size: {} rows, {} columns, {} nonzeros\n'.format(
+            self.rows, self.columns, self.nonzeros)
+        s += '  Transfer: {} bytes up, {} bytes down\n'.format(
+            self.bytes_uploaded, self.bytes_downloaded)
+        for name, duration in self.to_dict()['phases'].items():
+            s += '  {:<10}{:>8.4f} s\n'.format(name, duration)
+        s += '  {:<10}{:>8.4f} s'.format('total', self.total_time)
+        return s
+
+    def __repr__(self):
+        return 'sasoptpy.SolveReport(model=\'{}\', method=\'{}\')'.format(
+            self.model, self.method)
+
+
+def add_report_hook(func):
+    '''
+    Registers a function to be called with the report of every solve
+
+    Parameters
+    ----------
+    func : function
+        Function taking a :class:`SolveReport` object
+
+    Examples
+    --------
+
+    >>> def send(report):
+    ...     statsd.timing('solve.total', report.total_time)
+    >>> so.add_report_hook(send)
+
+    See also
+    --------
+    :meth:`Model.add_report_hook`, :func:`remove_report_hook`
+
+    '''
+    __hooks.append(func)
+
+
+def remove_report_hook(func):
+    '''
+    Removes a function registered by :func:`add_report_hook`
+    '''
+    if func in __hooks:
+        __hooks.remove(func)
+
+
+def publish_report(model, report):
+    '''
+    Adds a finished report to the model history and calls the hooks
+
+    Notes
+    -----
+
+    - Exceptions raised inside hooks are logged as warnings.
+
+    '''
+    report.finish(model)
+    model._reports.append(report)
+    for func in model._report_hooks + __hooks:
+        try:
+            func(report)
+        except Exception as e:
+            logger.warning('Report hook {} failed: {}'.format(func, e))
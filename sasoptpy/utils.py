@@ -16,16 +16,18 @@
 #  limitations under the License.
 #
 
-from collections import Iterable
-import inspect
+from collections.abc import Iterable
+import numbers
 import random
 import string
+import threading
 
-import numpy as np
-import pandas as pd
-
+from sasoptpy._lazy import np, pd
+import sasoptpy._lazy
+import sasoptpy.backends
 import sasoptpy.model
 import sasoptpy.components
+import sasoptpy.profiling
 
 
 # Constant values
@@ -44,6 +46,12 @@ __ctr = {'obj': [0], 'var': [0], 'con': [0], 'expr': [0], 'model': [0],
 
 __objcnt = 0
 
+# Number of changes of components, compared by cached local expansions
+__changes = 0
+
+# Guards the global dictionary and counters against concurrent solves
+__name_lock = threading.RLock()
+
 
 def check_name(name, ctype=None):
     '''
@@ -58,6 +66,11 @@ def check_name(name, ctype=None):
     -------
     str : The given name if valid, a random string otherwise
     '''
+    with __name_lock:
+        return _check_name(name, ctype)
+
+
+def _check_name(name, ctype):
     if name and type(name) != str:
         name = ctype + '_' + str(name) if ctype else str(name)
     if name is None or name == '':
@@ -68,6 +81,8 @@ def check_name(name, ctype=None):
             name = '{}_{}'.format(ctype, get_counter(ctype))
     else:
         if name in __namedict:
+            if sasoptpy.profiling._enabled:
+                sasoptpy.profiling._count('name_retries')
             if ctype is None:
                 name = ''.join(random.choice(string.ascii_lowercase) for
                                _ in range(5))
@@ -76,6 +91,8 @@ def check_name(name, ctype=None):
         else:
             name = name.replace(" ", "_")
     while name in __namedict:
+        if sasoptpy.profiling._enabled:
+            sasoptpy.profiling._count('name_retries')
         if ctype is None:
             name = ''.join(random.choice(string.ascii_lowercase) for
                            _ in range(5))
@@ -87,6 +104,7 @@ def check_name(name, ctype=None):
 def _is_generated(expr):
     if isinstance(expr, sasoptpy.components.Variable):
         return
+    import inspect
     caller = inspect.stack()[2][3]
     if caller == '<genexpr>':
         return True
@@ -130,7 +148,9 @@ def exp_range(start, stop, step=1):
     exset = get_obj_by_name(setname)
     if exset:
         return exset
-    return sasoptpy.data.Set(name=setname)
+    exset = sasoptpy.data.Set(name=setname)
+    exset._range = (start, stop, step)
+    return exset
 
 
 def register_name(name, obj):
@@ -150,9 +170,34 @@ def register_name(name, obj):
         Unique object number to represent creation order
     '''
     global __objcnt
-    __objcnt += 1
-    __namedict[name] = {'ref': obj, 'order': __objcnt}
-    return __objcnt
+    if sasoptpy.profiling._enabled:
+        sasoptpy.profiling._count('register_name')
+    with __name_lock:
+        __objcnt += 1
+        __namedict[name] = {'ref': obj, 'order': __objcnt}
+        return __objcnt
+
+
+def _next_order():
+    '''
+    Returns a creation order number without registering a name
+    '''
+    global __objcnt
+    with __name_lock:
+        __objcnt += 1
+        return __objcnt
+
+
+def _record_change():
+    '''
+    Counts a change of a component
+    '''
+    global __changes
+    __changes += 1
+
+
+def _get_changes():
+    return __changes
 
 
 def recursive_walk(obj, func, attr=None, alt=None):
@@ -390,14 +435,14 @@ def extract_list_value(tuplist, listname):
         v = None
     elif isinstance(listname, dict):
         v = listname[tuple_unpack(tuplist)]
-    elif np.issubdtype(type(listname), np.number):
+    elif _is_number(listname):
         v = listname
-    elif isinstance(listname, pd.DataFrame):
+    elif sasoptpy._lazy.isinstance_of(listname, 'pandas', 'DataFrame'):
         if isinstance(listname.index, pd.MultiIndex):
             v = listname.loc[tuplist[:-1]][tuplist[-1]]
         else:
             v = listname.loc[tuplist]
-    elif isinstance(listname, pd.Series):
+    elif sasoptpy._lazy.isinstance_of(listname, 'pandas', 'Series'):
         v = listname.loc[tuplist]
     else:
         v = listname
@@ -441,9 +486,10 @@ def get_counter(ctrtype):
     int
         Current value of the counter
     '''
-    ctr = __ctr[ctrtype]
-    ctr[0] = ctr[0] + 1
-    return ctr[0]
+    with __name_lock:
+        ctr = __ctr[ctrtype]
+        ctr[0] = ctr[0] + 1
+        return ctr[0]
 
 
 def _to_optmodel_loop(keys):
@@ -599,9 +645,10 @@ def reset_globals():
     :func:`get_namespace`
 
     '''
-    __namedict.clear()
-    for i in __ctr:
-        __ctr[i] = [0]
+    with __name_lock:
+        __namedict.clear()
+        for i in __ctr:
+            __ctr[i] = [0]
 
 
 def read_frame(df, cols=None):
@@ -676,9 +723,12 @@ def read_data(table, key_set, key_cols=None, option='', params=None):
     if params is None:
         params = []
 
+    _record_change()
     # Reading key
-    if key_set is not None and key_cols:
-        key_set._colname = key_cols
+    if key_set is not None:
+        key_set._source = table
+        if key_cols:
+            key_set._colname = key_cols
 
     # Reading parameters
     for p in params:
@@ -687,7 +737,7 @@ def read_data(table, key_set, key_cols=None, option='', params=None):
         p['param']._set_loop(table, key_set, p['column'], p['index'])
 
     # Beginning
-    if type(table).__name__ == 'CASTable':
+    if type(table).__name__ in ('CASTable', 'LocalTable'):
         s = 'read data {}'.format(table.name)
     elif type(table).__name__ == 'SASdata':
         s = 'read data {}'.format(table.table)
@@ -707,7 +757,9 @@ def read_data(table, key_set, key_cols=None, option='', params=None):
         parlist.append(p['param']._to_read_data())
     s += ' '.join(parlist)
     s += ';'
-    return sasoptpy.data.Statement(s)
+    st = sasoptpy.data.Statement(s)
+    st._source = table
+    return st
 
 
 def read_table(table, session=None, key=['_N_'], columns=None, 
@@ -759,22 +811,26 @@ def read_table(table, session=None, key=['_N_'], columns=None,
 
     # Type of the given table and the session
     t_type = type(table).__name__
-    s_type = type(session).__name__
+    backend = sasoptpy.backends.get_backend(session)
+    s_type = backend.kind if backend is not None else None
 
     if (upload and t_type == 'DataFrame' and s_type == 'CAS'):
-        table = session.upload_frame(table, casout=casout)
+        table = backend.upload_frame(table, casout=casout)
     elif (upload and t_type == 'Series' and s_type == 'CAS'):
         table = pd.DataFrame(table)
-        table = session.upload_frame(table, casout=casout)
+        table = backend.upload_frame(table, casout=casout)
     elif (upload and t_type == 'DataFrame' and s_type == 'SAS'):
         req_name = casout if isinstance(casout, str) else None
         upname = sasoptpy.utils.check_name(req_name, 'table')
         sasoptpy.utils.register_name(upname, table)
-        table = session.df2sd(table, table=upname)
+        table = backend.upload_frame(table, casout=upname)
 
     t_type = type(table).__name__
+    # Tables of local sessions are read the same way as CAS tables
+    if t_type == 'LocalTable':
+        t_type = 'CASTable'
 
-    if type(table).__name__ == 'CASTable':
+    if t_type == 'CASTable':
         tname = table.name
     elif type(table).__name__ == 'SASdata':
         tname = table.table
@@ -882,6 +938,70 @@ def flatten_frame(df, swap=False):
     return new_frame
 
 
+# Largest value of a 64-bit integer
+_INT64_MAX = 2 ** 63 - 1
+
+
+def _factorize_frame(df, cols):
+    '''
+    Returns integer codes of rows and unique keys of DataFrame columns
+
+    Parameters
+    ----------
+    df : :class:`pandas.DataFrame` object
+        DataFrame to be read
+    cols : list of strings
+        Column names forming the key
+
+    Returns
+    -------
+    tuple
+        Array of codes for each row and the list of unique keys as tuples,
+        where code ``i`` refers to the ``i``-th key
+
+    Notes
+    -----
+
+    - Each column is factorized separately, then codes are combined into a
+      single integer, so keys are sorted with one call of
+      :func:`numpy.unique` and no tuples are created for rows.
+    - If the product of the numbers of unique values would not fit into a
+      64-bit integer, codes combined so far are replaced by their ranks
+      before the next column is added.
+
+    '''
+    codes = None
+    size = 1
+    levels = []
+    columns = []
+    for col in cols:
+        try:
+            col_codes, uniques = pd.factorize(df[col], sort=True)
+        except TypeError:
+            col_codes, uniques = pd.factorize(df[col])
+        if len(col_codes) and col_codes.min() < 0:
+            raise ValueError('Column {} has missing values.'.format(col))
+        levels.append(uniques.tolist())
+        columns.append(col_codes)
+        if codes is None:
+            codes = col_codes.astype(np.int64)
+            size = len(uniques)
+            continue
+        if size * len(uniques) > _INT64_MAX:
+            # Ranks keep the order of keys and are less than the row count
+            ranks, codes = np.unique(codes, return_inverse=True)
+            codes = codes.astype(np.int64)
+            size = len(ranks)
+        codes = codes * len(uniques) + col_codes
+        size *= len(uniques)
+    _, first, inverse = np.unique(codes, return_index=True,
+                                  return_inverse=True)
+    values = [[level[i] for i in col_codes[first].tolist()]
+              for level, col_codes in zip(levels, columns)]
+    keys = list(zip(*values))
+    return inverse, keys
+
+
 def flatten_tuple(tp):
     '''
     Flattens nested tuples
@@ -1013,6 +1133,20 @@ def set_namedict(ss):
         register_name(i, ss[i])
 
 
+def _is_number(obj):
+    '''
+    Checks if an object is a Python or NumPy number, without importing NumPy
+
+    Notes
+    -----
+
+    - NumPy scalar types are registered as :class:`numbers.Number`
+      subclasses. Booleans are not considered numbers.
+
+    '''
+    return isinstance(obj, numbers.Number) and not isinstance(obj, bool)
+
+
 def get_len(i):
     '''
     Safe wrapper of len() function
@@ -1084,7 +1218,7 @@ def _sort_tuple(i):
     for s in i:
         if isinstance(s, str):
             key += (0,)
-        elif np.issubdtype(type(s), np.number):
+        elif _is_number(s):
             key += (1,)
         elif isinstance(s, tuple):
             key += (2,)
@@ -1295,7 +1429,7 @@ def get_solution_table(*argv, key=None, sort=True, rhs=False):
                     tk = sasoptpy.utils.tuple_pack(k)
                     if type(argv[i][tk]) == sasoptpy.components.Expression:
                         row.append(argv[i][tk].get_value())
-                    elif np.issubdtype(type(argv[i][tk]), np.number):
+                    elif _is_number(argv[i][tk]):
                         row.append(argv[i][tk])
                     else:
                         row.append('-')
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Benchmarks the examples against a local session
+
+Each example is run with :class:`sasoptpy.LocalSession`. Every call of
+:meth:`Model.solve` is intercepted to time :meth:`Model.to_frame` and
+:meth:`Model.to_optmodel` of the model separately; the rest of the run
+(except local solves) is counted as construction time. Peak memory is
+measured in a separate run using tracemalloc.
+
+Usage::
+
+    python tests/run_benchmarks.py --output bench.json
+    python tests/run_benchmarks.py --baseline bench.json --tolerance 0.25
+
+The script exits with status 1 if any metric is slower or larger than the
+baseline by more than the tolerance.
+
+'''
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import sasoptpy
+
+
+EXAMPLES = ['food_manufacture_1', 'food_manufacture_2', 'factory_planning_1',
+            'factory_planning_2', 'manpower_planning', 'refinery_optimization',
+            'mining_optimization', 'farm_planning', 'economic_planning',
+            'decentralization', 'sas_kidney_exchange', 'sas_optimal_wedding',
+            'curve_fitting', 'nonlinear_1', 'nonlinear_2']
+
+METRICS = ['build', 'to_frame', 'to_optmodel', 'peak_memory']
+
+
+class NullWriter:
+
+    def write(self, text): pass
+
+    def flush(self): pass
+
+
+class SolveRecorder:
+    '''
+    Replaces :meth:`Model.solve` to time conversions of each solved model
+    '''
+
+    def __init__(self):
+        self.to_frame = 0.0
+        self.to_optmodel = 0.0
+        self.solve = 0.0
+        self.models = 0
+        self.errors = []
+        self._original = sasoptpy.Model.solve
+
+    def __enter__(self):
+        recorder = self
+        original = self._original
+
+        def solve(model, *args, **kwargs):
+            recorder.models += 1
+            t0 = time.perf_counter()
+            if model._is_linear():
+                try:
+                    model.to_frame()
+                except Exception as e:
+                    recorder.errors.append('to_frame: {}'.format(e))
+            t1 = time.perf_counter()
+            try:
+                model.to_optmodel()
+            except Exception as e:
+                recorder.errors.append('to_optmodel: {}'.format(e))
+            t2 = time.perf_counter()
+            try:
+                return original(model, *args, **kwargs)
+            finally:
+                recorder.to_frame += t1 - t0
+                recorder.to_optmodel += t2 - t1
+                recorder.solve += time.perf_counter() - t2
+
+        sasoptpy.Model.solve = solve
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        sasoptpy.Model.solve = self._original
+
+
+def run_example(name):
+    '''
+    Runs an example once and returns its timings
+    '''
+    module = importlib.import_module('examples.' + name)
+    session = sasoptpy.LocalSession()
+    stdout = sys.stdout
+    sys.stdout = NullWriter()
+    error = None
+    with SolveRecorder() as recorder, warnings.catch_warnings():
+        # Local solutions are not optimal, post-solve steps might fail
+        warnings.simplefilter('ignore', RuntimeWarning)
+        t0 = time.perf_counter()
+        try:
+            module.test(session)
+        except Exception as e:
+            error = '{}: {}'.format(type(e).__name__, e)
+        total = time.perf_counter() - t0
+    sys.stdout = stdout
+    sasoptpy.reset_globals()
+    build = total - recorder.to_frame - recorder.to_optmodel - recorder.solve
+    return {'build': build, 'to_frame': recorder.to_frame,
+            'to_optmodel': recorder.to_optmodel, 'models': recorder.models,
+            'errors': recorder.errors + ([error] if error else [])}
+
+
+def measure_memory(name):
+    '''
+    Returns the peak traced memory of an example in bytes
+    '''
+    tracemalloc.start()
+    try:
+        run_example(name)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(examples, repeat=3, memory=True):
+    '''
+    Runs the examples and returns the results as a dictionary
+
+    Notes
+    -----
+
+    - Timings are the minimum of ``repeat`` runs.
+
+    '''
+    results = {}
+    for name in examples:
+        runs = [run_example(name) for _ in range(repeat)]
+        result = {k: min(r[k] for r in runs)
+                  for k in ['build', 'to_frame', 'to_optmodel']}
+        result['models'] = runs[0]['models']
+        result['errors'] = runs[0]['errors']
+        if memory:
+            result['peak_memory'] = measure_memory(name)
+        results[name] = result
+        print('{:<24}{:>10.4f}{:>10.4f}{:>12.4f}{:>14}'.format(
+            name, result['build'], result['to_frame'], result['to_optmodel'],
+            result.get('peak_memory', '')))
+    return {'python': platform.python_version(),
+            'sasoptpy': sasoptpy.__version__,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'repeat': repeat, 'results': results}
+
+
+def compare(current, baseline, tolerance=0.25, min_time=0.005):
+    '''
+    Returns the list of regressions against a baseline
+
+    Notes
+    -----
+
+    - Timings under ``min_time`` seconds in the baseline are compared
+      against ``min_time`` to avoid flagging noise.
+
+    '''
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        for metric in METRICS:
+            if metric not in result or metric not in base:
+                continue
+            reference = base[metric]
+            if metric != 'peak_memory':
+                reference = max(reference, min_time)
+            if result[metric] > reference * (1 + tolerance):
+                regressions.append(
+                    '{} {}: {:.4g} vs baseline {:.4g} ({:+.0%})'.format(
+                        name, metric, result[metric], base[metric],
+                        result[metric] / max(base[metric], 1e-12) - 1))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('examples', nargs='*', default=EXAMPLES,
+                        help='Names of the examples to run')
+    parser.add_argument('--output', help='JSON file to write results')
+    parser.add_argument('--baseline', help='JSON file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed relative increase over the baseline')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of timed runs of each example')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip peak memory measurement')
+    args = parser.parse_args(argv)
+
+    logging.getLogger('sasoptpy').setLevel(logging.WARNING)
+    print('{:<24}{:>10}{:>10}{:>12}{:>14}'.format(
+        'example', 'build', 'to_frame', 'to_optmodel', 'peak_memory'))
+    current = run_benchmarks(args.examples, repeat=args.repeat,
+                             memory=not args.no_memory)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, tolerance=args.tolerance)
+        for r in regressions:
+            print('REGRESSION: ' + r)
+        if regressions:
+            return 1
+        print('No regressions against {}.'.format(args.baseline))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
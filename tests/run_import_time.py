@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Checks the time of ``import sasoptpy`` against a budget
+
+Each run imports the package in a fresh interpreter. The script exits with
+status 1 if the fastest run is over the budget or if a heavy dependency is
+imported eagerly.
+
+Usage::
+
+    python tests/run_import_time.py --budget 0.2 --repeat 5
+
+'''
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules that should only be loaded on first use
+DEFERRED = ['pandas', 'numpy', 'swat', 'saspy', 'inspect']
+
+PROBE = '''
+import json, sys, time
+t0 = time.perf_counter()
+import sasoptpy
+elapsed = time.perf_counter() - t0
+print(json.dumps({'elapsed': elapsed,
+                  'loaded': [m for m in %r if m in sys.modules]}))
+''' % (DEFERRED,)
+
+
+def measure():
+    '''
+    Imports sasoptpy in a new interpreter and returns the measurement
+    '''
+    env = dict(os.environ)
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    out = subprocess.check_output([sys.executable, '-c', PROBE], env=env)
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+def top_imports(count=10):
+    '''
+    Returns the slowest imports reported by ``-X importtime``
+    '''
+    env = dict(os.environ)
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                           'import sasoptpy'], env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    rows = []
+    for line in proc.stderr.decode().splitlines():
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        rows.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--budget', type=float, default=0.2,
+                        help='Maximum import time in seconds')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of fresh interpreter runs')
+    args = parser.parse_args(argv)
+
+    runs = [measure() for _ in range(args.repeat)]
+    best = min(r['elapsed'] for r in runs)
+    loaded = sorted(set(m for r in runs for m in r['loaded']))
+    print('import sasoptpy: {:.4f} s (budget {:.4f} s)'.format(
+        best, args.budget))
+    print('Slowest imports (cumulative microseconds):')
+    for us, name in top_imports():
+        print('  {:>10}  {}'.format(us, name))
+
+    failed = False
+    if best > args.budget:
+        print('ERROR: Import time is over the budget.')
+        failed = True
+    if loaded:
+        print('ERROR: Deferred modules are imported eagerly: {}'.format(
+            ', '.join(loaded)))
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
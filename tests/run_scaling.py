@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Measures build and export time and memory of synthetic models versus size
+
+Each generator builds a model whose number of nonzeros grows with the size
+argument. Time spent in add_variables, add_constraints and quick_sum is
+recorded while building, then to_frame and to_optmodel are timed. The
+growth exponent of each phase is estimated from the log-log slope between
+consecutive sizes, so an exponent near 1 means linear time in the number
+of nonzeros.
+
+Usage::
+
+    python tests/run_scaling.py
+    python tests/run_scaling.py transportation --sizes 100 200 400 800
+    python tests/run_scaling.py --memory --output scaling.json
+
+Sizes of a few thousands give models with millions of nonzeros.
+
+'''
+
+import argparse
+from contextlib import contextmanager
+import functools
+import json
+import logging
+import math
+import operator
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import sasoptpy as so
+
+
+PHASES = ['add_variables', 'add_constraints', 'quick_sum', 'to_frame',
+          'to_optmodel']
+
+
+class PhaseTimer:
+    '''
+    Accumulates time and peak memory spent in named phases
+    '''
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.peaks = dict.fromkeys(PHASES, 0)
+
+    @contextmanager
+    def phase(self, name):
+        if self.memory:
+            tracemalloc.clear_traces()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] += time.perf_counter() - start
+            if self.memory:
+                self.peaks[name] = max(self.peaks[name],
+                                       tracemalloc.get_traced_memory()[1])
+
+
+def transportation(n, timer):
+    '''
+    Transportation problem with n sources and n sinks
+    '''
+    rng = random.Random(n)
+    sources = range(n)
+    sinks = range(n)
+    supply = {i: rng.randint(50, 100) for i in sources}
+    demand = {j: rng.randint(10, 50) for j in sinks}
+    cost = {(i, j): rng.randint(1, 20) for i in sources for j in sinks}
+
+    m = so.Model(name='transportation_{}'.format(n))
+    with timer.phase('add_variables'):
+        x = m.add_variables(sources, sinks, lb=0, name='x')
+    with timer.phase('add_constraints'):
+        m.add_constraints(
+            (x.sum(i, '*') <= supply[i] for i in sources), name='supply')
+        m.add_constraints(
+            (x.sum('*', j) >= demand[j] for j in sinks), name='demand')
+    with timer.phase('quick_sum'):
+        total = so.quick_sum(cost[i, j] * x[i, j]
+                             for i in sources for j in sinks)
+    m.set_objective(total, sense=so.MIN, name='total_cost')
+    return m
+
+
+def production(n, timer, periods=12):
+    '''
+    Multi-period production planning with n products and n/4 machines,
+    similar to factory_planning examples
+    '''
+    rng = random.Random(n)
+    products = range(n)
+    machines = range(max(n // 4, 1))
+    time_periods = range(1, periods + 1)
+    profit = {p: rng.randint(5, 15) for p in products}
+    hours = {(mc, p): rng.choice([0, 0.1, 0.2, 0.5])
+             for mc in machines for p in products}
+    capacity = {mc: rng.randint(300, 800) for mc in machines}
+    market = {(p, t): rng.randint(100, 600)
+              for p in products for t in time_periods}
+    holding_cost = 0.5
+    max_stock = 100
+
+    m = so.Model(name='production_{}'.format(n))
+    with timer.phase('add_variables'):
+        make = m.add_variables(products, time_periods, lb=0, name='make')
+        sell = m.add_variables(products, time_periods, lb=0, name='sell')
+        store = m.add_variables(products, [0] + list(time_periods), lb=0,
+                                ub=max_stock, name='store')
+        for p in products:
+            store[p, 0].set_bounds(lb=0, ub=0)
+            for t in time_periods:
+                sell[p, t].set_bounds(ub=market[p, t])
+    with timer.phase('add_constraints'):
+        m.add_constraints(
+            (store[p, t-1] + make[p, t] == sell[p, t] + store[p, t]
+             for p in products for t in time_periods), name='balance')
+        m.add_constraints(
+            (so.quick_sum(hours[mc, p] * make[p, t] for p in products
+                          if hours[mc, p] != 0) <= capacity[mc]
+             for mc in machines for t in time_periods), name='capacity')
+    with timer.phase('quick_sum'):
+        total = so.quick_sum(profit[p] * sell[p, t] - holding_cost *
+                             store[p, t]
+                             for p in products for t in time_periods)
+    m.set_objective(total, sense=so.MAX, name='total_profit')
+    return m
+
+
+def kidney(n, timer, density=0.02):
+    '''
+    Kidney-exchange style cycle packing on a random graph with n nodes
+    '''
+    rng = random.Random(n)
+    nodes = range(n)
+    arcs = [(i, j) for i in nodes for j in nodes
+            if i != j and rng.random() < density]
+    weight = {a: round(rng.random(), 3) for a in arcs}
+    out_arcs = {i: [] for i in nodes}
+    in_arcs = {i: [] for i in nodes}
+    for (i, j) in arcs:
+        out_arcs[i].append((i, j))
+        in_arcs[j].append((i, j))
+
+    m = so.Model(name='kidney_{}'.format(n))
+    with timer.phase('add_variables'):
+        use = m.add_variables(arcs, vartype=so.BIN, name='use')
+    with timer.phase('add_constraints'):
+        m.add_constraints(
+            (so.quick_sum(use[a] for a in out_arcs[i]) ==
+             so.quick_sum(use[a] for a in in_arcs[i])
+             for i in nodes), name='flow')
+        m.add_constraints(
+            (so.quick_sum(use[a] for a in in_arcs[i]) <= 1
+             for i in nodes), name='receive')
+    with timer.phase('quick_sum'):
+        total = so.quick_sum(weight[a] * use[a] for a in arcs)
+    m.set_objective(total, sense=so.MAX, name='total_weight')
+    return m
+
+
+def curve_fitting(n, timer, degree=8):
+    '''
+    Dense least-squares polynomial fit with n points, a QP
+    '''
+    rng = random.Random(n)
+    points = range(n)
+    xs = {i: i / n for i in points}
+    ys = {i: math.sin(3 * xs[i]) + rng.gauss(0, 0.1) for i in points}
+    powers = range(degree + 1)
+
+    m = so.Model(name='curve_fitting_{}'.format(n))
+    with timer.phase('add_variables'):
+        beta = m.add_variables(powers, name='beta')
+        estimate = m.add_variables(points, name='estimate')
+    with timer.phase('add_constraints'):
+        m.add_constraints(
+            (estimate[i] == so.quick_sum(xs[i] ** k * beta[k]
+                                         for k in powers)
+             for i in points), name='estimate_con')
+    with timer.phase('quick_sum'):
+        total = so.quick_sum((ys[i] - estimate[i]) * (ys[i] - estimate[i])
+                             for i in points)
+    m.set_objective(total, sense=so.MIN, name='sse')
+    return m
+
+
+def builtin_sum(n, timer):
+    '''
+    Knapsack with n items whose sums are built with Python's sum(),
+    functools.reduce and chained + instead of quick_sum
+    '''
+    rng = random.Random(n)
+    items = range(n)
+    value = {i: rng.randint(1, 50) for i in items}
+    weight = {i: rng.randint(1, 20) for i in items}
+
+    m = so.Model(name='builtin_sum_{}'.format(n))
+    with timer.phase('add_variables'):
+        x = m.add_variables(items, vartype=so.BIN, name='x')
+    with timer.phase('add_constraints'):
+        m.add_constraint(sum(weight[i] * x[i] for i in items) <= 5 * n,
+                         name='capacity')
+        m.add_constraint(functools.reduce(operator.add, (x[i] for i in items))
+                         <= n // 2, name='count')
+        m.add_constraints((x[i] + x[i+1] + x[i+2] <= 2
+                           for i in range(n - 2)), name='spread')
+    with timer.phase('quick_sum'):
+        total = sum(value[i] * x[i] for i in items)
+    m.set_objective(total, sense=so.MAX, name='total_value')
+    return m
+
+
+GENERATORS = {
+    'transportation': (transportation, [20, 40, 80, 160]),
+    'production': (production, [20, 40, 80, 160]),
+    'kidney': (kidney, [100, 200, 400, 800]),
+    'curve_fitting': (curve_fitting, [100, 200, 400, 800]),
+    'builtin_sum': (builtin_sum, [2500, 5000, 10000, 20000]),
+}
+
+
+def count_nonzeros(m):
+    return sum(len(c._linCoef) - 1 for c in m._constraints)
+
+
+def run_size(generator, size, memory=False):
+    '''
+    Builds and exports a model of the given size, returns measurements
+    '''
+    timer = PhaseTimer(memory=memory)
+    if memory:
+        tracemalloc.start()
+    try:
+        m = generator(size, timer)
+        if m._is_linear():
+            with timer.phase('to_frame'):
+                m.to_frame()
+        with timer.phase('to_optmodel'):
+            m.to_optmodel()
+    finally:
+        if memory:
+            tracemalloc.stop()
+    result = {'size': size, 'variables': len(m._variables),
+              'constraints': len(m._constraints),
+              'nonzeros': count_nonzeros(m), 'time': timer.times}
+    if memory:
+        result['peak_memory'] = timer.peaks
+    so.reset_globals()
+    return result
+
+
+def exponents(results):
+    '''
+    Returns the log-log slope of each phase time versus nonzeros between
+    the last two sizes
+    '''
+    if len(results) < 2:
+        return {}
+    a, b = results[-2], results[-1]
+    if a['nonzeros'] == 0 or b['nonzeros'] == a['nonzeros']:
+        return {}
+    ratio = math.log(b['nonzeros'] / a['nonzeros'])
+    slopes = {}
+    for phase in PHASES:
+        if a['time'][phase] > 0 and b['time'][phase] > 0:
+            slopes[phase] = math.log(b['time'][phase] /
+                                     a['time'][phase]) / ratio
+    return slopes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('generators', nargs='*', default=list(GENERATORS),
+                        help='Names of the generators to run')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        help='Sizes to run, defaults depend on generator')
+    parser.add_argument('--memory', action='store_true',
+                        help='Measure peak memory of each phase (slower)')
+    parser.add_argument('--output', help='JSON file to write results')
+    args = parser.parse_args(argv)
+
+    logging.getLogger('sasoptpy').setLevel(logging.WARNING)
+    report = {}
+    for name in args.generators:
+        generator, sizes = GENERATORS[name]
+        sizes = args.sizes or sizes
+        print('{}:'.format(name))
+        print('{:>8}{:>10}{:>14}{:>14}{:>12}{:>10}{:>10}{:>12}'.format(
+            'size', 'vars', 'nonzeros', 'add_variables', 'add_constr',
+            'quick_sum', 'to_frame', 'to_optmodel'))
+        results = []
+        for size in sizes:
+            r = run_size(generator, size, memory=args.memory)
+            results.append(r)
+            t = r['time']
+            print('{:>8}{:>10}{:>14}{:>14.4f}{:>12.4f}{:>10.4f}{:>10.4f}'
+                  '{:>12.4f}'.format(
+                      size, r['variables'], r['nonzeros'],
+                      t['add_variables'], t['add_constraints'],
+                      t['quick_sum'], t['to_frame'], t['to_optmodel']))
+            if args.memory:
+                p = r['peak_memory']
+                print('{:>32}{:>14}{:>12}{:>10}{:>10}{:>12}'.format(
+                    'peak bytes', p['add_variables'], p['add_constraints'],
+                    p['quick_sum'], p['to_frame'], p['to_optmodel']))
+        slopes = exponents(results)
+        print('  growth exponent vs nonzeros: ' + ', '.join(
+            '{} {:.2f}'.format(k, v) for k, v in slopes.items()))
+        report[name] = {'results': results, 'exponents': slopes}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
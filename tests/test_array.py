@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for :class:`ExpressionArray`
+'''
+
+import logging
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import sasoptpy as so
+import sasoptpy.utils
+
+
+def coefs(e):
+    return {k: v['val'] for k, v in e._linCoef.items() if v['val'] != 0}
+
+
+class TestExpressionArray(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        self.m = so.Model(name='m')
+        self.x = self.m.add_variables(['a', 'b', 'c'], name='x', lb=0)
+        self.y = self.m.add_variables(['a', 'b', 'c'], name='y', lb=0)
+        self.z = self.m.add_variables(['b', 'c', 'd'], name='z', lb=0)
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_group_alignment(self):
+        e = self.x + 2 * self.y - self.z
+        self.assertEqual(e.get_keys(), [('a',), ('b',), ('c',), ('d',)])
+        self.assertEqual(coefs(e['a']), {'x[a]': 1, 'y[a]': 2})
+        self.assertEqual(coefs(e['b']), {'x[b]': 1, 'y[b]': 2, 'z[b]': -1})
+        self.assertEqual(coefs(e['d']), {'z[d]': -1})
+
+    def test_series_alignment(self):
+        cost = pd.Series({'c': 3, 'a': 1, 'b': 2})
+        e = self.x * cost
+        self.assertEqual(coefs(e['a']), {'x[a]': 1})
+        self.assertEqual(coefs(e['c']), {'x[c]': 3})
+
+    def test_missing_coefficients(self):
+        e = self.x * {'a': 2} + {'b': 5}
+        self.assertEqual(coefs(e['a']), {'x[a]': 2})
+        self.assertEqual(coefs(e['b']), {'CONST': 5})
+        self.assertEqual(coefs(e['c']), {})
+
+    def test_constraints(self):
+        cap = pd.Series({'a': 5, 'b': 10, 'c': 15})
+        c = self.m.add_constraints(self.x + 2 * self.y <= cap, name='cap')
+        self.assertEqual(len(c._conlist), 3)
+        self.assertEqual(c['b']._linCoef['CONST']['val'], -10)
+        self.assertEqual(c['b']._direction, 'L')
+        self.assertEqual(coefs(c['c']),
+                         {'x[c]': 1, 'y[c]': 2, 'CONST': -15})
+
+    def test_missing_rhs(self):
+        with self.assertRaises(KeyError):
+            self.x + 2 * self.y <= pd.Series({'a': 5, 'b': 10})
+        with self.assertRaises(KeyError):
+            self.x >= {'a': 1, 'b': 2}
+        with self.assertRaises(KeyError):
+            2 * self.x == pd.Series({'a': 1, 'b': None, 'c': 3})
+
+    def test_range(self):
+        c = self.m.add_constraints(3 * self.x == [1, 4], name='rng')
+        self.assertEqual(c['a']._range, 3)
+        self.assertEqual(c['a']._linCoef['CONST']['val'], -1)
+
+    def test_same_as_generator(self):
+        cap = {'a': 5, 'b': 10, 'c': 15}
+        c1 = self.m.add_constraints(self.x + 2 * self.y <= cap, name='c1')
+        c2 = self.m.add_constraints(
+            (self.x[i] + 2 * self.y[i] <= cap[i] for i in ['a', 'b', 'c']),
+            name='c2')
+        for i in ['a', 'b', 'c']:
+            self.assertEqual(coefs(c1[i]), coefs(c2[i]))
+
+    def test_group_equality(self):
+        self.assertTrue(self.x == self.x)
+        self.assertFalse(self.x == self.y)
+        self.assertIn(self.y, [self.x, self.y])
+        self.assertEqual([self.x, self.y].index(self.y), 1)
+        c = self.m.add_constraints(self.x + 0 == {'a': 1, 'b': 2, 'c': 3},
+                                   name='eq')
+        self.assertEqual(c['b']._direction, 'E')
+        self.assertEqual(coefs(c['b']), {'x[b]': 1, 'CONST': -2})
+
+    def test_row_index(self):
+        keys = list(range(2000))
+        w = self.m.add_variables(keys, name='w')
+        v = self.m.add_variables(keys, name='v')
+        e = 3 * w - v + 1
+        self.assertIsNone(e._index)
+        self.assertEqual(coefs(e[7]), {'w[7]': 3, 'v[7]': -1, 'CONST': 1})
+        index = e._index
+        self.assertEqual(coefs(e[1999]),
+                         {'w[1999]': 3, 'v[1999]': -1, 'CONST': 1})
+        self.assertIs(e._index, index)
+        # Derived arrays have their own index
+        f = e + w
+        self.assertEqual(coefs(f[7]), {'w[7]': 4, 'v[7]': -1, 'CONST': 1})
+        self.assertEqual(coefs(e[7]), {'w[7]': 3, 'v[7]': -1, 'CONST': 1})
+
+    def test_factorize_wide_keys(self):
+        # Product of the numbers of unique values exceeds 64-bit integers
+        n = 300000
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame({c: rng.permutation(n) for c in 'abcd'})
+        df = pd.concat([df, df.iloc[:10]], ignore_index=True)
+        codes, keys = sasoptpy.utils._factorize_frame(df, list('abcd'))
+        self.assertEqual(len(keys), n)
+        self.assertEqual(keys, sorted(keys))
+        rows = list(df.itertuples(index=False, name=None))
+        self.assertEqual([keys[i] for i in codes[[0, 5, n - 1, n]]],
+                         [rows[0], rows[5], rows[n - 1], rows[0]])
+        self.assertTrue((codes[n:] == codes[:10]).all())
+
+    def test_from_frame_missing_rhs(self):
+        coef = pd.DataFrame([['r1', 'a', 2.0], ['r2', 'b', 1.0]],
+                            columns=['row', 'prod', 'value'])
+        with self.assertRaises(KeyError):
+            self.m.add_constraints_from_frame(
+                coef, 'row', self.x, 'prod', 'value', 'L',
+                rhs=pd.Series({'r1': 4}))
+        c = self.m.add_constraints_from_frame(
+            coef, 'row', self.x, 'prod', 'value', 'L',
+            rhs=pd.Series({'r1': 4, 'r2': 3}), name='lim')
+        self.assertEqual(c['r2']._linCoef['CONST']['val'], -3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for session backends and :class:`LocalSession`
+'''
+
+import unittest
+
+import pandas as pd
+
+import sasoptpy as so
+
+
+class SASsession:
+    '''
+    Records programs submitted to a saspy session
+    '''
+
+    def __init__(self, quotes=True):
+        self.quotes = quotes
+        self.code = []
+
+    def df2sd(self, data, table, keep_outer_quotes=False):
+        if keep_outer_quotes and not self.quotes:
+            raise ValueError('keep_outer_quotes is not supported')
+        return table
+
+    def submit(self, code):
+        self.code.append(code)
+        return {'LOG': '', 'LST': ''}
+
+
+class TestSASBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.session = SASsession()
+        self.backend = so.get_backend(self.session)
+
+    def test_solve_frame_sense(self):
+        self.backend.solve_frame('MPS', 1, {}, so.MAX)
+        self.assertIn('proc optlp data = MPS', self.session.code[-1])
+        self.assertIn('objsense   = max;', self.session.code[-1])
+        self.backend.solve_frame('MPS', 2, {}, so.MIN)
+        self.assertIn('proc optmilp data = MPS', self.session.code[-1])
+        self.assertIn('objsense   = min;', self.session.code[-1])
+
+    def test_solve_frame_options(self):
+        self.backend.solve_frame(
+            'MPS', 2, {'maxtime': 10, 'decomp': {'method': 'user'}},
+            so.MIN)
+        code = self.session.code[-1]
+        self.assertIn('maxtime=10;', code)
+        self.assertIn('decomp method=user;', code)
+        self.assertLess(code.index('maxtime=10;'),
+                        code.index('decomp method=user;'))
+
+    def test_solve_frame_ignored_option(self):
+        with self.assertLogs('sasoptpy', level='WARNING') as cm:
+            self.backend.solve_frame('MPS', 1, {'with': 'lp'}, so.MIN)
+        self.assertIn('Option with is ignored', cm.output[0])
+        self.assertNotIn('with', self.session.code[-1])
+
+    def test_upload_frame_fallback(self):
+        self.session.quotes = False
+        df = pd.DataFrame({'field3': ["'MARKER'"]})
+        with self.assertLogs('sasoptpy', level='WARNING') as cm:
+            table = self.backend.upload_frame(df, casout={'name': 'MPS'})
+        self.assertEqual(table, 'MPS')
+        self.assertIn('could not be uploaded', cm.output[0])
+        self.assertIn('data MPS;', self.session.code[-1])
+
+
+class TestLocalSession(unittest.TestCase):
+
+    def tearDown(self):
+        so.reset_globals()
+
+    def test_frame_solve(self):
+        s = so.LocalSession()
+        m = so.Model(name='m', session=s)
+        x = m.add_variable(name='x', lb=1, ub=4)
+        m.set_objective(2 * x, sense=so.MIN, name='obj')
+        m.solve(frame=True)
+        self.assertEqual(m.get_objective_value(), 2)
+        self.assertEqual(x.get_value(), 1)
+        self.assertEqual(s.count_calls('upload'), 1)
+        self.assertEqual(s.count_calls('solve'), 1)
+
+    def test_responder_options(self):
+        received = []
+
+        def responder(action, **kwargs):
+            received.append((action, kwargs))
+
+        s = so.LocalSession(responder=responder)
+        m = so.Model(name='m', session=s)
+        x = m.add_variable(name='x', lb=1, ub=4)
+        m.set_objective(x, sense=so.MAX, name='obj')
+        m.solve(frame=True, options={'maxtime': 5})
+        action, kwargs = received[0]
+        self.assertEqual(action, 'solve')
+        self.assertEqual(kwargs['sense'], so.MAX)
+        self.assertEqual(kwargs['options']['maxtime'], 5)
+
+    def test_patch_table(self):
+        s = so.LocalSession()
+        s.upload_frame(pd.DataFrame({'_id_': [1, 2], 'v': [1.0, 2.0]}),
+                       casout='T')
+        s.patch_table('T', pd.DataFrame({'_id_': [2], 'v': [5.0]}))
+        self.assertEqual(list(s.tables['T']['v']), [1.0, 5.0])
+        self.assertEqual(s.count_calls('patch'), 1)
+
+
+
+class TestExports(unittest.TestCase):
+
+    def test_star_import(self):
+        namespace = {}
+        exec('from sasoptpy.backends import *', namespace)
+        exported = set(namespace) - {'__builtins__'}
+        self.assertEqual(exported, {
+            'SessionBackend', 'CASBackend', 'SASBackend', 'LocalSession',
+            'LocalTable', 'register_backend', 'get_backend'})
+
+
+if __name__ == '__main__':
+    unittest.main()
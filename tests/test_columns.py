@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for the column index of :class:`Model`
+'''
+
+import logging
+import unittest
+
+import sasoptpy as so
+
+
+class TestColumnIndex(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        self.session = so.LocalSession()
+        m = so.Model(name='m', session=self.session)
+        self.x = m.add_variable(name='x', lb=0)
+        self.y = m.add_variable(name='y', lb=0)
+        self.c1 = m.add_constraint(self.x + 3 * self.y <= 6, name='c1')
+        self.c2 = m.add_constraint(2 * self.y >= 1, name='c2')
+        m.set_objective(4 * self.x - 5 * self.y, name='obj', sense=so.MAX)
+        self.m = m
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def uploaded_columns(self):
+        self.m.solve(frame=True)
+        upload = [c for c in self.session.calls if c['action'] == 'upload']
+        mps = self.session.tables[upload[-1]['table']]
+        start = mps.index[mps['Field1'] == 'COLUMNS'][0]
+        end = mps.index[mps['Field1'] == 'RHS'][0]
+        columns = {}
+        for _, row in mps.iloc[start+1:end].iterrows():
+            for f, v in (('Field3', 'Field4'), ('Field5', 'Field6')):
+                if row[f] != '':
+                    columns[row['Field2'], row[f]] = row[v]
+        return columns
+
+    def test_get_column(self):
+        self.assertEqual(self.m.get_column(self.y), {'c1': 3, 'c2': 2})
+        self.assertEqual(self.m.get_column('x'), {'c1': 1})
+        self.assertEqual(self.m.get_variable_coef(self.y, self.c1), 3)
+        self.assertEqual(self.m.get_variable_coef('x', 'c2'), 0)
+        self.assertEqual(self.m.get_variable_coef(self.y), -5)
+
+    def test_changed_coefficient(self):
+        self.c2.update_var_coef(self.x, 7)
+        self.c1.update_var_coef(self.y, 0)
+        self.assertEqual(self.m.get_column(self.x), {'c1': 1, 'c2': 7})
+        self.assertEqual(self.m.get_statistics()['nonzeros'], 3)
+        columns = self.uploaded_columns()
+        self.assertEqual(columns[('x', 'c2')], 7)
+        self.assertEqual(columns.get(('y', 'c1'), 0), 0)
+
+    def test_drop_variable(self):
+        self.m.drop_variable(self.y)
+        self.assertEqual(self.m.get_column(self.y), {})
+        self.assertNotIn('y', self.c1._linCoef)
+        self.assertNotIn('y', self.m.get_objective()._linCoef)
+        self.assertEqual(self.m.get_statistics()['nonzeros'], 1)
+        columns = self.uploaded_columns()
+        self.assertEqual(set(columns), {('x', 'obj'), ('x', 'c1')})
+
+    def test_drop_constraint(self):
+        self.m.drop_constraint(self.c1)
+        self.assertEqual(self.m.get_column(self.y), {'c2': 2})
+        self.assertEqual(self.m.get_column(self.x), {})
+        self.m.add_constraint(self.c1)
+        self.assertEqual(self.m.get_column(self.x), {'c1': 1})
+
+    def test_shared_constraint(self):
+        other = so.Model(name='other')
+        other.add_constraint(self.c1)
+        self.c1.update_var_coef(self.x, 2)
+        self.assertEqual(self.m.get_column(self.x), {'c1': 2})
+        self.assertEqual(other.get_column(self.x), {'c1': 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
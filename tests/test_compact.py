@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for the compact OPTMODEL form of constraint groups
+'''
+
+import logging
+import unittest
+
+import pandas as pd
+
+import sasoptpy as so
+
+
+class TestCompactGroup(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        self.session = so.LocalSession()
+        m = so.Model(name='m', session=self.session)
+        self.x = m.add_variables([1, 2], ['a', 'b'], name='x', lb=0)
+        self.y = m.add_variables([1, 2], name='y', lb=0)
+        x = self.x
+        y = self.y
+        self.c = m.add_constraints(
+            (x[i, j] + 2 * i * y[i] <= i for i in [1, 2] for j in ['a', 'b']),
+            name='c')
+        m.set_objective(self.y[1], sense=so.MIN, name='obj')
+        self.m = m
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_table(self):
+        code, df = self.c._compact_defn('c_COEF')
+        self.assertEqual(list(df.columns), [
+            '_K1_', '_K2_', '_T_', '_COEF_', '_RHS_', '_X1_1_', '_X1_2_',
+            '_X2_1_'])
+        self.assertEqual(len(df), 8)
+        self.assertTrue(pd.api.types.is_integer_dtype(df['_K1_']))
+        self.assertTrue(pd.api.types.is_integer_dtype(df['_X1_1_']))
+        self.assertTrue(pd.api.types.is_integer_dtype(df['_X2_1_']))
+        self.assertFalse(pd.api.types.is_numeric_dtype(df['_X1_2_']))
+        self.assertEqual(df['_X1_1_'].isnull().sum(), 4)
+
+        # Rebuild members from the table
+        for (k1, k2), rows in df.groupby(['_K1_', '_K2_']):
+            c = self.c[k1, k2]
+            self.assertEqual(rows['_RHS_'].iloc[0],
+                             -c._linCoef['CONST']['val'])
+            for _, r in rows.iterrows():
+                if pd.isnull(r['_X2_1_']):
+                    v = self.x[r['_X1_1_'], r['_X1_2_']]
+                else:
+                    v = self.y[r['_X2_1_']]
+                self.assertEqual(c._linCoef[v._name]['val'], r['_COEF_'])
+
+    def test_code(self):
+        code, _ = self.c._compact_defn('c_COEF')
+        self.assertIn('set <num,str,num> _c_terms_;', code)
+        self.assertIn('num _c_x1_1_ {_c_terms_};', code)
+        self.assertIn('str _c_x1_2_ {_c_terms_};', code)
+        self.assertIn('num _c_x2_1_ {_c_terms_};', code)
+        self.assertIn('read data c_COEF into _c_terms_=[_K1_ _K2_ _T_] '
+                      '_c_coef_=_COEF_ _c_x1_1_=_X1_1_ _c_x1_2_=_X1_2_ '
+                      '_c_x2_1_=_X2_1_;', code)
+        self.assertIn(
+            'con c {<_r1, _r2> in _c_rows_} : '
+            '_c_coef_[_r1, _r2, 1] * x[_c_x1_1_[_r1, _r2, 1], '
+            '_c_x1_2_[_r1, _r2, 1]] + '
+            '_c_coef_[_r1, _r2, 2] * y[_c_x2_1_[_r1, _r2, 2]] '
+            '<= _c_rhs_[_r1, _r2];', code)
+
+    def test_solve(self):
+        code = self.m.solve(compact=True, submit=False)
+        self.assertIn('con c {<_r1, _r2> in _c_rows_}', code)
+        self.assertNotIn('con c_1_a', code)
+        self.m.solve(compact=True)
+        s = self.session
+        self.assertEqual(s.count_calls('upload'), 1)
+        self.assertEqual(len(s.tables['c_COEF']), 8)
+
+    def test_mixed_key_types(self):
+        z = self.m.add_variables([1, 'a'], name='z', lb=0)
+        g = so.ConstraintGroup((z[i] <= 1 for i in [1, 'a']), name='g')
+        self.assertIsNone(g._compact_defn('g_COEF'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for concurrent solves
+'''
+
+import concurrent.futures
+import gc
+import logging
+import threading
+import time
+import unittest
+import weakref
+
+import sasoptpy as so
+import sasoptpy.concurrency
+
+
+def get_model(name, session):
+    m = so.Model(name=name, session=session)
+    x = m.add_variable(name='x', lb=1, ub=4)
+    m.set_objective(2 * x, sense=so.MIN, name='obj')
+    return m
+
+
+class TestSolveAll(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_results(self):
+        models = [get_model('m{}'.format(i), so.LocalSession())
+                  for i in range(3)]
+        so.solve_all(models, max_concurrency=2, frame=True)
+        for m in models:
+            self.assertEqual(m.get_objective_value(), 2)
+
+    def test_timeout_does_not_wait(self):
+        release = threading.Event()
+
+        def responder(action, **kwargs):
+            if action == 'solve':
+                release.wait(10)
+
+        slow = get_model('slow', so.LocalSession(responder=responder))
+        fast = get_model('fast', so.LocalSession())
+        start = time.monotonic()
+        try:
+            with self.assertRaises(concurrent.futures.TimeoutError):
+                so.solve_all([slow, fast], timeout=0.2, frame=True)
+            self.assertLess(time.monotonic() - start, 5)
+        finally:
+            release.set()
+
+    def test_failure_cancels_others(self):
+        release = threading.Event()
+
+        def responder(action, **kwargs):
+            if action == 'solve':
+                release.wait(10)
+
+        def failing(action, **kwargs):
+            raise RuntimeError('solver failed')
+
+        slow = get_model('slow', so.LocalSession(responder=responder))
+        bad = get_model('bad', so.LocalSession(responder=failing))
+        start = time.monotonic()
+        try:
+            with self.assertRaises(RuntimeError):
+                so.solve_all([bad, slow], frame=True)
+            self.assertLess(time.monotonic() - start, 5)
+        finally:
+            release.set()
+
+
+class TestSessionLock(unittest.TestCase):
+
+    def test_same_lock(self):
+        s = so.LocalSession()
+        self.assertIs(so.session_lock(s), so.session_lock(s))
+        self.assertIsNot(so.session_lock(s),
+                         so.session_lock(so.LocalSession()))
+
+    def test_lock_released_with_session(self):
+        locks = sasoptpy.concurrency.__dict__['__session_locks']
+        s = so.LocalSession()
+        so.session_lock(s)
+        self.assertIn(s, locks)
+        ref = weakref.ref(s)
+        del s
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_unhashable_session(self):
+        s = {'host': 'localhost'}
+        self.assertIs(so.session_lock(s), so.session_lock(s))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for cached OPTMODEL definitions of variables and constraints
+'''
+
+import logging
+import unittest
+
+import sasoptpy as so
+
+
+class TestDefinitionCache(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        m = so.Model(name='m')
+        self.x = m.add_variables(3, name='x', lb=0)
+        self.y = m.add_variable(name='y', ub=5)
+        self.c = m.add_constraints(
+            (self.x[i] + 2 * self.x[(i + 1) % 3] <= i for i in range(3)),
+            name='c')
+        self.d = m.add_constraint(self.x[0] + self.y >= 1, name='d')
+        m.set_objective(self.y, sense=so.MIN, name='obj')
+        m.set_definition_cache()
+        self.first = m.to_optmodel()
+        self.m = m
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_reuse(self):
+        self.assertIsNotNone(self.d._defn_cache)
+        self.assertIsNotNone(self.y._defn_cache)
+        self.assertIsNotNone(self.c[1]._defn_cache)
+        self.assertFalse(hasattr(self.c, '_defn_cache'))
+        self.assertEqual(self.m.to_optmodel(), self.first)
+
+    def test_set_rhs(self):
+        self.c[1].set_rhs(99)
+        self.assertIn('x[1] + 2 * x[2] <= 99;', self.m.to_optmodel())
+        self.d.set_rhs(4)
+        self.assertIn('con d : x[0] + y >= 4;', self.m.to_optmodel())
+
+    def test_set_coef(self):
+        self.m.set_coef(self.x[0], self.d, 4)
+        self.assertIn('con d : 4 * x[0] + y >= 1;', self.m.to_optmodel())
+        self.c[2].update_var_coef(self.x[0], 3)
+        self.assertIn('x[2] + 3 * x[0] <= 2;', self.m.to_optmodel())
+
+    def test_set_bounds(self):
+        self.y.set_bounds(lb=1)
+        self.assertIn('var y >= 1 <= 5;', self.m.to_optmodel())
+        self.y.set_init(2)
+        self.assertIn('var y >= 1 <= 5 init 2;', self.m.to_optmodel())
+
+    def test_rename_constraint(self):
+        self.d.set_name('e')
+        code = self.m.to_optmodel()
+        self.assertIn('con e : x[0] + y >= 1;', code)
+        self.assertNotIn('con d :', code)
+
+    def test_rename_variable(self):
+        self.y.set_name('z')
+        code = self.m.to_optmodel()
+        self.assertIn('var z <= 5;', code)
+        self.assertIn('con d : x[0] + z >= 1;', code)
+        self.assertIn('min obj = z;', code)
+
+    def test_rename_group(self):
+        group = so.ConstraintGroup(
+            (self.x[i] >= i for i in range(2)), name=None)
+        for member in group:
+            member._defn(cache=True)
+        self.m.add_constraints(group, name='g')
+        self.assertIn('con g_1 : x[1] >= 1;', self.m.to_optmodel())
+
+    def test_disable(self):
+        self.m.set_definition_cache(False)
+        self.assertIsNone(self.d._defn_cache)
+        self.assertIsNone(self.y._defn_cache)
+        self.assertEqual(self.m.to_optmodel(), self.first)
+        self.assertIsNone(self.c[0]._defn_cache)
+        self.assertIsNone(self.x[0]._defn_cache)
+
+    def test_default_off(self):
+        other = so.Model(name='other')
+        v = other.add_variable(name='v')
+        e = other.add_constraint(v <= 1, name='e')
+        other.to_optmodel()
+        self.assertIsNone(v._defn_cache)
+        self.assertIsNone(e._defn_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for dropping constraints from a :class:`Model`
+'''
+
+import logging
+import unittest
+
+import sasoptpy as so
+
+
+class TestDropConstraint(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        m = so.Model(name='m')
+        self.x = m.add_variables(3, name='x', lb=0)
+        self.c = m.add_constraints(
+            (self.x[i] <= i + 1 for i in range(3)), name='c')
+        self.d = m.add_constraint(self.x[0] + self.x[1] >= 1, name='d')
+        m.set_objective(self.x[0] + self.x[1] + self.x[2], name='obj')
+        self.m = m
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_group_member(self):
+        self.m.to_optmodel()
+        member = self.c[1]
+        self.m.drop_constraint(member)
+        code = self.m.to_optmodel()
+        self.assertIn('x[0] <= 1', code)
+        self.assertNotIn('x[1] <= 2', code)
+        self.assertNotIn(1, self.c._condict)
+        self.assertIsNone(member._parent)
+        self.assertEqual(self.m.get_statistics()['constraints'], 3)
+        self.assertEqual(self.m.get_column(self.x[1]), {'d': 1})
+
+    def test_readd_member(self):
+        member = self.c[1]
+        self.m.drop_constraint(member)
+        self.m.add_constraint(member)
+        self.assertIn('x[1] <= 2', self.m.to_optmodel())
+
+    def test_last_member(self):
+        for i in range(3):
+            self.m.drop_constraint(self.c[i])
+        self.assertNotIn(self.c, self.m._congroups)
+        self.assertNotIn('con c', self.m.to_optmodel())
+
+    def test_drop_group(self):
+        self.m.drop_constraints(self.c)
+        self.assertNotIn(self.c, self.m._congroups)
+        self.assertEqual(len(self.c._conlist), 3)
+        self.assertEqual(self.m.get_statistics()['nonzeros'], 2)
+
+    def test_included_model(self):
+        other = so.Model(name='other')
+        other.include(self.m)
+        self.assertIsNone(other.get_constraint('d'))
+        other.drop_constraint(self.d)
+        self.assertEqual(other.get_statistics()['constraints'], 3)
+        self.assertEqual(other.get_statistics()['nonzeros'], 3)
+        self.assertEqual(other.get_column(self.x[0]), {'c[0]': 1})
+        self.assertEqual(self.m.get_statistics()['constraints'], 4)
+
+    def test_unknown_constraint(self):
+        other = so.Model(name='other')
+        y = other.add_variable(name='y')
+        e = other.add_constraint(y <= 1, name='e')
+        self.m.drop_constraint(e)
+        self.m.drop_constraint('d')
+        self.assertEqual(self.m.get_statistics()['constraints'], 4)
+        self.assertEqual(other.get_statistics()['constraints'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for local expansion of abstract models
+'''
+
+import logging
+import unittest
+
+import sasoptpy as so
+from sasoptpy.expand import ExpansionError
+
+
+class TestExpand(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        self.session = so.LocalSession()
+        m = so.Model(name='m', session=self.session)
+        I = m.add_set(name='I', init=[1, 2, 3])
+        p = m.add_parameter(I, name='p', init=2)
+        x = m.add_variables(I, name='x', lb=0)
+        m.add_constraints((x[i] <= p[i] for i in I), name='c')
+        m.set_objective(so.quick_sum(p[i] * x[i] for i in I), name='obj',
+                        sense=so.MAX)
+        self.m = m
+        self.p = p
+        self.x = x
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_expand(self):
+        e = self.m.expand(data={self.p: {3: 7}})
+        self.assertEqual([c._name for c in e._constraints],
+                         ['c[1]', 'c[2]', 'c[3]'])
+        self.assertEqual(sorted(e._constraintDict),
+                         ['c[1]', 'c[2]', 'c[3]'])
+        self.assertEqual(e._constraints[2]._linCoef['CONST']['val'], -7)
+        obj = e.get_objective()
+        self.assertEqual(obj._linCoef['x[3]']['val'], 7)
+        self.assertEqual(e.get_statistics()['problem'], 'LP')
+
+    def test_expanded_optmodel(self):
+        code = self.m.expand().to_optmodel()
+        self.assertIn('con c[1] : x[1] <= 2.0;', code)
+        self.assertIn('max obj = 2.0 * x[1] + 2.0 * x[2] + 2.0 * x[3];',
+                      code)
+
+    def test_statistics(self):
+        stats = self.m.get_statistics()
+        self.assertEqual(stats['problem'], 'LP')
+        self.assertGreater(stats['abstract'], 0)
+        I = self.m._sets[0]
+        self.m.add_constraint(so.quick_sum(self.x[i] * self.x[i]
+                                           for i in I) <= 3, name='q')
+        self.assertEqual(self.m.get_statistics()['problem'], 'NLP')
+
+    def test_frame_solve(self):
+        self.m.solve(frame=True)
+        self.assertEqual(self.session.count_calls('upload'), 1)
+        self.assertEqual(self.m.get_reports()[-1].method, 'frame')
+        self.assertEqual(self.x[1].get_value(), 0)
+
+    def test_names_not_registered(self):
+        obj = self.m.get_objective()
+        self.m.expand()
+        self.assertIs(so.get_obj_by_name('obj'), obj)
+        self.assertIsNone(so.get_obj_by_name('c[1]'))
+
+    def test_expansion_reused(self):
+        self.m.solve(frame=True)
+        expanded = self.m._local_expansion()
+        self.m.solve(frame=True)
+        self.assertIs(self.m._local_expansion(), expanded)
+        self.assertIs(expanded._session, self.session)
+
+    def test_expansion_rebuilt(self):
+        expanded = self.m._local_expansion()
+        self.p[2] = 7
+        changed = self.m._local_expansion()
+        self.assertIsNot(changed, expanded)
+        self.assertEqual(
+            changed.get_constraint('c[2]')._linCoef['CONST']['val'], -7)
+        self.m.add_constraint(self.x[1] + self.x[2] <= 5, name='d')
+        self.assertIsNot(self.m._local_expansion(), changed)
+        self.assertEqual(len(self.m._local_expansion()._constraints), 4)
+
+    def test_non_numeric_value(self):
+        m = so.Model(name='n', session=self.session)
+        q = m.add_parameter(name='q', init={1: 2})
+        y = m.add_variable(name='y', lb=0)
+        m.add_constraint(y <= q, name='d')
+        m.set_objective(y, name='o', sense=so.MAX)
+        with self.assertRaises(ExpansionError):
+            m.expand()
+        self.assertIsNone(m._local_expansion())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for in-place additions of :class:`Expression` objects
+'''
+
+import logging
+import sys
+import unittest
+
+import sasoptpy as so
+import sasoptpy.components
+
+
+def coefs(e):
+    return {k: v['val'] for k, v in e._linCoef.items() if v['val'] != 0}
+
+
+class Holder:
+    pass
+
+
+class TestInPlaceAddition(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        self.m = so.Model(name='m')
+        self.x = self.m.add_variables(3, name='x')
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_builtin_sum(self):
+        e = sum(2 * self.x[i] for i in range(3))
+        self.assertEqual(coefs(e), {'x[0]': 2, 'x[1]': 2, 'x[2]': 2})
+
+    def test_list_elements(self):
+        items = [self.x[i] + 1 for i in range(3)]
+        total = sum(items)
+        self.assertEqual(coefs(total),
+                         {'x[0]': 1, 'x[1]': 1, 'x[2]': 1, 'CONST': 3})
+        for i, e in enumerate(items):
+            self.assertEqual(coefs(e), {'x[{}]'.format(i): 1, 'CONST': 1})
+
+    def test_dict_values(self):
+        items = {i: 2 * self.x[i] for i in range(3)}
+        total = sum(items.values())
+        self.assertEqual(coefs(total), {'x[0]': 2, 'x[1]': 2, 'x[2]': 2})
+        self.assertEqual(coefs(items[0]), {'x[0]': 2})
+        self.assertEqual(coefs(items[1]), {'x[1]': 2})
+
+    def test_attribute(self):
+        h = Holder()
+        h.e = self.x[0] + 1
+        f = h.e + self.x[1]
+        g = h.e - self.x[2]
+        self.assertEqual(coefs(h.e), {'x[0]': 1, 'CONST': 1})
+        self.assertEqual(coefs(f), {'x[0]': 1, 'x[1]': 1, 'CONST': 1})
+        self.assertEqual(coefs(g), {'x[0]': 1, 'x[2]': -1, 'CONST': 1})
+
+    def test_same_object_twice(self):
+        e = self.x[0] + 1
+
+        def twice():
+            yield e
+            yield e
+
+        total = sum(twice())
+        self.assertEqual(coefs(total), {'x[0]': 2, 'CONST': 2})
+        self.assertEqual(coefs(e), {'x[0]': 1, 'CONST': 1})
+
+    def test_iadd(self):
+        e = self.x[0] + 1
+        alias = e
+        for i in range(3):
+            e += self.x[i]
+        e -= 2 * self.x[0]
+        self.assertIsNot(e, alias)
+        self.assertEqual(coefs(alias), {'x[0]': 1, 'CONST': 1})
+        self.assertEqual(coefs(e),
+                         {'x[1]': 1, 'x[2]': 1, 'CONST': 1})
+
+    def test_add_inplace(self):
+        e = so.Expression()
+        alias = e
+        for i in range(3):
+            e.add_inplace(self.x[i])
+        self.assertIs(e.add_inplace(2 * self.x[0], -1), alias)
+        self.assertEqual(coefs(alias), {'x[0]': -1, 'x[1]': 1, 'x[2]': 1})
+        with self.assertRaises(ValueError):
+            self.x[0].add_inplace(1)
+        named = so.Expression(self.x[1], name='named')
+        with self.assertRaises(ValueError):
+            named.add_inplace(self.x[2])
+        self.assertEqual(coefs(named), {'x[1]': 1})
+
+    def test_user_expression_copied(self):
+        self.assertFalse(so.Expression(self.x[0])._intermediate)
+        self.assertTrue((self.x[0] + 1)._intermediate)
+        with so.profile() as p:
+            total = so.Expression(self.x[0]) + self.x[1]
+        self.assertEqual(coefs(total), {'x[0]': 1, 'x[1]': 1})
+        self.assertEqual(p['add_temp'], 0)
+        with so.profile() as p:
+            sum(self.x[i] for i in range(3))
+        self.assertEqual(p['add_temp'], 2)
+
+    def test_iadd_named(self):
+        v = self.x[0]
+        v += 1
+        self.assertIsNot(v, self.x[0])
+        self.assertEqual(coefs(self.x[0]), {'x[0]': 1})
+        o = self.m.set_objective(self.x[1], name='obj', sense=so.MIN)
+        alias = o
+        o += self.x[2]
+        self.assertIsNot(o, alias)
+        self.assertEqual(coefs(self.m.get_objective()), {'x[1]': 1})
+        c = self.m.add_constraint(self.x[0] <= 2, name='c')
+        d = c
+        d += self.x[1]
+        self.assertEqual(coefs(c), {'x[0]': 1, 'CONST': -2})
+
+    def test_without_refcount(self):
+        getrefcount = sys.getrefcount
+        del sys.getrefcount
+        try:
+            self.assertEqual(sasoptpy.components._owned_refs(), 0)
+        finally:
+            sys.getrefcount = getrefcount
+        owned = sasoptpy.components._OWNED_REFS
+        sasoptpy.components._OWNED_REFS = 0
+        try:
+            items = [self.x[i] + 1 for i in range(3)]
+            total = sum(items)
+            self.assertEqual(coefs(items[0]), {'x[0]': 1, 'CONST': 1})
+            self.assertEqual(coefs(total)['CONST'], 3)
+        finally:
+            sasoptpy.components._OWNED_REFS = owned
+
+
+if __name__ == '__main__':
+    unittest.main()
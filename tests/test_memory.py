@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for memory profiles of :func:`profile_memory`
+'''
+
+import logging
+import tracemalloc
+import unittest
+
+import sasoptpy as so
+
+
+class TestMemoryProfile(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        self.session = so.LocalSession()
+        m = so.Model(name='m', session=self.session)
+        x = m.add_variables(20, name='x', lb=0, ub=1)
+        m.add_constraint(so.quick_sum(x[i] for i in range(20)) <= 3,
+                         name='c')
+        m.set_objective(so.quick_sum(x[i] for i in range(20)), name='obj',
+                        sense=so.MAX)
+        self.m = m
+        self.x = x
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_solve_phases(self):
+        with so.profile_memory(top=3) as mp:
+            self.m.solve(frame=True)
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertNotIn(mp._listener, so.report.SolveReport.listeners)
+        phases = [p['phase'] for p in mp.phases]
+        for name in ('convert', 'upload', 'solve', 'parse'):
+            self.assertIn(name, phases)
+        memory = self.m.get_reports()[-1].info['memory']
+        self.assertEqual(set(memory), set(phases))
+        for name, values in memory.items():
+            self.assertEqual(set(values), {'peak', 'retained'})
+            self.assertGreaterEqual(values['peak'], values['retained'])
+        for p in mp.phases:
+            self.assertLessEqual(len(p['top']), 3)
+        df = mp.to_frame()
+        self.assertEqual(list(df.columns), ['peak', 'retained'])
+
+    def test_custom_phase(self):
+        mp = so.profile_memory()
+        with mp.phase('build'):
+            kept = [2 * self.x[i] for i in range(20)]
+        mp.stop()
+        self.assertFalse(tracemalloc.is_tracing())
+        entry, = mp.phases
+        self.assertEqual(entry['phase'], 'build')
+        self.assertGreater(entry['retained'], 0)
+        sites = mp.get_top('build')
+        self.assertTrue(all(':' in site for site in sites.index))
+        self.assertEqual(len(kept), 20)
+
+    def test_solve_outside_block(self):
+        with so.profile_memory():
+            pass
+        self.m.solve(frame=True)
+        self.assertNotIn('memory', self.m.get_reports()[-1].info)
+
+
+if __name__ == '__main__':
+    unittest.main()
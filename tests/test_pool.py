@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for :class:`SessionPool`
+'''
+
+import logging
+import unittest
+
+import sasoptpy as so
+
+
+def get_model(name):
+    m = so.Model(name=name)
+    x = m.add_variable(name='x', lb=1, ub=4)
+    m.set_objective(2 * x, sense=so.MIN, name='obj')
+    return m
+
+
+class TestSessionPool(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.ERROR)
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_dispatch(self):
+        pool = so.SessionPool(so.LocalSession, size=2)
+        models = [get_model('m{}'.format(i)) for i in range(6)]
+        so.solve_all(models, max_concurrency=3, pool=pool, frame=True)
+        for m in models:
+            self.assertEqual(m.get_objective_value(), 2)
+            self.assertIsNone(m._session)
+        uploads = [s.count_calls('upload') for s in pool.sessions]
+        self.assertEqual(sum(uploads), 6)
+        self.assertTrue(all(u > 0 for u in uploads))
+        metrics = pool.get_metrics()
+        self.assertEqual(metrics['solves'].sum(), 6)
+        self.assertEqual(metrics['queue'].sum(), 0)
+        pool.close()
+
+    def test_retry_on_new_session(self):
+        created = []
+
+        def failing(action, **kwargs):
+            if action == 'solve':
+                raise RuntimeError('connection lost')
+
+        def factory():
+            s = so.LocalSession(responder=failing if not created else None)
+            created.append(s)
+            return s
+
+        with so.SessionPool(factory, size=1, retries=1) as pool:
+            m = get_model('m')
+            pool.solve(m, frame=True)
+            self.assertEqual(m.get_objective_value(), 2)
+            self.assertEqual(len(created), 2)
+            self.assertIs(pool.sessions[0], created[1])
+            metrics = pool.get_metrics()
+            self.assertEqual(metrics.loc[0, 'failures'], 1)
+            self.assertEqual(metrics.loc[0, 'reconnects'], 1)
+            self.assertEqual(metrics.loc[0, 'solves'], 1)
+
+    def test_retries_exhausted(self):
+        def failing(action, **kwargs):
+            if action == 'solve':
+                raise RuntimeError('connection lost')
+
+        pool = so.SessionPool(lambda: so.LocalSession(responder=failing),
+                              size=1, retries=1)
+        with self.assertRaises(RuntimeError):
+            pool.solve(get_model('m'), frame=True)
+        self.assertEqual(pool.get_metrics().loc[0, 'failures'], 2)
+
+    def test_failed_reconnect(self):
+        sessions = []
+        failures = []
+
+        class Session(so.LocalSession):
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+            def solve_frame(self, *args, **kwargs):
+                assert not self.closed, 'closed session is leased'
+                return super().solve_frame(*args, **kwargs)
+
+        def failing(action, **kwargs):
+            if action == 'solve':
+                raise RuntimeError('connection lost')
+
+        def factory():
+            if failures:
+                failures.pop()
+                raise RuntimeError('server is down')
+            s = Session(responder=None if sessions else failing)
+            sessions.append(s)
+            return s
+
+        pool = so.SessionPool(factory, size=2, retries=1)
+        failures.append(True)
+        m = get_model('m')
+        pool.solve(m, frame=True)
+        self.assertEqual(m.get_objective_value(), 2)
+        self.assertTrue(sessions[0].closed)
+        self.assertEqual(pool.sessions, [None, sessions[1]])
+        metrics = pool.get_metrics()
+        self.assertEqual(metrics.loc[0, 'reconnects'], 1)
+        self.assertEqual(metrics.loc[1, 'solves'], 1)
+        # Solves lease the remaining session only
+        for i in range(3):
+            pool.solve(get_model('n{}'.format(i)), frame=True)
+        self.assertEqual(pool.get_metrics().loc[1, 'solves'], 4)
+        pool.close()
+
+    def test_recreate_evicted_session(self):
+        def failing(action, **kwargs):
+            if action == 'solve':
+                raise RuntimeError('connection lost')
+
+        created = []
+
+        def factory():
+            if len(created) == 1:
+                created.append(None)
+                raise RuntimeError('server is down')
+            s = so.LocalSession(responder=failing if not created else None)
+            created.append(s)
+            return s
+
+        pool = so.SessionPool(factory, size=1, retries=0)
+        with self.assertRaises(RuntimeError):
+            pool.solve(get_model('m'), frame=True)
+        self.assertEqual(pool.sessions, [None])
+        m = get_model('n')
+        pool.solve(m, frame=True)
+        self.assertEqual(m.get_objective_value(), 2)
+        self.assertIs(pool.sessions[0], created[2])
+        self.assertEqual(pool.get_metrics().loc[0, 'queue'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
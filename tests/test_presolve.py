@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for :class:`Presolver`
+'''
+
+import logging
+import unittest
+
+import sasoptpy as so
+
+
+def section(df, start, end):
+    '''
+    Returns rows of an MPS table between two section headers
+    '''
+    first = df.index[df['Field1'] == start][0]
+    last = df.index[df['Field1'] == end][0]
+    return df.iloc[first+1:last]
+
+
+class TestPresolver(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        self.session = so.LocalSession()
+        m = so.Model(name='m', session=self.session)
+        self.x = m.add_variables(3, name='x', lb=0)
+        self.c1 = m.add_constraint(self.x[0] + self.x[1] + self.x[2] <= 4,
+                                   name='c1')
+        self.c2 = m.add_constraint(2 * self.x[2] <= 6, name='c2')
+        self.x[1].set_bounds(lb=1, ub=1)
+        m.set_objective(self.x[0] + 2 * self.x[2], sense=so.MAX,
+                        name='obj')
+        self.m = m
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_fixed_column_and_singleton_row(self):
+        p = so.Presolver(self.m)
+        summary = p.run()
+        self.assertEqual(summary['fixed_columns'], 1)
+        self.assertEqual(summary['singleton_rows'], 1)
+        self.assertEqual(summary['empty_columns'], 0)
+        self.assertEqual(summary['rows'], 1)
+        self.assertEqual(summary['nonzeros'], 2)
+        self.assertEqual(p._removed_cols, {'x[1]': 1})
+        self.assertEqual(p._bounds['x[2]'], (0, 3))
+        self.assertEqual(p._rhs[id(self.c1)], 3)
+        df = self.m.to_frame(presolver=p)
+        self.assertNotIn('x[1]', list(df['Field2']))
+        self.assertNotIn('c2', list(df['Field2']))
+        rhs = section(df, 'RHS', 'RANGES')
+        self.assertEqual(list(rhs['Field3']), ['c1'])
+        self.assertEqual(list(rhs['Field4']), [3])
+        bounds = section(df, 'BOUNDS', 'ENDATA')
+        self.assertEqual(list(bounds['Field1']), ['UP'])
+        self.assertEqual(list(bounds['Field3']), ['x[2]'])
+        self.assertEqual(list(bounds['Field4']), [3])
+
+    def test_duplicate_rows(self):
+        d = self.m.add_constraint(self.x[0] + self.x[2] >= 1, name='d')
+        e = self.m.add_constraint(self.x[2] + self.x[0] >= 1, name='e')
+        p = so.Presolver(self.m)
+        self.assertEqual(p.run()['duplicate_rows'], 1)
+        self.assertIn(id(e), p._removed_rows)
+        self.assertNotIn(id(d), p._removed_rows)
+
+    def test_rhs_shift(self):
+        y = self.m.add_variable(name='y', lb=2, ub=2)
+        z = self.m.add_variable(name='z', lb=-5, ub=5)
+        g = self.m.add_constraint(self.x[0] + y + z >= 0, name='g')
+        p = so.Presolver(self.m)
+        p.run()
+        self.assertEqual(p._rhs[id(g)], -2)
+        df = self.m.to_frame(presolver=p)
+        rhs = section(df, 'RHS', 'RANGES')
+        values = dict(zip(rhs['Field3'], rhs['Field4']))
+        values.update(zip(rhs['Field5'], rhs['Field6']))
+        self.assertEqual(values['g'], -2)
+        self.assertNotIn('y', list(section(df, 'BOUNDS', 'ENDATA')['Field3']))
+
+    def test_postsolve_duals(self):
+        p = so.Presolver(self.m)
+        p.run()
+        self.x[2]._value = 3
+        self.x[2]._dual = 2
+        self.c1._dual = 1
+        p.postsolve(duals=True)
+        self.assertEqual(self.x[1].get_value(), 1)
+        self.assertEqual(self.c2.get_dual(), 1)
+        self.assertEqual(self.x[2].get_dual(), 0)
+        self.assertEqual(self.x[1].get_dual(), -1)
+
+    def test_frame_solve(self):
+        self.m.solve(frame=True, presolve=True)
+        upload = [c for c in self.session.calls if c['action'] == 'upload']
+        df = self.session.tables[upload[-1]['table']]
+        self.assertNotIn('c2', list(df['Field2']))
+        self.assertEqual(self.x[1].get_value(), 1)
+        self.assertEqual(self.c2.get_dual(), 0)
+
+    def test_unknown_variable(self):
+        other = so.Model(name='other')
+        w = other.add_variable(name='w')
+        self.m.add_constraint(self.x[0] + w <= 3, name='e')
+        p = so.Presolver(self.m)
+        with self.assertLogs('sasoptpy', level='WARNING') as cm:
+            summary = p.run()
+        self.assertIn('not in the model', cm.output[0])
+        self.assertEqual(summary['rows'], 0)
+        self.assertEqual(summary['columns'], 0)
+        df = self.m.to_frame(presolver=p)
+        self.assertIn('x[1]', list(df['Field2']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for allocation counters of :func:`profile`
+'''
+
+import logging
+import unittest
+
+import sasoptpy as so
+import sasoptpy.profiling
+
+
+class TestProfile(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        so.report.logger.setLevel(logging.WARNING)
+        m = so.Model(name='m')
+        cls.x = m.add_variable(name='x')
+        cls.y = m.add_variable(name='y')
+        cls.z = m.add_variable(name='z')
+
+    @classmethod
+    def tearDownClass(cls):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_add_on_temporary(self):
+        with so.profile() as p:
+            e = self.x + self.y
+        self.assertEqual(p['add_copy'], 1)
+        self.assertEqual(p['add_temp'], 0)
+        with so.profile() as p:
+            e = self.x + self.y + self.z
+        self.assertEqual(p['add_copy'], 1)
+        self.assertEqual(p['add_temp'], 1)
+        self.assertEqual(p['expressions'], 1)
+        self.assertEqual(len(e._linCoef), 4)
+
+    def test_named_operand_is_copied(self):
+        e = self.x + self.y
+        with so.profile() as p:
+            f = e + self.z
+        self.assertEqual(p['add_temp'], 0)
+        self.assertEqual(p['add_copy'], 1)
+        self.assertNotIn('z', e._linCoef)
+        self.assertIn('z', f._linCoef)
+
+    def test_disabled(self):
+        before = sasoptpy.profiling._snapshot()
+        p = so.profile()
+        e = self.x + self.y + self.z
+        2 * e <= 4
+        self.assertFalse(sasoptpy.profiling._enabled)
+        self.assertEqual(sasoptpy.profiling._snapshot(), before)
+        self.assertEqual(set(p.counters.values()), {0})
+
+    def test_nested(self):
+        with so.profile() as outer:
+            with so.profile() as inner:
+                self.x + self.y
+            self.assertTrue(sasoptpy.profiling._enabled)
+            self.x + self.z
+            self.assertEqual(outer['add_copy'], 2)
+        self.assertFalse(sasoptpy.profiling._enabled)
+        self.assertEqual(inner['add_copy'], 1)
+        self.assertEqual(outer['add_copy'], 2)
+        self.assertGreaterEqual(outer.elapsed, inner.elapsed)
+
+    def test_frame(self):
+        with so.profile() as p:
+            so.Model(name='n').add_variables(3, name='v')
+        df = p.to_frame()
+        self.assertEqual(list(df.index), list(so.profiling.COUNTERS))
+        self.assertEqual(df.loc['variables', 'count'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for quadratic objectives and QP solves
+'''
+
+import logging
+import unittest
+
+import sasoptpy as so
+
+
+class TestQuadraticBlock(unittest.TestCase):
+
+    def tearDown(self):
+        so.reset_globals()
+
+    def test_entries(self):
+        x = so.VariableGroup(3, name='x')
+        q = so.QuadraticBlock()
+        q.add_term(x[0], x[0], 3)
+        q.add_term(x[1], x[0], 2)
+        q.add_term(x[0], x[1], 1)
+        entries = {(v1.get_name(), v2.get_name()): value
+                   for v1, v2, value in q.get_entries()}
+        # Lower triangle of Q, with terms equal to 1/2 x'Qx
+        self.assertEqual(entries, {('x[0]', 'x[0]'): 6, ('x[0]', 'x[1]'): 3})
+
+
+class TestQPSolve(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        self.session = so.LocalSession()
+        m = so.Model(name='qp', session=self.session)
+        self.x = m.add_variables(3, name='x', lb=1, ub=5)
+        self.c = m.add_constraint(self.x[0] + self.x[1] + self.x[2] >= 0,
+                                  name='c')
+        m.set_objective(self.x[0] * self.x[0] + self.x[1] * self.x[2] +
+                        self.x[2], sense=so.MIN, name='obj')
+        self.m = m
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_problem_type(self):
+        self.assertFalse(self.m._is_linear())
+        self.assertTrue(self.m._is_quadratic())
+        self.assertEqual(self.m.get_statistics()['problem'], 'QP')
+
+    def test_frame_solve(self):
+        self.m.solve(frame=True)
+        self.assertEqual(self.m.get_objective_value(), 3)
+        self.assertEqual(list(self.m._primalSolution.columns),
+                         ['var', 'lb', 'ub', 'value', 'rc'])
+        self.assertEqual(list(self.m._dualSolution.columns),
+                         ['con', 'value', 'dual'])
+        self.assertEqual(self.x[0].get_value(), 1)
+        self.assertIsNotNone(self.c.get_dual())
+
+    def test_presolve(self):
+        self.x[2].set_bounds(lb=2, ub=2)
+        self.m.add_constraint(2 * self.x[1] <= 8, name='single')
+        self.m.solve(frame=True, presolve=True)
+        s = self.session
+        mps = s.tables[s.calls[0]['table']]
+        self.assertNotIn('single', mps['Field3'].tolist())
+        # Variables of quadratic terms are kept
+        self.assertIn('x[2]', mps['Field2'].tolist())
+        self.assertEqual(self.x[2].get_value(), 2)
+        self.assertEqual(self.m._constraintDict['single'].get_dual(), 0)
+        self.assertEqual(self.m.get_objective_value(), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for :class:`SolveReport` and report hooks
+'''
+
+import logging
+import unittest
+
+import sasoptpy as so
+
+
+class TestSolveReport(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        self.session = so.LocalSession()
+        m = so.Model(name='m', session=self.session)
+        x = m.add_variables(['a', 'b'], name='x', lb=1, ub=5)
+        m.add_constraint(x['a'] + x['b'] <= 4, name='c')
+        m.set_objective(2 * x['a'] + x['b'], sense=so.MIN, name='obj')
+        self.m = m
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_frame_report(self):
+        self.m.solve(frame=True)
+        r = self.m.get_reports()[-1]
+        self.assertEqual(r.method, 'frame')
+        self.assertEqual(r.status, 'OPTIMAL')
+        self.assertEqual(r.objective, 3)
+        self.assertEqual((r.rows, r.columns, r.nonzeros), (1, 2, 2))
+        phases = [p['phase'] for p in r.phases]
+        self.assertEqual(phases[:4], ['convert', 'upload', 'solve',
+                                      'download'])
+        self.assertEqual(r.bytes_uploaded, self.session.bytes_uploaded)
+        self.assertGreater(r.bytes_downloaded, 0)
+        total = sum(p['duration'] for p in r.phases)
+        self.assertLessEqual(total, r.total_time)
+        self.assertEqual(r.get_phase_time('upload'), r.phases[1]['duration'])
+
+    def test_optmodel_report(self):
+        self.m.solve()
+        r = self.m.get_reports()[-1]
+        self.assertEqual(r.method, 'optmodel')
+        self.assertEqual(r.bytes_uploaded, self.session.bytes_uploaded)
+        self.assertEqual(self.session.count_calls('runOptmodel'), 1)
+
+    def test_hooks(self):
+        reports = []
+        model_reports = []
+
+        def hook(r):
+            reports.append(r.to_dict())
+
+        so.add_report_hook(hook)
+        self.m.add_report_hook(model_reports.append)
+        try:
+            self.m.solve(frame=True)
+            self.m.solve(frame=True)
+        finally:
+            so.remove_report_hook(hook)
+        self.m.solve(frame=True)
+        self.assertEqual(len(reports), 2)
+        self.assertEqual(len(model_reports), 3)
+        self.assertEqual(len(self.m.get_reports()), 3)
+        self.assertEqual(set(reports[0]['phases']),
+                         {'convert', 'upload', 'solve', 'download', 'parse'})
+
+    def test_failing_hook(self):
+        def hook(r):
+            raise ValueError('hook failed')
+
+        self.m.add_report_hook(hook)
+        with self.assertLogs('sasoptpy', level='WARNING'):
+            self.m.solve(frame=True)
+        self.assertEqual(self.m.get_objective_value(), 3)
+
+    def test_listeners(self):
+        events = []
+
+        def listener(report, phase, event):
+            events.append((phase, event))
+
+        so.SolveReport.listeners.append(listener)
+        try:
+            self.m.solve(frame=True)
+        finally:
+            so.SolveReport.listeners.remove(listener)
+        self.assertEqual(events[:2], [('convert', 'start'),
+                                      ('convert', 'end')])
+        self.assertEqual(len(events) % 2, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
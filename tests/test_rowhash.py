@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for :meth:`Model.set_row_hashing`
+'''
+
+import logging
+import unittest
+
+import sasoptpy as so
+
+
+class TestRowHashing(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        self.m = so.Model(name='m')
+        self.x = self.m.add_variables(2, name='x', lb=0)
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_detect(self):
+        x = self.x
+        self.m.set_row_hashing('detect')
+        self.m.add_constraint(x[0] + 2 * x[1] <= 5, name='c1')
+        self.m.add_constraint(2 * x[0] + 4 * x[1] <= 10, name='c2')
+        self.m.add_constraint(-x[0] - 2 * x[1] >= -5, name='c3')
+        self.m.add_constraint(x[0] + 2 * x[1] <= 8, name='c4')
+        stats = self.m.get_statistics()
+        self.assertEqual(stats['duplicate_rows'], 2)
+        self.assertEqual(stats['parallel_rows'], 1)
+        self.assertEqual(stats['constraints'], 4)
+
+    def test_drop(self):
+        x = self.x
+        self.m.set_row_hashing('drop')
+        c1 = self.m.add_constraint(x[0] + 2 * x[1] <= 5, name='c1')
+        c2 = self.m.add_constraint(2 * x[0] + 4 * x[1] <= 12, name='c2')
+        c3 = self.m.add_constraint(x[0] + 2 * x[1] <= 4, name='c3')
+        self.assertIs(c2, c1)
+        self.assertIsNot(c3, c1)
+        stats = self.m.get_statistics()
+        self.assertEqual(stats['dropped_rows'], 1)
+        self.assertEqual(stats['constraints'], 2)
+
+    def test_merge(self):
+        x = self.x
+        self.m.set_row_hashing('merge')
+        c1 = self.m.add_constraint(x[0] + 2 * x[1] <= 8, name='c1')
+        c2 = self.m.add_constraint(2 * x[0] + 4 * x[1] <= 10, name='c2')
+        self.assertIs(c2, c1)
+        self.assertEqual(c1._linCoef['CONST']['val'], -5)
+        stats = self.m.get_statistics()
+        self.assertEqual(stats['merged_rows'], 1)
+        self.assertEqual(stats['parallel_rows'], 1)
+
+    def test_group_member(self):
+        x = self.x
+        self.m.set_row_hashing('drop')
+        self.m.add_constraint(x[0] + x[1] <= 3, name='c')
+        d = self.m.add_constraints(
+            (i * x[0] + i * x[1] <= 3 * i for i in [1, 2]), name='d')
+        self.assertEqual(d._conlist, [])
+        self.assertNotIn(d, self.m._congroups)
+        self.assertEqual(self.m.get_statistics()['constraints'], 1)
+        code = self.m.to_optmodel()
+        self.assertNotIn('con d', code)
+        e = self.m.add_constraints(
+            (x[0] + i * x[1] <= 3 for i in [1, 2]), name='e')
+        self.assertEqual(e._conlist, [(2,)])
+        self.assertEqual(self.m.to_optmodel().count('x[0] + x[1] <= 3'), 1)
+
+
+    def test_tightest_bounds(self):
+        x = self.x
+        self.m.set_row_hashing('drop')
+        c1 = self.m.add_constraint(x[0] + 2 * x[1] <= 8, name='c1')
+        c3 = self.m.add_constraint(3 * x[0] + 6 * x[1] >= 3, name='c3')
+        c4 = self.m.add_constraint(x[0] + 2 * x[1] >= -100, name='c4')
+        self.assertIs(c4, c3)
+        c5 = self.m.add_constraint(-x[0] - 2 * x[1] >= -20, name='c5')
+        self.assertIs(c5, c1)
+        c6 = self.m.add_constraint(x[0] + 2 * x[1] == 5, name='c6')
+        self.assertIsNot(c6, c1)
+        c7 = self.m.add_constraint(x[0] + 2 * x[1] <= 7, name='c7')
+        self.assertIs(c7, c6)
+        stats = self.m.get_statistics()
+        self.assertEqual(stats['dropped_rows'], 3)
+        self.assertEqual(stats['constraints'], 3)
+
+    def test_merge_lower_bound(self):
+        x = self.x
+        self.m.set_row_hashing('merge')
+        c1 = self.m.add_constraint(x[0] + 2 * x[1] <= 8, name='c1')
+        c3 = self.m.add_constraint(3 * x[0] + 6 * x[1] >= 3, name='c3')
+        c4 = self.m.add_constraint(2 * x[0] + 4 * x[1] >= 4, name='c4')
+        self.assertIs(c4, c3)
+        self.assertEqual(c3._linCoef['CONST']['val'], -6)
+        self.assertEqual(c1._linCoef['CONST']['val'], -8)
+        self.assertEqual(self.m.get_statistics()['merged_rows'], 1)
+
+    def test_group_dropped_warning(self):
+        x = self.x
+        self.m.set_row_hashing('drop')
+        self.m.add_constraint(x[0] + x[1] <= 3, name='c')
+        with self.assertLogs('sasoptpy', logging.WARNING) as logs:
+            d = self.m.add_constraints(
+                (x[0] + x[1] <= 3 + i for i in range(3)), name='d')
+        self.assertEqual(d._conlist, [])
+        self.assertIn('group d', logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
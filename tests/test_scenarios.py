@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for :meth:`Model.solve_scenarios`
+'''
+
+import logging
+import unittest
+
+import pandas as pd
+
+import sasoptpy as so
+
+
+class TestSolveScenarios(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        self.session = so.LocalSession()
+        m = so.Model(name='m', session=self.session)
+        x = m.add_variables(['a', 'b'], name='x', lb=0, ub=5)
+        m.add_constraints((x[i] <= 4 for i in ['a', 'b']), name='c')
+        m.add_constraint(x['a'] + x['b'] >= 1, name='d')
+        m.set_objective(x['a'] + 2 * x['b'], sense=so.MAX, name='obj')
+        self.m = m
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_code(self):
+        sc = pd.DataFrame({"c['a']": [1, None], 'x[b].ub': [3, 2],
+                           'd': [0, 1]}, index=['s1', 's2'])
+        code = self.m.solve_scenarios(sc, submit=False)
+        self.assertIn('set <str> SCENARIOS;', code)
+        self.assertIn('c_a.ub = if _sc1_[s] = . then _sc1_base0_ '
+                      'else _sc1_[s];', code)
+        self.assertIn("x['b'].ub = if _sc2_[s] = .", code)
+        self.assertIn('d.lb = if _sc3_[s] = .', code)
+        self.assertIn('cofor {s in SCENARIOS} do;', code)
+
+    def test_numeric_keys(self):
+        sc = pd.DataFrame({'d': [0, 1]}, index=[1, 2])
+        code = self.m.solve_scenarios(sc, submit=False)
+        self.assertIn('set SCENARIOS;', code)
+
+    @unittest.skipUnless(hasattr(pd, 'StringDtype'), 'requires pandas 1.0')
+    def test_string_dtype_keys(self):
+        sc = pd.DataFrame({'d': [0, 1]},
+                          index=pd.Index(['s1', 's2'], dtype='string'))
+        code = self.m.solve_scenarios(sc, submit=False)
+        self.assertIn('set <str> SCENARIOS;', code)
+
+    def test_scalar_parameter(self):
+        p = so.Parameter(name='p', init=3)
+        self.m._parameters.append(p)
+        sc = pd.DataFrame({'p': [1, 2]}, index=['s1', 's2'])
+        code = self.m.solve_scenarios(sc, submit=False)
+        self.assertIn('p = if _sc1_[s] = .', code)
+
+    def test_indexed_parameter(self):
+        p = so.Parameter(name='q', keys=(so.Set(name='I'),), init=3)
+        self.m._parameters.append(p)
+        sc = pd.DataFrame({'q[1]': [1, 2]}, index=['s1', 's2'])
+        with self.assertLogs('sasoptpy', level='ERROR') as cm:
+            self.assertIsNone(self.m.solve_scenarios(sc, submit=False))
+        self.assertIn('only scalar parameters', cm.output[0])
+
+    def test_unknown_column(self):
+        sc = pd.DataFrame({'e': [1, 2]}, index=['s1', 's2'])
+        with self.assertLogs('sasoptpy', level='ERROR'):
+            self.assertIsNone(self.m.solve_scenarios(sc, submit=False))
+
+    def test_results(self):
+        s = self.session
+
+        def responder(action, code=None, **kwargs):
+            name = code.split('create data ')[1].split()[0]
+            prefix = name[:-len('_SUMMARY')]
+            s.tables[name] = pd.DataFrame({
+                '_SCENARIO_': ['s2', 's1'], '_STATUS_': ['OPTIMAL'] * 2,
+                '_OBJECTIVE_': [2.0, 1.0]})
+            s.tables[prefix + '_PRIMAL'] = pd.DataFrame({
+                '_SCENARIO_': ['s1', 's1', 's2', 's2'], '_J_': [1, 2] * 2,
+                '_VAR_': ['x[a]', 'x[b]'] * 2,
+                '_VALUE_': [1.0, 0.0, 2.0, 0.0]})
+
+        s._responder = responder
+        sc = pd.DataFrame({'d': [1, 2]}, index=['s1', 's2'])
+        result = self.m.solve_scenarios(sc, drop=True)
+        self.assertEqual(list(result.index), ['s1', 's2'])
+        self.assertEqual(list(result['objective']), [1.0, 2.0])
+        self.assertEqual(list(result['x[a]']), [1.0, 2.0])
+        self.assertEqual(s.count_calls('upload'), 1)
+        self.assertEqual(s.count_calls('runOptmodel'), 1)
+        self.assertEqual(s.tables, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
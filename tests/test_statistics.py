@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for :meth:`Model.get_statistics`
+'''
+
+import logging
+import unittest
+
+import sasoptpy as so
+
+
+class TestStatistics(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        self.session = so.LocalSession()
+        m = so.Model(name='m', session=self.session)
+        self.x = m.add_variables(2, name='x', vartype=so.INT, lb=0, ub=5)
+        self.y = m.add_variable(name='y', lb=0)
+        self.c = m.add_constraint(self.x[0] + 2 * self.x[1] - self.y <= 4,
+                                  name='c')
+        m.set_objective(self.x[0] + self.y + 3, sense=so.MIN, name='obj')
+        self.m = m
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_counts(self):
+        stats = self.m.get_statistics()
+        self.assertEqual(stats['variables'], 3)
+        self.assertEqual(stats['continuous'], 1)
+        self.assertEqual(stats['integer'], 2)
+        self.assertEqual(stats['binary'], 0)
+        self.assertEqual(stats['constraints'], 1)
+        self.assertEqual(stats['nonzeros'], 3)
+        self.assertEqual(stats['objective_constant'], 3)
+        self.assertEqual(stats['problem'], 'MILP')
+
+    def test_add_and_drop(self):
+        z = self.m.add_variable(name='z', vartype=so.BIN)
+        d = self.m.add_constraint(self.y + z >= 1, name='d')
+        stats = self.m.get_statistics()
+        self.assertEqual(stats['binary'], 1)
+        self.assertEqual(stats['nonzeros'], 5)
+        self.m.drop_constraint(d)
+        self.m.drop_variable(z)
+        self.m.drop_variables(self.x)
+        stats = self.m.get_statistics()
+        self.assertEqual(stats['variables'], 1)
+        self.assertEqual(stats['integer'], 0)
+        self.assertEqual(stats['binary'], 0)
+        self.assertEqual(stats['nonzeros'], 1)
+        self.assertEqual(stats['problem'], 'LP')
+
+    def test_changed_coefficient(self):
+        self.c.update_var_coef(self.x[1], 0)
+        self.c.update_var_coef(self.y, -2)
+        self.assertEqual(self.m.get_statistics()['nonzeros'], 2)
+        self.c.update_var_coef(self.x[1], 1)
+        self.assertEqual(self.m.get_statistics()['nonzeros'], 3)
+
+    def test_problem_class(self):
+        self.m.set_objective(self.y * self.y + self.x[0], sense=so.MIN,
+                             name='obj')
+        self.assertEqual(self.m.get_statistics()['problem'], 'MIQP')
+        self.m.drop_variables(self.x)
+        self.assertEqual(self.m.get_statistics()['problem'], 'QP')
+        self.m.add_constraint(self.y * self.y <= 4, name='q')
+        stats = self.m.get_statistics()
+        self.assertEqual(stats['nonlinear'], 1)
+        self.assertEqual(stats['problem'], 'NLP')
+
+    def test_frame_solve(self):
+        ptypes = []
+        self.session._responder = lambda action, **kw: ptypes.append(
+            kw['ptype'])
+        self.m.solve(frame=True)
+        self.assertEqual(self.m.get_objective_value(), 3)
+        self.m.drop_variables(self.x)
+        self.m.solve(frame=True)
+        self.assertEqual(ptypes, [2, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
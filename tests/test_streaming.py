@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for streaming OPTMODEL code with :meth:`Model.iter_optmodel`
+'''
+
+import io
+import logging
+import unittest
+
+import sasoptpy as so
+
+
+class TestIterOptmodel(unittest.TestCase):
+
+    n = 20000
+
+    @classmethod
+    def setUpClass(cls):
+        so.report.logger.setLevel(logging.WARNING)
+        n = cls.n
+        m = so.Model(name='large')
+        x = m.add_variables(n, name='x', lb=0, ub=10)
+        for i in range(0, n, 7):
+            x[i].set_bounds(ub=5)
+        y = m.add_variables(['a', 'b'], name='y', lb=0)
+        m.add_constraints((x[i] + 2 * x[(i + 1) % n] <= i for i in range(n)),
+                          name='c')
+        m.add_constraint(y['a'] + y['b'] >= 1, name='d')
+        m.set_objective(y['a'] + 2 * y['b'], sense=so.MIN, name='obj')
+        cls.m = m
+        cls.chunks = list(m.iter_optmodel())
+        cls.code = m.to_optmodel()
+
+    @classmethod
+    def tearDownClass(cls):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def test_bounded_chunks(self):
+        chunks = self.chunks
+        total = sum(len(chunk) for chunk in chunks)
+        self.assertGreater(total, 1000000)
+        self.assertLess(max(len(chunk) for chunk in chunks), 20000)
+
+    def test_same_code(self):
+        code = self.code
+        self.assertEqual(''.join(self.chunks), code)
+        self.assertEqual(''.join(self.m.iter_optmodel(ordered=True)),
+                         self.m.to_optmodel(ordered=True))
+        self.assertIn('x[7].ub = 5;', code)
+        self.assertIn('con c_19999 : x[19999] + 2 * x[0] <= 19999;', code)
+
+    def test_write(self):
+        out = io.StringIO()
+        self.m.write_optmodel(out)
+        self.assertEqual(out.getvalue(), self.code)
+
+    def test_key_batches(self):
+        header = [chunk for chunk in self.chunks if chunk.startswith('var x {')]
+        self.assertEqual(len(header), 1)
+        self.assertLess(len(header[0]), 20000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Unit tests for :meth:`Model.solve_sweep`
+'''
+
+import logging
+import unittest
+
+import pandas as pd
+
+import sasoptpy as so
+
+
+class TestSolveSweep(unittest.TestCase):
+
+    def setUp(self):
+        so.report.logger.setLevel(logging.WARNING)
+        self.snapshots = []
+
+        def responder(action, table=None, **kwargs):
+            if action == 'solve':
+                self.snapshots.append(self.session.tables[table].copy())
+
+        self.session = so.LocalSession(responder=responder)
+        m = so.Model(name='m', session=self.session)
+        x = m.add_variables(3, name='x', lb=1, ub=10)
+        y = m.add_variable(name='y', lb=-5, ub=5)
+        m.add_constraint(x[0] + x[1] <= 8, name='c1')
+        m.add_constraint(x[1] + x[2] + y >= 0, name='c2')
+        m.set_objective(x[0] + x[1], sense=so.MIN, name='obj')
+        self.m = m
+        self.x = x
+        self.y = y
+
+    def tearDown(self):
+        so.report.logger.setLevel(logging.INFO)
+        so.reset_globals()
+
+    def get_entry(self, df, col, row):
+        entries = df[(df['Field2'] == col) & (df['Field3'] == row)]
+        if entries.empty:
+            entries = df[(df['Field2'] == col) & (df['Field5'] == row)]
+            return entries['Field6'].iloc[0]
+        return entries['Field4'].iloc[0]
+
+    def test_single_upload(self):
+        x, y = self.x, self.y
+        result = self.m.solve_sweep(
+            objectives={'a': 2 * x[0] + 3, 'b': x[2] - y, 'both': x[1]},
+            rhs=pd.DataFrame({'r1': [5, None], 'both': [7, 2]},
+                             index=['c1', 'c2']))
+        s = self.session
+        self.assertEqual(list(result.index), ['a', 'b', 'both', 'r1'])
+        self.assertEqual(list(result['objective']), [5.0, 1.0, 1.0, 2.0])
+        self.assertEqual(s.count_calls('upload'), 1)
+        self.assertEqual(s.count_calls('patch'), 4)
+        self.assertEqual(s.count_calls('solve'), 4)
+        actions = [c['action'] for c in s.calls
+                   if c['action'] in ('upload', 'patch')]
+        self.assertEqual(actions, ['upload'] + ['patch'] * 4)
+
+        a, b, both, r1 = self.snapshots
+        self.assertEqual(self.get_entry(a, 'x[0]', 'obj'), 2)
+        self.assertEqual(self.get_entry(a, 'x[1]', 'obj'), 0)
+        self.assertEqual(self.get_entry(b, 'x[0]', 'obj'), 0)
+        self.assertEqual(self.get_entry(b, 'y', 'obj'), -1)
+        self.assertEqual(self.get_entry(both, 'RHS', 'c1'), 7)
+        self.assertEqual(self.get_entry(both, 'RHS', 'c2'), 2)
+        self.assertEqual(self.get_entry(r1, 'RHS', 'c1'), 5)
+        self.assertEqual(self.get_entry(r1, 'RHS', 'c2'), 0)
+        self.assertEqual(self.get_entry(r1, 'x[0]', 'obj'), 1)
+        self.assertEqual(self.get_entry(r1, 'x[1]', 'obj'), 1)
+
+    def test_repeated_variant(self):
+        x = self.x
+        self.m.solve_sweep(objectives={'a': x[0], 'b': x[0]})
+        # The second variant does not change the table
+        self.assertEqual(self.session.count_calls('upload'), 1)
+        self.assertEqual(self.session.count_calls('patch'), 1)
+
+    def test_drop(self):
+        self.m.solve_sweep(objectives={'a': self.x[0]}, name='SWEEP',
+                           drop=True)
+        self.assertNotIn('SWEEP', self.session.tables)
+
+    def test_nonlinear(self):
+        with self.assertLogs('sasoptpy', level='ERROR'):
+            result = self.m.solve_sweep(
+                objectives={'a': self.x[0] * self.x[1]})
+        self.assertIsNone(result)
+        self.assertEqual(self.session.count_calls('upload'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()